@@ -0,0 +1,196 @@
+import argparse
+import gc
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import openpyxl
+
+from monitoramento.correcoes import aplicar_correcoes
+from monitoramento.ingestao import ler_exportacoes
+from monitoramento.pipeline import abas_da_saida, calcular_metricas, dataframes
+from monitoramento.planilha import MODELO_PATH, sobrescrever_aba
+from monitoramento.sinteticos import SINTETICOS_DIR, VERSAO_SINTETICOS, gravar_exportacoes
+from monitoramento.transformacao import transformar_modalidades
+
+# ======================================================
+# BENCHMARK DO PIPELINE EM ESCALA (DADOS SINTÉTICOS)
+# ======================================================
+# Mede cada etapa do tratamento sobre as exportações sintéticas de
+# monitoramento.sinteticos (1x, 10x, 100x propostas) e compara com uma
+# linha de base gravada antes: tempos acima da tolerância e resultados
+# diferentes (linhas das abas, métricas) são regressões.
+#
+#   python benchmark_pipeline.py --escalas 1 10 --gravar-base   (grava a linha de base)
+#   python benchmark_pipeline.py --escalas 1 10                 (compara com ela)
+#
+# Os tempos dependem da máquina: a linha de base deve ser gravada na mesma
+# máquina em que a comparação roda. Com --comparar-tratamento, mede também
+# o tratamento das modalidades em sequência e em threads.
+
+LINHA_BASE_PATH = os.path.join(os.getcwd(), 'benchmark_pipeline_base.json')
+ETAPAS = ['ingestao', 'correcoes', 'tratamento', 'sobrescrever_aba', 'metricas']
+
+
+def medir_uma_vez(pasta, modelo):
+    """Roda as etapas em sequência sobre as exportações de `pasta`; retorna (tempos, resultado).
+
+    A ingestão usa um cache vazio (converte os .xlsx) e a carga do modelo
+    não entra no tempo do sobrescrever_aba.
+    """
+    tempos = {}
+    with tempfile.TemporaryDirectory() as cache, redirect_stdout(io.StringIO()):
+        gc.collect()
+        t0 = time.perf_counter()
+        exportacoes = ler_exportacoes(pasta, cache_dir=os.path.join(cache, 'cache'), parquet_dir=os.path.join(cache, 'parquet'))
+        tempos['ingestao'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        relatorio = aplicar_correcoes(exportacoes)
+        tempos['correcoes'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        modalidades = transformar_modalidades(exportacoes)
+        tempos['tratamento'] = time.perf_counter() - t0
+
+        abas = abas_da_saida(dataframes(modalidades))
+        workbook = openpyxl.load_workbook(modelo)
+        gc.collect()
+        t0 = time.perf_counter()
+        for aba, df in abas.items():
+            sobrescrever_aba(workbook, aba, df)
+        tempos['sobrescrever_aba'] = time.perf_counter() - t0
+        del workbook
+
+        t0 = time.perf_counter()
+        metricas = calcular_metricas(modalidades)
+        tempos['metricas'] = time.perf_counter() - t0
+
+    metricas.pop('data')
+    resultado = {
+        'linhas_exportacoes': {nome: len(df) for nome, df in exportacoes.items()},
+        'correcoes': {f"{r['regra']}/{r['exportacao']}": int(r['linhas']) for r in relatorio.to_dict('records')},
+        'linhas_abas': {aba: len(df) for aba, df in abas.items()},
+        'metricas': metricas,
+    }
+    return tempos, resultado
+
+
+def medir_escala(pasta, repeticoes, modelo):
+    """Mediana dos tempos de `repeticoes` rodadas e o resultado da última."""
+    rodadas = []
+    for _ in range(repeticoes):
+        tempos, resultado = medir_uma_vez(pasta, modelo)
+        rodadas.append(tempos)
+    medianas = {etapa: statistics.median(r[etapa] for r in rodadas) for etapa in ETAPAS}
+    return medianas, resultado
+
+
+def comparar_tratamento(pasta, repeticoes):
+    """Mediana dos segundos do tratamento em sequência e com uma thread por modalidade."""
+    with tempfile.TemporaryDirectory() as cache, redirect_stdout(io.StringIO()):
+        exportacoes = ler_exportacoes(pasta, cache_dir=os.path.join(cache, 'cache'), parquet_dir=os.path.join(cache, 'parquet'))
+        aplicar_correcoes(exportacoes)
+    tempos = {}
+    for modo, paralelo in (('sequencial', False), ('threads', True)):
+        rodadas = []
+        for _ in range(repeticoes):
+            with redirect_stdout(io.StringIO()):
+                gc.collect()
+                t0 = time.perf_counter()
+                transformar_modalidades(exportacoes, paralelo=paralelo)
+                rodadas.append(time.perf_counter() - t0)
+        tempos[modo] = statistics.median(rodadas)
+    return tempos
+
+
+def _diferencas(atual, anterior, prefixo=''):
+    """Chaves de dois dicionários aninhados com valores diferentes."""
+    diferencas = []
+    for chave in sorted(set(atual) | set(anterior)):
+        a, b = atual.get(chave), anterior.get(chave)
+        if isinstance(a, dict) and isinstance(b, dict):
+            diferencas += _diferencas(a, b, f'{prefixo}{chave}.')
+        elif a != b:
+            diferencas.append(f'{prefixo}{chave}: {b} -> {a}')
+    return diferencas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede as etapas do pipeline sobre exportações sintéticas.')
+    parser.add_argument('--escalas', type=float, nargs='+', default=[1, 10], help='multiplicadores das propostas (ex.: 1 10 100)')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--repeticoes', type=int, default=3, help='rodadas por escala (vale a mediana)')
+    parser.add_argument('--modelo', default=MODELO_PATH)
+    parser.add_argument('--linha-base', default=LINHA_BASE_PATH, help='arquivo JSON da linha de base')
+    parser.add_argument('--gravar-base', action='store_true', help='grava os tempos e resultados como nova linha de base')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='aumento de tempo aceito sobre a linha de base (0.2 = 20%%)')
+    parser.add_argument('--comparar-tratamento', action='store_true', help='mede o tratamento em sequência e em threads')
+    args = parser.parse_args()
+
+    # Ao gravar, as escalas que não rodaram agora continuam na linha de base
+    anterior = {}
+    if os.path.exists(args.linha_base):
+        with open(args.linha_base, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        if anterior.get('versao_sinteticos') != VERSAO_SINTETICOS or anterior.get('semente') != args.semente:
+            if not args.gravar_base:
+                print('⚠️ Linha de base gravada com outra versão dos dados sintéticos ou outra semente: só os tempos serão mostrados.')
+            anterior = {}
+    elif not args.gravar_base:
+        print(f'⚠️ Sem linha de base em {args.linha_base} (use --gravar-base): só os tempos serão mostrados.')
+    if args.gravar_base:
+        print('💾 Gravando nova linha de base.')
+
+    # Gera (ou reaproveita) as exportações antes, fora da tabela e dos tempos
+    pastas = {escala: gravar_exportacoes(escala, args.semente, SINTETICOS_DIR) for escala in args.escalas}
+
+    escalas = {}
+    regressoes = []
+    print(f"{'escala':<8}{'etapa':<18}{'tempo (s)':>11}{'base (s)':>10}{'variação':>10}")
+    for escala in args.escalas:
+        chave = f'x{escala:g}'
+        tempos, resultado = medir_escala(pastas[escala], args.repeticoes, args.modelo)
+        escalas[chave] = {'segundos': {e: round(s, 4) for e, s in tempos.items()}, 'resultado': resultado}
+        base = None if args.gravar_base else anterior.get('escalas', {}).get(chave)
+        for etapa in ETAPAS:
+            linha = f'{chave:<8}{etapa:<18}{tempos[etapa]:>11.3f}'
+            if base and etapa in base['segundos']:
+                variacao = tempos[etapa] / base['segundos'][etapa] - 1
+                alerta = ''
+                if variacao > args.tolerancia:
+                    alerta = '  ⚠️'
+                    regressoes.append(f'{chave} {etapa}: {variacao:+.0%}')
+                linha += f"{base['segundos'][etapa]:>10.3f}{variacao:>+10.0%}{alerta}"
+            print(linha)
+        print(f"{chave:<8}{'TOTAL':<18}{sum(tempos.values()):>11.3f}")
+        if base:
+            regressoes += [f'{chave} resultado mudou: {d}' for d in _diferencas(resultado, base['resultado'])]
+
+    if args.comparar_tratamento:
+        print(f"\n{'escala':<8}{'sequencial (s)':>16}{'threads (s)':>13}{'ganho':>8}   ({os.cpu_count()} núcleo(s))")
+        for escala in args.escalas:
+            tempos = comparar_tratamento(pastas[escala], args.repeticoes)
+            print(f"{f'x{escala:g}':<8}{tempos['sequencial']:>16.3f}{tempos['threads']:>13.3f}{tempos['sequencial'] / tempos['threads']:>7.2f}x")
+
+    if args.gravar_base:
+        linha_base = {'versao_sinteticos': VERSAO_SINTETICOS, 'semente': args.semente, 'escalas': {**anterior.get('escalas', {}), **escalas}}
+        with open(args.linha_base, 'w', encoding='utf-8') as f:
+            json.dump(linha_base, f, ensure_ascii=False, indent=4)
+        print(f'💾 Linha de base gravada em: {args.linha_base}')
+    elif regressoes:
+        print('\n❌ Regressões em relação à linha de base:')
+        for regressao in regressoes:
+            print(f'   {regressao}')
+        sys.exit(1)
+    elif anterior:
+        print('\n✅ Sem regressões em relação à linha de base.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import gc
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.utils.dataframe import dataframe_to_rows
+
+from monitoramento.esquemas import CHAVE_PROPOSTA, para_planilha
+from monitoramento.planilha import LINHA_INICIAL, MAPPING, MODELO_PATH, sobrescrever_aba
+from monitoramento.planilha_zip import gerar_saida_zip
+
+# ======================================================
+# BENCHMARK DA ESCRITA DAS ABAS (PARTE 3)
+# ======================================================
+# Compara, aba por aba, o laço antigo (ws.cell por valor) com a escrita
+# linha a linha de monitoramento.planilha, usando dados sintéticos com as
+# colunas do cabeçalho de cada aba do modelo.
+#
+#   python benchmark_planilha.py --linhas 20000
+#   python benchmark_planilha.py --linhas 20000 --arquivo   (arquivo inteiro: openpyxl x zip)
+
+
+def sobrescrever_celula_a_celula(workbook, aba_nome, df):
+    """Versão antiga da PARTE 3, mantida só para comparação."""
+    ws = workbook[aba_nome]
+    t0 = time.perf_counter()
+    for i, row in enumerate(dataframe_to_rows(para_planilha(df), index=False, header=False), start=LINHA_INICIAL):
+        for j, value in enumerate(row, start=1):
+            ws.cell(row=i, column=j, value=value)
+    return time.perf_counter() - t0
+
+
+def dados_sinteticos(ws, linhas, rng):
+    """DataFrame com as colunas do cabeçalho da aba (linha 2, ou linha 1 se vazia).
+
+    Colunas calculadas do modelo (fórmulas, como a CANCELAR) ficam de fora.
+    """
+    calculadas = {c.column for c in (*ws[2], *ws[LINHA_INICIAL]) if c.data_type == 'f'}
+    linha = 2 if any(c.value and c.column not in calculadas for c in ws[2]) else 1
+    cabecalho = [c.value for c in ws[linha] if c.value and c.column not in calculadas]
+    colunas = {}
+    for j, nome in enumerate(cabecalho):
+        if j == 0:
+            colunas[CHAVE_PROPOSTA] = pd.array(rng.integers(10**17, 10**18, linhas), dtype='UInt64')
+        elif j % 3 == 1:
+            colunas[nome] = pd.Categorical(rng.choice(['Aprovado', 'Em análise', 'Cancelado'], linhas))
+        elif j % 3 == 2:
+            colunas[nome] = rng.random(linhas) * 1000
+        else:
+            colunas[nome] = pd.array(rng.integers(0, 10**7, linhas), dtype='Int64')
+    return pd.DataFrame(colunas)
+
+
+def comparar_arquivo(modelo, abas, processos=None):
+    """Tempo do arquivo inteiro (carregar, escrever, salvar) nos dois motores da PARTE 3."""
+    with tempfile.TemporaryDirectory() as pasta, redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        workbook = openpyxl.load_workbook(modelo)
+        for aba, df in abas.items():
+            sobrescrever_aba(workbook, aba, df)
+        workbook.save(os.path.join(pasta, 'openpyxl.xlsx'))
+        antes = time.perf_counter() - t0
+        del workbook
+        gc.collect()
+        depois = gerar_saida_zip(modelo, os.path.join(pasta, 'zip.xlsx'), abas, processos=processos)
+    return antes, depois
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara a escrita célula a célula com a escrita por linhas.')
+    parser.add_argument('--linhas', type=int, default=20000, help='linhas sintéticas por aba')
+    parser.add_argument('--modelo', default=MODELO_PATH)
+    parser.add_argument('--arquivo', action='store_true', help='compara também o arquivo inteiro (openpyxl x zip)')
+    parser.add_argument('--processos', type=int, default=None, help='processos do motor zip (padrão: um por aba, até o número de núcleos)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    antigo = openpyxl.load_workbook(args.modelo)
+    novo = openpyxl.load_workbook(args.modelo)
+
+    print(f"{'aba':<20}{'células':>10}{'antes (s)':>12}{'depois (s)':>12}{'ganho':>8}")
+    total_antes = total_depois = 0.0
+    abas = {}
+    for aba in MAPPING.values():
+        df = abas[aba] = dados_sinteticos(antigo[aba], args.linhas, rng)
+        gc.collect()
+        antes = sobrescrever_celula_a_celula(antigo, aba, df)
+        gc.collect()
+        with redirect_stdout(io.StringIO()):
+            depois = sobrescrever_aba(novo, aba, df)
+        total_antes += antes
+        total_depois += depois
+        print(f'{aba:<20}{df.size:>10}{antes:>12.2f}{depois:>12.2f}{antes / depois:>7.1f}x')
+    print(f"{'TOTAL':<20}{'':>10}{total_antes:>12.2f}{total_depois:>12.2f}{total_antes / total_depois:>7.1f}x")
+
+    if args.arquivo:
+        del antigo, novo
+        gc.collect()
+        antes, depois = comparar_arquivo(args.modelo, abas, args.processos)
+        print(f"\n{'arquivo inteiro':<20}{'openpyxl (s)':>14}{'zip (s)':>10}{'ganho':>8}")
+        print(f"{'':<20}{antes:>14.2f}{depois:>10.2f}{antes / depois:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
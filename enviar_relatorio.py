@@ -2,16 +2,19 @@ import os
 import shutil
 import json
 from datetime import datetime
-import papermill as pm
+import pythoncom
 import win32com.client
 from dotenv import load_dotenv
 
+from monitoramento.entregas import canal
+from monitoramento.medicoes import medir
+from monitoramento.pipeline import executar
+
 # ======================================================
 # CARREGAR VARIÁVEIS DO .env
 # ======================================================
 load_dotenv()
 
-NOTEBOOK_PATH = os.getenv("NOTEBOOK_PATH")
 SAIDA_DIR = os.getenv("SAIDA_DIR")
 DESTINO_PUBLICO = os.getenv("DESTINO_PUBLICO")
 EMAIL_DESTINATARIOS = os.getenv("EMAIL_DESTINATARIOS")
@@ -52,35 +55,47 @@ def formatar_modalidade(modalidade):
     )
     return texto
 
-def executar_notebook():
-    print('🚀 Executando notebook...')
+def executar_monitoramento():
+    """Roda o monitoramento e as entregas no próprio processo.
+
+    As entregas rodam ao mesmo tempo, cada uma com seu prazo e suas
+    tentativas. Cada entrega é uma etapa do pipeline: numa nova execução
+    depois de uma falha, só as entregas que falharam são refeitas.
+    """
+    print('🚀 Executando monitoramento...')
     try:
-        pm.execute_notebook(NOTEBOOK_PATH, NOTEBOOK_PATH)
-        print('✅ Notebook executado.')
+        executar(
+            saida_dir=SAIDA_DIR,
+            entregas={
+                'copia_publica': canal(lambda resultado: copiar_para_publico(), timeout=120, tentativas=3, espera=5),
+                'email_outlook': canal(lambda resultado: enviar_email(resultado['metricas']), timeout=180),
+            },
+        )
+        print('✅ Monitoramento executado.')
     except Exception as e:
-        print(f'❌ Erro ao executar notebook: {e}')
+        print(f'❌ Erro ao executar monitoramento: {e}')
 
 def copiar_para_publico():
     if os.path.exists(RELATORIO_PATH):
         try:
             shutil.copy(RELATORIO_PATH, DESTINO_FINAL)
             print(f'📁 Relatório copiado para pasta pública:\n{DESTINO_FINAL}')
-        except PermissionError:
-            print(f'⚠️ Permissão negada ao copiar o arquivo. Verifique se ele está aberto: {RELATORIO_PATH}')
+        except PermissionError as e:
+            raise PermissionError(f'Permissão negada ao copiar o arquivo. Verifique se ele está aberto: {RELATORIO_PATH}') from e
     else:
-        print(f'❌ Relatório não encontrado em: {RELATORIO_PATH}')
+        raise FileNotFoundError(f'Relatório não encontrado em: {RELATORIO_PATH}')
 
-def enviar_email():
+def enviar_email(metricas=None):
     if not os.path.exists(RELATORIO_PATH):
-        print(f'❌ Arquivo para envio não encontrado: {RELATORIO_PATH}')
-        return
+        raise FileNotFoundError(f'Arquivo para envio não encontrado: {RELATORIO_PATH}')
 
-    try:
-        with open(METRICAS_PATH, encoding='utf-8') as f:
-            metricas = json.load(f)
-    except Exception as e:
-        print(f'❌ Erro ao carregar métricas: {e}')
-        return
+    # Sem as métricas da execução, usa as gravadas pela última execução
+    if metricas is None:
+        try:
+            with open(METRICAS_PATH, encoding='utf-8') as f:
+                metricas = json.load(f)
+        except Exception as e:
+            raise RuntimeError(f'Erro ao carregar métricas: {e}') from e
 
     resumo_html = (
         f"<p><strong>Resumo por modalidade:</strong></p>"
@@ -91,6 +106,8 @@ def enviar_email():
         f"<p>📎 Para mais detalhes, acesse o relatório completo em anexo<br>"
     )
 
+    # A entrega roda numa thread própria, que precisa iniciar o COM
+    pythoncom.CoInitialize()
     try:
         outlook = win32com.client.Dispatch('Outlook.Application')
         email = outlook.CreateItem(0)
@@ -114,10 +131,14 @@ def enviar_email():
             'assinatura_img',
         )
 
-        email.Send()
+        with medir('entrega.outlook', item='Outlook.Application') as medida:
+            email.Send()
+            medida['bytes_saida'] = os.path.getsize(RELATORIO_PATH)
         print('📤 E-mail enviado com sucesso com resumo humanizado.')
     except Exception as e:
-        print(f'❌ Erro ao enviar e-mail: {e}')
+        raise RuntimeError(f'Erro ao enviar e-mail: {e}') from e
+    finally:
+        pythoncom.CoUninitialize()
 
 def limpar_arquivos_em_uso(pasta):
     for arquivo in os.listdir(pasta):
@@ -135,6 +156,4 @@ def limpar_arquivos_em_uso(pasta):
 
 if __name__ == '__main__':
     limpar_arquivos_em_uso(r'C:\Users\Datasus\Downloads')
-    executar_notebook()
-    copiar_para_publico()
-    enviar_email()
+    executar_monitoramento()
@@ -2,17 +2,19 @@ import os
 import shutil
 import smtplib
 from datetime import datetime
-import papermill as pm
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 from email.mime.base import MIMEBase
 from email import encoders
 
+from monitoramento.entregas import canal
+from monitoramento.medicoes import medir
+from monitoramento.pipeline import executar
+
 # ======================================================
 # CONFIGURAÇÕES GERAIS
 # ======================================================
-NOTEBOOK_PATH = 'credito_modalidade.ipynb'
 SAIDA_DIR = 'saida'
 ARQUIVO_NOME = f"{datetime.today().strftime('%Y%m%d')}_MONITORAMENTO DE COMPONENTE.xlsx"
 RELATORIO_PATH = os.path.join(SAIDA_DIR, ARQUIVO_NOME)
@@ -34,23 +36,30 @@ ASSINATURA_IMG = os.path.abspath("img/assinatura.jpg")
 # FUNÇÕES
 # ======================================================
 
-def executar_notebook():
-    print("🚀 Executando notebook...")
+def executar_monitoramento():
+    # As entregas rodam ao mesmo tempo; cada uma é uma etapa do pipeline: depois de uma falha, só ela é refeita
+    print("🚀 Executando monitoramento...")
     try:
-        pm.execute_notebook(NOTEBOOK_PATH, NOTEBOOK_PATH)
-        print("✅ Notebook executado com sucesso.")
+        executar(
+            saida_dir=SAIDA_DIR,
+            entregas={
+                "copia_publica": canal(lambda resultado: copiar_para_publico(), timeout=120, tentativas=3, espera=5),
+                "email_gmail": canal(lambda resultado: enviar_email(), timeout=180),
+            },
+        )
+        print("✅ Monitoramento executado com sucesso.")
     except Exception as e:
-        print(f"❌ Erro ao executar notebook: {e}")
+        print(f"❌ Erro ao executar monitoramento: {e}")
 
 def copiar_para_publico():
     if os.path.exists(RELATORIO_PATH):
         try:
             shutil.copy(RELATORIO_PATH, DESTINO_FINAL)
             print(f"📁 Relatório copiado para pasta pública:\n{DESTINO_FINAL}")
-        except PermissionError:
-            print(f"⚠️ Arquivo em uso: {RELATORIO_PATH}")
+        except PermissionError as e:
+            raise PermissionError(f"Arquivo em uso: {RELATORIO_PATH}") from e
     else:
-        print(f"❌ Relatório não encontrado em: {RELATORIO_PATH}")
+        raise FileNotFoundError(f"Relatório não encontrado em: {RELATORIO_PATH}")
 
 def limpar_arquivos_em_uso(pasta):
     for arquivo in os.listdir(pasta):
@@ -64,8 +73,7 @@ def limpar_arquivos_em_uso(pasta):
 
 def enviar_email():
     if not os.path.exists(RELATORIO_PATH):
-        print(f"❌ Arquivo para envio não encontrado: {RELATORIO_PATH}")
-        return
+        raise FileNotFoundError(f"Arquivo para envio não encontrado: {RELATORIO_PATH}")
 
     print("📧 Preparando e-mail para envio via Gmail...")
 
@@ -107,12 +115,13 @@ def enviar_email():
 
     # Envia o e-mail via Gmail SMTP
     try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as servidor:
+        with medir("entrega.smtp", item="smtp.gmail.com") as medida, smtplib.SMTP_SSL("smtp.gmail.com", 465) as servidor:
             servidor.login(EMAIL_REMETENTE, SENHA_APP)
             servidor.send_message(msg)
+            medida["bytes_saida"] = len(msg.as_bytes())
         print("📤 E-mail enviado com sucesso via Gmail.")
     except Exception as e:
-        print(f"❌ Erro ao enviar e-mail: {e}")
+        raise RuntimeError(f"Erro ao enviar e-mail: {e}") from e
 
 # ======================================================
 # EXECUÇÃO PRINCIPAL
@@ -120,6 +129,4 @@ def enviar_email():
 
 if __name__ == "__main__":
     limpar_arquivos_em_uso(r"C:\Users\Datasus\Downloads")
-    executar_notebook()
-    copiar_para_publico()
-    enviar_email()
+    executar_monitoramento()
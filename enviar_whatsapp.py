@@ -4,19 +4,21 @@ import os
 import time
 import urllib.parse
 import pyautogui
-import papermill as pm
 from dotenv import load_dotenv
 import ast
 from datetime import datetime
 import subprocess
 
+from monitoramento.entregas import canal
+from monitoramento.medicoes import medir
+from monitoramento.pipeline import executar
+
 # ==============================================================
 # CONFIGURAÇÕES GERAIS
 # ==============================================================
 load_dotenv()
 logging.basicConfig(level=logging.ERROR)
 
-NOTEBOOK_PATH = 'credito_modalidade.ipynb'
 SAIDA_DIR = 'saida'
 METRICS_PATH = os.path.join(SAIDA_DIR, 'whatsapp_metrics.json')
 CAMINHO_IMAGEM_BOTAO_ENVIAR = os.path.join('img', 'btn_enviar.png')
@@ -38,13 +40,27 @@ def obter_saudacao():
         return 'BOA NOITE'
 
 
-def executar_notebook():
-    print('🚀 1/3: Executando notebook...')
+def executar_monitoramento():
+    """Roda o monitoramento e o envio no próprio processo, com as métricas em memória.
+
+    O envio é uma etapa do pipeline: se falhar, a próxima execução retoma
+    direto nele, sem refazer downloads e planilha.
+    """
+    print('🚀 1/3: Executando monitoramento...')
     try:
-        pm.execute_notebook(NOTEBOOK_PATH, NOTEBOOK_PATH)
-        print('✅ Notebook executado e métricas geradas.')
+        executar(
+            saida_dir=SAIDA_DIR,
+            # Repetir o envio pela interface mandaria a mensagem de novo aos primeiros contatos
+            entregas={
+                'whatsapp': canal(
+                    lambda resultado: enviar_whatsapp_nao_interativo_automatico_visual(resultado['metricas']),
+                    timeout=90 * len(WHATSAPP_CONTATOS) + 60,
+                    tentativas=1,
+                )
+            },
+        )
     except Exception as e:
-        raise RuntimeError(f'Erro ao executar notebook: {e}')
+        raise RuntimeError(f'Erro ao executar monitoramento: {e}')
 
 
 def carregar_metricas():
@@ -90,13 +106,15 @@ def criar_mensagem_detalhada(metricas, nome_contato):
 # ==============================================================
 # FUNÇÃO PRINCIPAL DE ENVIO (COM JANELA MAXIMIZADA)
 # ==============================================================
-def enviar_whatsapp_nao_interativo_automatico_visual():
+def enviar_whatsapp_nao_interativo_automatico_visual(metricas=None):
     print('📢 3/3: ENVIANDO WHATSAPP via PyAutoGUI + Chrome (janela maximizada)...')
 
     pyautogui.FAILSAFE = True
     pyautogui.PAUSE = 0.7
 
-    metricas = carregar_metricas()
+    # Sem as métricas da execução, lê as gravadas pela última execução
+    if metricas is None:
+        metricas = carregar_metricas()
 
     for idx, contato in enumerate(WHATSAPP_CONTATOS, 1):
         nome = contato['nome']
@@ -105,59 +123,61 @@ def enviar_whatsapp_nao_interativo_automatico_visual():
         mensagem_codificada = urllib.parse.quote(mensagem_final)
         url = f'https://web.whatsapp.com/send?phone={numero}&text={mensagem_codificada}'
 
-        print(f'\n📤 ({idx}/{len(WHATSAPP_CONTATOS)}) Enviando para {nome} ({numero})...')
-
-        # ✅ Abre Chrome em nova janela **maximizada**
-        cmd = f'powershell -Command "Start-Process chrome \'{url}\' -WindowStyle Maximized"'
-        subprocess.Popen(cmd, shell=True)
-
-        print('⏳ Aguardando carregamento do WhatsApp Web (12s)...')
-        time.sleep(12)
+        with medir('entrega.whatsapp_contato', item=nome) as medida:
+            print(f'\n📤 ({idx}/{len(WHATSAPP_CONTATOS)}) Enviando para {nome} ({numero})...')
+            medida['bytes_saida'] = len(mensagem_final.encode('utf-8'))
 
-        # 🔹 Garante foco e força renderização visual
-        pyautogui.hotkey('alt', 'tab')
-        time.sleep(1)
+            # ✅ Abre Chrome em nova janela **maximizada**
+            cmd = f'powershell -Command "Start-Process chrome \'{url}\' -WindowStyle Maximized"'
+            subprocess.Popen(cmd, shell=True)
 
-        screen_w, screen_h = pyautogui.size()
-        pyautogui.moveTo(screen_w // 2, screen_h // 2, duration=0.5)
-        pyautogui.moveRel(80, 0, duration=0.3)
-        pyautogui.moveRel(-160, 0, duration=0.3)
-        pyautogui.scroll(-400)
-        time.sleep(1)
+            print('⏳ Aguardando carregamento do WhatsApp Web (12s)...')
+            time.sleep(12)
 
-        # 🔹 Localiza botão "Enviar" por imagem
-        print("🔎 Procurando o botão 'Enviar' (até 30s)...")
-        send_center = None
-        start_time = time.time()
-
-        while time.time() - start_time < 30:
-            try:
-                send_center = (
-                    pyautogui.locateCenterOnScreen(CAMINHO_IMAGEM_BOTAO_ENVIAR, confidence=0.9, grayscale=True)
-                    or pyautogui.locateCenterOnScreen(CAMINHO_IMAGEM_BOTAO_ENVIAR, confidence=0.9, grayscale=True)
-                )
-                if send_center:
-                    break
-            except Exception as e:
-                print(f'(debug locateOnScreen) erro: {e}')
+            # 🔹 Garante foco e força renderização visual
+            pyautogui.hotkey('alt', 'tab')
             time.sleep(1)
 
-        if send_center:
-            x, y = send_center
-            print(f'🟢 Botão encontrado em ({x}, {y}). Clicando...')
-            pyautogui.moveTo(x, y, duration=0.3)
-            pyautogui.click()
-            print(f'✅ Mensagem enviada para {nome}.')
-        else:
-            print('⚠️ Botão não encontrado. Usando fallback (ENTER)...')
-            pyautogui.press('enter')
-            print(f'✅ Mensagem enviada para {nome} (via ENTER).')
+            screen_w, screen_h = pyautogui.size()
+            pyautogui.moveTo(screen_w // 2, screen_h // 2, duration=0.5)
+            pyautogui.moveRel(80, 0, duration=0.3)
+            pyautogui.moveRel(-160, 0, duration=0.3)
+            pyautogui.scroll(-400)
+            time.sleep(1)
 
-        # 🔹 Fecha aba
-        time.sleep(4)
-        pyautogui.hotkey('alt', 'f4')
-        print(f'🪟 Aba de {nome} fechada.')
-        time.sleep(3)
+            # 🔹 Localiza botão "Enviar" por imagem
+            print("🔎 Procurando o botão 'Enviar' (até 30s)...")
+            send_center = None
+            start_time = time.time()
+
+            while time.time() - start_time < 30:
+                try:
+                    send_center = (
+                        pyautogui.locateCenterOnScreen(CAMINHO_IMAGEM_BOTAO_ENVIAR, confidence=0.9, grayscale=True)
+                        or pyautogui.locateCenterOnScreen(CAMINHO_IMAGEM_BOTAO_ENVIAR, confidence=0.9, grayscale=True)
+                    )
+                    if send_center:
+                        break
+                except Exception as e:
+                    print(f'(debug locateOnScreen) erro: {e}')
+                time.sleep(1)
+
+            if send_center:
+                x, y = send_center
+                print(f'🟢 Botão encontrado em ({x}, {y}). Clicando...')
+                pyautogui.moveTo(x, y, duration=0.3)
+                pyautogui.click()
+                print(f'✅ Mensagem enviada para {nome}.')
+            else:
+                print('⚠️ Botão não encontrado. Usando fallback (ENTER)...')
+                pyautogui.press('enter')
+                print(f'✅ Mensagem enviada para {nome} (via ENTER).')
+
+            # 🔹 Fecha aba
+            time.sleep(4)
+            pyautogui.hotkey('alt', 'f4')
+            print(f'🪟 Aba de {nome} fechada.')
+            time.sleep(3)
 
     print('\n🎉 PROCESSO CONCLUÍDO!')
 
@@ -169,7 +189,6 @@ if __name__ == '__main__':
     try:
         print("🤖 INICIANDO ORQUESTRAÇÃO DE ENVIO AUTOMÁTICO WHATSAPP")
         print("=" * 50)
-        executar_notebook()
-        enviar_whatsapp_nao_interativo_automatico_visual()
+        executar_monitoramento()
     except Exception as e:
         print(f"❌ PROCESSO INTERROMPIDO: {e}")
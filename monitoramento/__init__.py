@@ -0,0 +1 @@
+"""Rotinas de apoio ao BOT de monitoramento do painel INVESTSUS."""
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import zipfile
+from datetime import datetime, timedelta
+
+import openpyxl
+
+from monitoramento.painel import EXPORTACOES
+
+# ======================================================
+# CONFIGURAÇÕES DO CACHE
+# ======================================================
+# downloads/cache/<exportação>/<sha256>.xlsx + indice.json com o histórico
+CACHE_DIR = os.path.join(os.getcwd(), 'downloads', 'cache')
+INDICE_NOME = 'indice.json'
+# Partes do .xlsx com os dados; o resto (docProps, datas das entradas do zip)
+# muda a cada exportação mesmo com os dados iguais
+PARTES_DOS_DADOS = re.compile(r'xl/(worksheets/[^/]+\.xml|sharedStrings\.xml|styles\.xml)')
+
+
+def id_exportacao(arquivo):
+    """'credito_financeiro_aba1.xlsx' -> 'credito_financeiro_aba1'"""
+    return os.path.splitext(os.path.basename(arquivo))[0]
+
+
+def calcular_hash(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def hash_do_conteudo(caminho):
+    """sha256 das abas, dos textos compartilhados e dos estilos de um .xlsx.
+
+    Duas exportações com os mesmos dados têm o mesmo hash, mesmo exportadas
+    em dias diferentes. Arquivos que não são zip caem no hash dos bytes.
+    """
+    try:
+        with zipfile.ZipFile(caminho) as pacote:
+            sha = hashlib.sha256()
+            for nome in sorted(n for n in pacote.namelist() if PARTES_DOS_DADOS.fullmatch(n)):
+                sha.update(nome.encode('utf-8') + b'\0')
+                with pacote.open(nome) as parte:
+                    for bloco in iter(lambda: parte.read(1024 * 1024), b''):
+                        sha.update(bloco)
+            return sha.hexdigest()
+    except zipfile.BadZipFile:
+        return calcular_hash(caminho)
+
+
+def carregar_indice(cache_dir=CACHE_DIR):
+    caminho = os.path.join(cache_dir, INDICE_NOME)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _salvar_indice(indice, cache_dir):
+    caminho = os.path.join(cache_dir, INDICE_NOME)
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, indent=4)
+    os.replace(temporario, caminho)
+
+
+def _contar_linhas(caminho):
+    wb = openpyxl.load_workbook(caminho, read_only=True)
+    try:
+        ws = wb.worksheets[0]
+        linhas = ws.max_row
+        if linhas is None:
+            # Sem <dimension> na aba (comum em arquivos gerados): conta lendo as linhas
+            linhas = sum(1 for _ in ws.iter_rows(values_only=True))
+        return max(linhas - 1, 0)
+    finally:
+        wb.close()
+
+
+# ======================================================
+# REGISTRO DAS EXPORTAÇÕES
+# ======================================================
+def registrar_exportacao(caminho, cache_dir=CACHE_DIR):
+    """Guarda o arquivo no cache pelo hash dos dados (`hash_do_conteudo`) e atualiza o histórico.
+
+    Retorna um dicionário com o hash e se o conteúdo mudou desde a última
+    execução.
+    """
+    exportacao = id_exportacao(caminho)
+    pasta = os.path.join(cache_dir, exportacao)
+    os.makedirs(pasta, exist_ok=True)
+
+    indice = carregar_indice(cache_dir)
+    registro = indice.setdefault(exportacao, {'atual': None, 'historico': []})
+
+    hash_arquivo = hash_do_conteudo(caminho)
+    caminho_cache = os.path.join(pasta, f'{hash_arquivo}.xlsx')
+    alterado = hash_arquivo != registro['atual']
+
+    if not os.path.exists(caminho_cache):
+        shutil.copyfile(caminho, caminho_cache)
+
+    agora = datetime.now().isoformat(timespec='seconds')
+    if alterado:
+        registro['historico'].append(
+            {
+                'hash': hash_arquivo,
+                'buscado_em': agora,
+                'tamanho': os.path.getsize(caminho),
+                'linhas': _contar_linhas(caminho),
+            }
+        )
+        registro['atual'] = hash_arquivo
+    registro['ultima_busca'] = agora
+
+    _salvar_indice(indice, cache_dir)
+    return {'hash': hash_arquivo, 'alterado': alterado, 'caminho_cache': caminho_cache}
+
+
+def registrar_exportacoes(download_dir, exportacoes=EXPORTACOES, cache_dir=CACHE_DIR):
+    resultado = {}
+    for exportacao in exportacoes:
+        info = registrar_exportacao(os.path.join(download_dir, exportacao['arquivo']), cache_dir)
+        resultado[id_exportacao(exportacao['arquivo'])] = info
+        situacao = '🆕 alterado' if info['alterado'] else '♻️ sem alteração'
+        print(f"🗃️ {exportacao['arquivo']}: {situacao} ({info['hash'][:12]})")
+    return resultado
+
+
+# ======================================================
+# REAPROVEITAMENTO
+# ======================================================
+def cache_recente(validade_min, exportacoes=EXPORTACOES, cache_dir=CACHE_DIR):
+    """Indica se todas as exportações foram buscadas há menos de `validade_min` minutos."""
+    if validade_min <= 0:
+        return False
+    indice = carregar_indice(cache_dir)
+    limite = datetime.now() - timedelta(minutes=validade_min)
+    for exportacao in exportacoes:
+        registro = indice.get(id_exportacao(exportacao['arquivo']))
+        if not registro or not registro.get('ultima_busca'):
+            return False
+        if datetime.fromisoformat(registro['ultima_busca']) < limite:
+            return False
+    return True
+
+
+def restaurar_do_cache(download_dir, exportacoes=EXPORTACOES, cache_dir=CACHE_DIR):
+    """Copia a versão atual de cada exportação do cache para `download_dir`."""
+    indice = carregar_indice(cache_dir)
+    for exportacao in exportacoes:
+        nome = id_exportacao(exportacao['arquivo'])
+        shutil.copyfile(
+            os.path.join(cache_dir, nome, f"{indice[nome]['atual']}.xlsx"),
+            os.path.join(download_dir, exportacao['arquivo']),
+        )
+    print('♻️ Exportações recentes restauradas do cache, sem novo download.')
+
@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from monitoramento.esquemas import CHAVE_PROPOSTA
+from monitoramento.medicoes import bytes_em_memoria, medir
+
+# ======================================================
+# CORREÇÕES MANUAIS (STATUS E CNES)
+# ======================================================
+# Arquivo versionado com as regras; incluir uma proposta não exige mexer no código
+CORRECOES_PATH = os.path.join(os.getcwd(), 'model', 'correcoes_manuais.json')
+
+
+def modalidade_da_exportacao(nome):
+    """'credito_financeiro_aba1' -> 'credito_financeiro'"""
+    return nome.rsplit('_aba', 1)[0]
+
+
+def carregar_correcoes(caminho=CORRECOES_PATH):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compilar_correcoes(correcoes):
+    """Transforma as regras do arquivo em índices de hash.
+
+    Para o status, um índice por modalidade (proposta -> status, regra);
+    se a mesma proposta aparece em mais de uma regra, vale a última do
+    arquivo, como acontecia com as células executadas em sequência. Para o
+    CNES, um índice CNPJ -> CNES.
+    """
+    linhas = []
+    excecoes = {}
+    for regra in correcoes.get('status', []):
+        if regra.get('exceto_status'):
+            excecoes[regra['regra']] = regra['exceto_status']
+        for modalidade in regra['modalidades']:
+            for entrada in regra['propostas']:
+                if entrada.get('ativo', True):
+                    linhas.append((modalidade, entrada['proposta'], regra['status'], regra['regra']))
+
+    tabela = pd.DataFrame(linhas, columns=['modalidade', CHAVE_PROPOSTA, 'status', 'regra'])
+    tabela[CHAVE_PROPOSTA] = tabela[CHAVE_PROPOSTA].astype('UInt64')
+    status = {
+        modalidade: grupo.drop_duplicates(CHAVE_PROPOSTA, keep='last').set_index(CHAVE_PROPOSTA)[['status', 'regra']]
+        for modalidade, grupo in tabela.groupby('modalidade')
+    }
+
+    cnes = pd.DataFrame(correcoes.get('cnes_por_cnpj', []), columns=['cnpj', 'cnes'])
+    return {
+        'versao': correcoes.get('versao'),
+        'status': status,
+        'excecoes': excecoes,
+        'cnes': pd.Series(
+            cnes['cnes'].astype('Int64').to_numpy(),
+            index=pd.Index(cnes['cnpj'].astype('Int64'), name='CNPJ'),
+            name='CNES',
+        ),
+    }
+
+
+def _aplicar_status(df, indice, excecoes):
+    """Aplica o índice de status em `df` e retorna as linhas alteradas por regra."""
+    posicoes = indice.index.get_indexer(df[CHAVE_PROPOSTA])
+    casou = posicoes >= 0
+    regras = indice['regra'].to_numpy()[posicoes]
+    novo_status = indice['status'].to_numpy()[posicoes]
+
+    for regra, exceto in excecoes.items():
+        casou &= ~((regras == regra) & df['Status da Proposta'].isin(exceto).to_numpy())
+    if not casou.any():
+        return {}
+
+    coluna = df['Status da Proposta']
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        novos = sorted(set(novo_status[casou]) - set(coluna.cat.categories))
+        if novos:
+            df['Status da Proposta'] = coluna.cat.add_categories(novos)
+    df.loc[casou, 'Status da Proposta'] = novo_status[casou]
+
+    nomes, contagens = np.unique(regras[casou], return_counts=True)
+    return dict(zip(nomes, contagens.tolist()))
+
+
+def _aplicar_cnes(exportacoes, cnes_por_cnpj):
+    """CNES pelo CNPJ nas abas de propostas (as matrizes recebem pela dimensão)."""
+    acertos = {}
+    for nome, df in exportacoes.items():
+        if 'CNPJ' not in df.columns:
+            continue
+        novo = df['CNPJ'].map(cnes_por_cnpj)
+        acertos[nome] = int(novo.notna().sum())
+        df['CNES'] = novo.astype('Int64').fillna(df['CNES'])
+    return acertos
+
+
+def aplicar_correcoes(exportacoes, correcoes=None):
+    """Aplica as correções manuais nos DataFrames de `exportacoes`, no lugar.
+
+    `exportacoes` é o dicionário {exportação: DataFrame} de `ler_exportacoes`
+    e `correcoes` o resultado de `compilar_correcoes` (por padrão, o arquivo
+    model/correcoes_manuais.json). Retorna um DataFrame com as linhas
+    alteradas por regra e exportação.
+    """
+    if correcoes is None:
+        correcoes = compilar_correcoes(carregar_correcoes())
+
+    relatorio = []
+    for nome, df in exportacoes.items():
+        indice = correcoes['status'].get(modalidade_da_exportacao(nome))
+        if indice is None:
+            continue
+        with medir('correcoes.status', item=nome) as medida:
+            alteradas = _aplicar_status(df, indice, correcoes['excecoes'])
+            medida.update(linhas=len(df), bytes_entrada=bytes_em_memoria(df))
+        for regra, linhas in alteradas.items():
+            relatorio.append({'regra': regra, 'exportacao': nome, 'linhas': linhas})
+    with medir('correcoes.cnes') as medida:
+        acertos = _aplicar_cnes(exportacoes, correcoes['cnes'])
+        medida['linhas'] = sum(acertos.values())
+    for nome, linhas in acertos.items():
+        relatorio.append({'regra': 'cnes_por_cnpj', 'exportacao': nome, 'linhas': linhas})
+    relatorio = pd.DataFrame(relatorio, columns=['regra', 'exportacao', 'linhas'])
+
+    print(f"🛠️ Correções manuais aplicadas (versão {correcoes['versao']}):")
+    regras = [r for indice in correcoes['status'].values() for r in indice['regra'].unique()]
+    for regra in dict.fromkeys(regras + ['cnes_por_cnpj']):
+        da_regra = relatorio[relatorio['regra'] == regra]
+        if da_regra.empty or not da_regra['linhas'].sum():
+            print(f'   ⚠️ {regra}: nenhuma linha alterada')
+            continue
+        detalhe = ', '.join(f"{e}: {n}" for e, n in zip(da_regra['exportacao'], da_regra['linhas']))
+        print(f"   -> {regra}: {da_regra['linhas'].sum()} linhas ({detalhe})")
+    return relatorio
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from monitoramento.correcoes import modalidade_da_exportacao
+from monitoramento.esquemas import CHAVE_PROPOSTA
+
+# ======================================================
+# DIMENSÃO DE PROPOSTAS
+# ======================================================
+# Atributos de cada proposta, tirados da aba1 (uma linha por proposta) de
+# cada modalidade e levados às matrizes de oferta sem merge
+COLUNAS_DIMENSAO = ['Entidade', 'CNES', 'CNPJ', 'UF', 'Município', 'Status da Proposta']
+
+
+def avisar(texto, mensagens=None):
+    """Imprime `texto` ou, com uma lista `mensagens`, guarda para imprimir depois.
+
+    As modalidades são tratadas em threads; os avisos de cada uma são
+    impressos juntos no fim, sem se misturar com os da outra.
+    """
+    if mensagens is None:
+        print(texto)
+    else:
+        mensagens.append(texto)
+
+
+def construir_dimensao(exportacoes, mensagens=None):
+    """Monta {modalidade: DataFrame indexado pela proposta} a partir das aba1.
+
+    Levanta ValueError se alguma proposta aparece mais de uma vez: o merge
+    antigo duplicaria silenciosamente as linhas das matrizes.
+    """
+    dimensao = {}
+    for nome, df in exportacoes.items():
+        if not nome.endswith('_aba1'):
+            continue
+        tabela = df.set_index(CHAVE_PROPOSTA)[[c for c in COLUNAS_DIMENSAO if c in df.columns]]
+        repetidas = tabela.index[tabela.index.duplicated()].unique()
+        if len(repetidas):
+            raise ValueError(
+                f'{nome}: {len(repetidas)} proposta(s) repetida(s) na dimensão, ex.: {repetidas[:5].tolist()}'
+            )
+        dimensao[modalidade_da_exportacao(nome)] = tabela
+        avisar(f'🧭 Dimensão {modalidade_da_exportacao(nome)}: {len(tabela)} propostas.', mensagens)
+    return dimensao
+
+
+def buscar(df, tabela, coluna):
+    """Valores de `coluna` da dimensão para cada linha de `df`, por posição.
+
+    Equivale a um merge left pela proposta, mas com uma única busca no
+    índice e um take; propostas ausentes da dimensão ficam nulas.
+    """
+    posicoes = tabela.index.get_indexer(df[CHAVE_PROPOSTA])
+    return pd.Series(tabela[coluna].array.take(posicoes, allow_fill=True), index=df.index, name=coluna)
+
+
+def propagar_cnes(exportacoes, dimensao, mensagens=None):
+    """Leva o CNES (já corrigido pelo CNPJ) da dimensão para as matrizes de oferta."""
+    for nome, df in exportacoes.items():
+        tabela = dimensao.get(modalidade_da_exportacao(nome))
+        if nome.endswith('_aba1') or tabela is None or 'CNES' not in df.columns:
+            continue
+        cnes = buscar(df, tabela, 'CNES')
+        df['CNES'] = cnes.fillna(df['CNES'])
+        avisar(f'✅ {nome}: {cnes.notna().sum()} linhas com o CNES da dimensão.', mensagens)
@@ -0,0 +1,218 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.webdriver.edge.options import Options
+from selenium.webdriver.edge.service import Service
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from monitoramento.esperas import (
+    aguardar_download,
+    aguardar_pagina_carregada,
+    aguardar_qlik_pronto,
+    listar_arquivos,
+)
+from monitoramento.medicoes import medir
+from monitoramento.painel import EXPORTACOES, NOMES_ABAS, URL_PAINEL
+from monitoramento.perfil_edge import (
+    CACHE_EDGE_DIR,
+    PREFERENCIAS_ENXUTAS,
+    argumentos_edge,
+    bloquear_recursos,
+    medir_carregamento,
+)
+from monitoramento.pool_navegadores import sessao_do_pool
+
+DRIVER_PATH = os.path.join(os.getcwd(), 'web', 'msedgedriver.exe')
+
+
+# ======================================================
+# NAVEGADOR
+# ======================================================
+def criar_driver(download_dir, driver_path=DRIVER_PATH, enxuto=True, cache_dir=None):
+    """Inicializa um Edge headless que salva os downloads em `download_dir`.
+
+    Com `enxuto`, desativa extensões e rede em segundo plano, usa o cache em
+    disco `cache_dir` (mantido entre execuções) e bloqueia fontes, imagens,
+    analytics e mapas que o bot não usa.
+    """
+    os.makedirs(download_dir, exist_ok=True)
+
+    edge_options = Options()
+    for argumento in argumentos_edge(enxuto, cache_dir):
+        edge_options.add_argument(argumento)
+
+    preferencias = {
+        'download.default_directory': download_dir,
+        'download.prompt_for_download': False,
+        'directory_upgrade': True,
+        'safebrowsing.enabled': True,
+    }
+    if enxuto:
+        preferencias.update(PREFERENCIAS_ENXUTAS)
+    edge_options.add_experimental_option('prefs', preferencias)
+
+    service = Service(executable_path=driver_path)
+    driver = webdriver.Edge(service=service, options=edge_options)
+    if enxuto:
+        bloquear_recursos(driver)
+    return driver
+
+
+def abrir_painel(driver):
+    driver.get(URL_PAINEL)
+    aguardar_pagina_carregada(driver)
+    print(f'🌐 Página acessada: {URL_PAINEL}')
+    return medir_carregamento(driver)
+
+
+def abrir_aba(driver, xpath_aba, xpath_objeto):
+    """Abre a aba do menu e aguarda o objeto `xpath_objeto` ficar pronto."""
+    print(f'📂 Acessando aba: {NOMES_ABAS.get(xpath_aba, xpath_aba)}')
+    aba = aguardar_qlik_pronto(driver, xpath_aba)
+    aba.click()
+    aguardar_qlik_pronto(driver, xpath_objeto)
+
+
+# ======================================================
+# DOWNLOADS
+# ======================================================
+def baixar_e_renomear(driver, download_dir, xpath_botao, nome_destino, destino_dir=None):
+    """Clica no botão de exportação e move o .xlsx baixado para `destino_dir/nome_destino`.
+
+    Retorna o tempo gasto no download, em segundos.
+    """
+    destino_dir = destino_dir or download_dir
+    print(f'📥 Iniciando download para: {nome_destino}')
+    t0 = time.perf_counter()
+    with medir('download.baixar_e_renomear', item=nome_destino) as medida:
+        # Arquivos já existentes na pasta antes do clique
+        arquivos_antes = listar_arquivos(download_dir)
+
+        # Clica no botão de download assim que o objeto do Qlik estiver pronto
+        botao = aguardar_qlik_pronto(driver, xpath_botao)
+        botao.click()
+
+        # Aceita o alerta
+        WebDriverWait(driver, 10).until(EC.alert_is_present())
+        alerta = driver.switch_to.alert
+        alerta.accept()
+
+        # Aguarda o download finalizar (sem .crdownload e com tamanho estável)
+        arquivo_baixado = aguardar_download(download_dir, arquivos_antes)
+        caminho_novo = os.path.join(destino_dir, nome_destino)
+
+        # Substitui o arquivo de destino, se já existir
+        os.replace(arquivo_baixado, caminho_novo)
+        medida['bytes_saida'] = os.path.getsize(caminho_novo)
+
+    duracao = time.perf_counter() - t0
+    print(f'📦 Arquivo renomeado para: {nome_destino} ({duracao:.1f}s)\n')
+    return duracao
+
+
+def _baixar_com_driver(driver, lote, sessao_dir, destino_dir):
+    tempos = []
+    aba_atual = None
+    for exportacao in lote:
+        if exportacao['aba'] != aba_atual:
+            abrir_aba(driver, exportacao['aba'], exportacao['xpath'])
+            aba_atual = exportacao['aba']
+        duracao = baixar_e_renomear(
+            driver,
+            sessao_dir,
+            exportacao['xpath'],
+            exportacao['arquivo'],
+            destino_dir,
+        )
+        tempos.append({'arquivo': exportacao['arquivo'], 'segundos': duracao})
+    return tempos
+
+
+def _baixar_lote(lote, sessao_dir, destino_dir, usar_pool=False):
+    """Baixa uma lista de exportações usando uma única sessão do Edge.
+
+    Com `usar_pool`, a sessão é retirada do pool de navegadores aquecidos
+    (`monitoramento.pool_navegadores`) em vez de abrir um Edge novo.
+    """
+    if usar_pool:
+        with sessao_do_pool(sessao_dir) as driver:
+            if not driver.current_url.startswith(URL_PAINEL.rstrip('#')):
+                abrir_painel(driver)
+            return _baixar_com_driver(driver, lote, sessao_dir, destino_dir)
+
+    driver = criar_driver(
+        sessao_dir, cache_dir=os.path.join(CACHE_EDGE_DIR, os.path.basename(sessao_dir))
+    )
+    try:
+        abrir_painel(driver)
+        return _baixar_com_driver(driver, lote, sessao_dir, destino_dir)
+    finally:
+        driver.quit()
+
+
+def baixar_exportacoes(download_dir, max_workers=1, exportacoes=EXPORTACOES, usar_pool=False):
+    """Baixa as exportações do painel com `max_workers` sessões do Edge em paralelo.
+
+    Cada sessão usa o seu próprio diretório (`download_dir/sessao_N`) e os
+    arquivos finais são movidos para `download_dir`. Com `max_workers=1` o
+    comportamento é o download sequencial em um único navegador. Com
+    `usar_pool`, as sessões vêm do pool de navegadores aquecidos.
+    """
+    os.makedirs(download_dir, exist_ok=True)
+    max_workers = max(1, min(max_workers, len(exportacoes)))
+
+    # Distribui as exportações entre as sessões, mantendo a ordem das abas
+    lotes = [exportacoes[i::max_workers] for i in range(max_workers)]
+
+    origem = 'do pool' if usar_pool else 'do Edge'
+    print(f'🚀 Usando {max_workers} sessão(ões) {origem} para {len(exportacoes)} downloads.')
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [
+            executor.submit(
+                _baixar_lote,
+                lote,
+                os.path.join(download_dir, f'sessao_{n}'),
+                download_dir,
+                usar_pool,
+            )
+            for n, lote in enumerate(lotes, start=1)
+        ]
+        tempos = [t for futuro in futuros for t in futuro.result()]
+
+    print('⏱️ Tempo de cada download:')
+    for t in tempos:
+        print(f"   -> {t['arquivo']}: {t['segundos']:.1f}s")
+    print(f'✅ Downloads concluídos em {time.perf_counter() - t0:.1f}s.')
+    return tempos
+
+
+def comparar_perfis(download_dir):
+    """Carrega o painel com o perfil padrão e com o perfil enxuto e compara."""
+    medidas = {}
+    for enxuto in (False, True):
+        nome = 'enxuto' if enxuto else 'padrão'
+        print(f'🔎 Perfil {nome}:')
+        driver = criar_driver(
+            os.path.join(download_dir, f'perfil_{nome}'),
+            enxuto=enxuto,
+            cache_dir=os.path.join(CACHE_EDGE_DIR, 'comparacao'),
+        )
+        try:
+            medidas[nome] = abrir_painel(driver)
+        finally:
+            driver.quit()
+
+    antes, depois = medidas['padrão'], medidas['enxuto']
+    print(
+        f"📊 Antes: {antes['segundos']:.1f}s / {antes['bytes'] / 1024:.0f} KB -> "
+        f"Depois: {depois['segundos']:.1f}s / {depois['bytes'] / 1024:.0f} KB"
+    )
+    return medidas
+
+
+if __name__ == '__main__':
+    comparar_perfis(os.path.join(os.getcwd(), 'downloads'))
@@ -0,0 +1,172 @@
+"""Entregas do relatório em paralelo (cópia pública, Google Drive, e-mail, WhatsApp).
+
+Com o relatório pronto, as entregas não dependem umas das outras e passam
+quase todo o tempo esperando disco, rede ou a interface gráfica.
+`entregar()` roda todas ao mesmo tempo, cada uma na sua thread, com prazo e
+retentativas próprios (ver `canal`): o tempo total fica perto do da entrega
+mais lenta, e não da soma delas.
+
+O prazo vale para cada tentativa. Uma thread não pode ser interrompida: a
+tentativa que estoura o prazo continua rodando em segundo plano e por isso
+não é repetida (um e-mail atrasado não é enviado duas vezes); só os erros
+são repetidos. Antes de devolver os relatos, `entregar()` ainda espera essas
+tentativas por até `PRAZO_DE_TOLERANCIA` segundos, para que não sejam
+cortadas no meio com o fim do processo. A entrega fica marcada como sem
+resposta no cache de etapas e só roda de novo com a confirmação do
+operador (ver `monitoramento.etapas`).
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from monitoramento.etapas import SemResposta
+
+# Prazo de cada tentativa e espera antes da segunda tentativa, em segundos
+TIMEOUT_PADRAO = 300
+TENTATIVAS_PADRAO = 2
+ESPERA_PADRAO = 10
+# Espera extra, no fim, pelas tentativas que estouraram o prazo
+PRAZO_DE_TOLERANCIA = 60
+
+
+class EntregaSemResposta(SemResposta):
+    """A tentativa não terminou dentro do prazo do canal; `thread` continua rodando."""
+
+    def __init__(self, mensagem, thread=None, saida=None):
+        super().__init__(mensagem)
+        self.thread = thread
+        self.saida = saida
+
+
+def canal(funcao, timeout=TIMEOUT_PADRAO, tentativas=TENTATIVAS_PADRAO, espera=ESPERA_PADRAO):
+    """Uma entrega `funcao(resultado)` com o prazo por tentativa, as tentativas e a espera entre elas.
+
+    A espera dobra a cada nova tentativa.
+    """
+    return {'funcao': funcao, 'timeout': timeout, 'tentativas': tentativas, 'espera': espera}
+
+
+def como_canal(entrega):
+    """Aceita um `canal(...)` ou só a função (com a política padrão)."""
+    return entrega if isinstance(entrega, dict) else canal(entrega)
+
+
+# ======================================================
+# UMA ENTREGA: PRAZO E RETENTATIVAS
+# ======================================================
+def _com_prazo(funcao, timeout, nome):
+    """Roda `funcao()` numa thread própria e espera no máximo `timeout` segundos."""
+    saida = {}
+
+    def alvo():
+        try:
+            saida['valor'] = funcao()
+        except BaseException as e:
+            saida['erro'] = e
+
+    # A cópia do contexto mantém os spans da entrega sob o span da etapa
+    thread = threading.Thread(
+        target=contextvars.copy_context().run, args=(alvo,), name=f'entrega_{nome}', daemon=True
+    )
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise EntregaSemResposta(f'sem resposta em {timeout:g}s', thread, saida)
+    if 'erro' in saida:
+        raise saida['erro']
+    return saida.get('valor')
+
+
+def _com_retentativas(nome, canal, resultado, relato):
+    for tentativa in range(1, canal['tentativas'] + 1):
+        relato['tentativas'] = tentativa
+        try:
+            return _com_prazo(lambda: canal['funcao'](resultado), canal['timeout'], nome)
+        except EntregaSemResposta:
+            raise
+        except Exception as e:
+            if tentativa == canal['tentativas']:
+                raise
+            espera = canal['espera'] * 2 ** (tentativa - 1)
+            print(f"⚠️ Entrega '{nome}' falhou (tentativa {tentativa}/{canal['tentativas']}): {e}. Nova tentativa em {espera:g}s.")
+            time.sleep(espera)
+
+
+def _entregar_um(nome, canal, resultado, rodar, pendentes):
+    relato = {'status': 'ok', 'tentativas': 0, 'segundos': None, 'erro': None}
+    t0 = time.perf_counter()
+    try:
+        rodar(nome, lambda: _com_retentativas(nome, canal, resultado, relato))
+        if relato['tentativas'] == 0:
+            relato['status'] = 'cache'
+    except SemResposta as e:
+        relato.update(status='sem_resposta', erro=str(e))
+        if getattr(e, 'thread', None) is not None:
+            pendentes[nome] = (e.thread, e.saida)
+    except Exception as e:
+        relato.update(status='erro', erro=f'{type(e).__name__}: {e}')
+    relato['segundos'] = round(time.perf_counter() - t0, 3)
+    return relato
+
+
+def _aguardar_pendentes(pendentes, relatos, tolerancia):
+    """Espera até `tolerancia` segundos, no total, as tentativas que estouraram o prazo.
+
+    O status continua 'sem_resposta' (a etapa já foi marcada assim); o relato
+    ganha 'depois_do_prazo': 'ok', o erro, ou None se a thread ainda roda.
+    """
+    print(f'⏳ Aguardando até {tolerancia:g}s as entregas sem resposta: {", ".join(pendentes)}')
+    limite = time.perf_counter() + tolerancia
+    for nome, (thread, saida) in pendentes.items():
+        thread.join(max(0, limite - time.perf_counter()))
+        if thread.is_alive():
+            relatos[nome]['depois_do_prazo'] = None
+        elif 'erro' in saida:
+            relatos[nome]['depois_do_prazo'] = f"{type(saida['erro']).__name__}: {saida['erro']}"
+        else:
+            relatos[nome]['depois_do_prazo'] = 'ok'
+
+
+# ======================================================
+# TODAS AS ENTREGAS
+# ======================================================
+def entregar(canais, resultado, rodar=None, tolerancia=PRAZO_DE_TOLERANCIA):
+    """Roda as entregas de `canais` ({nome: canal ou função}) ao mesmo tempo.
+
+    `rodar(nome, tentar)` executa cada entrega; o padrão chama `tentar()`
+    direto, e o pipeline passa o cache de etapas (`monitoramento.etapas`).
+    Nenhuma falha interrompe as outras entregas. Retorna {nome: relato},
+    com 'status' ('ok', 'cache', 'erro' ou 'sem_resposta'), 'tentativas',
+    'segundos' e 'erro'. As entregas sem resposta são esperadas por mais
+    `tolerancia` segundos antes do retorno (ver `_aguardar_pendentes`).
+    """
+    canais = {nome: como_canal(entrega) for nome, entrega in canais.items()}
+    if not canais:
+        return {}
+    rodar = rodar or (lambda nome, tentar: tentar())
+
+    t0 = time.perf_counter()
+    pendentes = {}
+    with ThreadPoolExecutor(max_workers=len(canais)) as executor:
+        futuros = {
+            nome: executor.submit(contextvars.copy_context().run, _entregar_um, nome, c, resultado, rodar, pendentes)
+            for nome, c in canais.items()
+        }
+        relatos = {nome: futuro.result() for nome, futuro in futuros.items()}
+
+    total = time.perf_counter() - t0
+    soma = sum(r['segundos'] for r in relatos.values())
+    print(f'📬 Entregas concluídas em {total:.1f}s (em sequência seriam ~{soma:.1f}s):')
+    icones = {'ok': '✅', 'cache': '♻️', 'erro': '❌', 'sem_resposta': '⏱️'}
+    for nome, relato in relatos.items():
+        erro = f": {relato['erro']}" if relato['erro'] else ''
+        print(f"   {icones[relato['status']]} {nome}: {relato['status']}, {relato['tentativas']} tentativa(s), {relato['segundos']:.1f}s{erro}")
+
+    if pendentes:
+        _aguardar_pendentes(pendentes, relatos, tolerancia)
+        for nome in pendentes:
+            depois = relatos[nome]['depois_do_prazo']
+            situacao = 'ainda rodando' if depois is None else f'terminou depois do prazo ({depois})'
+            print(f'   ⏱️ {nome}: {situacao}')
+    return relatos
@@ -0,0 +1,111 @@
+import os
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# inotify só existe no Linux; nos demais sistemas a espera é feita por polling
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+# Extensões de arquivos temporários gerados durante o download
+EXTENSOES_TEMPORARIAS = ('.crdownload', '.tmp', '.partial', '.download')
+
+# Indicadores de carregamento usados pelo Qlik Sense nos objetos
+SELETOR_CARREGANDO = '.qv-loader, .qv-object-loading, .lui-loader'
+
+
+# ======================================================
+# ESPERAS NO NAVEGADOR
+# ======================================================
+def aguardar_pagina_carregada(driver, timeout=30):
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script('return document.readyState') == 'complete'
+    )
+
+
+def aguardar_qlik_pronto(driver, xpath, timeout=30):
+    """Aguarda o objeto do Qlik terminar de renderizar e retorna o elemento clicável."""
+    wait = WebDriverWait(driver, timeout)
+    elemento = wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
+    wait.until(
+        lambda d: not any(
+            e.is_displayed()
+            for e in d.find_elements(By.CSS_SELECTOR, SELETOR_CARREGANDO)
+        )
+    )
+    return elemento
+
+
+# ======================================================
+# ESPERAS NO SISTEMA DE ARQUIVOS
+# ======================================================
+def listar_arquivos(diretorio):
+    return set(os.listdir(diretorio))
+
+
+def _em_andamento(diretorio):
+    return any(f.endswith(EXTENSOES_TEMPORARIAS) for f in os.listdir(diretorio))
+
+
+def _observador(diretorio):
+    if INotify is None:
+        return None
+    inotify = INotify()
+    inotify.add_watch(
+        diretorio,
+        flags.CREATE | flags.MODIFY | flags.MOVED_TO | flags.DELETE | flags.CLOSE_WRITE,
+    )
+    return inotify
+
+
+def aguardar_download(diretorio, arquivos_antes, extensao='.xlsx', timeout=120, intervalo=0.25, estabilidade=1.0):
+    """Aguarda um novo arquivo `extensao` surgir em `diretorio` e ficar completo.
+
+    O download é considerado concluído quando não há arquivos temporários
+    (.crdownload etc.) na pasta e o tamanho do novo arquivo não muda por
+    `estabilidade` segundos. Retorna o caminho do arquivo baixado.
+    """
+    observador = _observador(diretorio)
+    limite = time.monotonic() + timeout
+    ultimo_tamanho = None
+    estavel_desde = None
+
+    try:
+        while time.monotonic() < limite:
+            novos = [
+                f
+                for f in listar_arquivos(diretorio) - arquivos_antes
+                if f.endswith(extensao)
+            ]
+            if novos and not _em_andamento(diretorio):
+                caminho = os.path.join(diretorio, novos[0])
+                try:
+                    tamanho = os.path.getsize(caminho)
+                except FileNotFoundError:
+                    tamanho = None
+
+                if tamanho and tamanho == ultimo_tamanho:
+                    if time.monotonic() - estavel_desde >= estabilidade:
+                        return caminho
+                else:
+                    ultimo_tamanho = tamanho
+                    estavel_desde = time.monotonic()
+            else:
+                ultimo_tamanho = None
+
+            # Com inotify acorda no próximo evento da pasta; sem ele, polling
+            if observador is not None:
+                observador.read(timeout=int(intervalo * 1000))
+            else:
+                time.sleep(intervalo)
+    finally:
+        if observador is not None:
+            observador.close()
+
+    raise TimeoutError(
+        f'Download não concluído em {timeout}s na pasta: {diretorio}'
+    )
@@ -0,0 +1,142 @@
+import pandas as pd
+
+from monitoramento.valores import CENTAVOS, converter_valores, ler_numeros, para_reais
+
+# ======================================================
+# ESQUEMAS DAS EXPORTAÇÕES
+# ======================================================
+# As propostas têm até 19 dígitos (ex.: 9701168800012025505) e passam do
+# limite do int64, por isso a chave é UInt64 (inteiro sem sinal, anulável).
+CHAVE_PROPOSTA = 'Proposta de Referência'
+
+# Status atribuídos manualmente no notebook, que nem sempre vêm do painel
+STATUS_MANUAIS = ['Aprovado', 'PRE-Aprovado', 'Cancelado']
+
+_PROPOSTA = {
+    CHAVE_PROPOSTA: 'UInt64',
+    'Status da Proposta': 'category',
+    'UF': 'category',
+    'Município': 'category',
+    'CNES': 'Int64',
+}
+
+_OCI = {
+    **_PROPOSTA,
+    'NU_PROCEDIMENTO': 'category',
+    'NO_GRUPO': 'category',
+    'NO_PROCEIDMENTO': 'category',
+    'DS_PROCEDIMENTO': 'category',
+    'TP_SEXO': 'category',
+    'QT_ATENDIMENTO_MES': 'quantidade',
+    'VL_CALCULADO': 'centavos',
+    'VL_PROCEDIMENTO': 'centavos',
+    'VL_TOTAL': 'centavos',
+}
+
+_CIRURGIAS = {
+    **_PROPOSTA,
+    'TP_COMPLEXIDADE': 'category',
+    'NO_GRUPO': 'category',
+    'NO_PROCEDIMENTO': 'category',
+    'QT_ATENDIMENTO_MES': 'quantidade',
+    'VL_TOTAL': 'centavos',
+}
+
+ESQUEMAS = {
+    'credito_financeiro_aba1': {
+        **_PROPOSTA,
+        'CNPJ': 'Int64',
+        'Dívida Aprox.': 'centavos',
+        'VL_SALDO_DEVEDOR': 'centavos',
+        'VL_TRIBUTO_FEDERAL_ESTIMADO': 'centavos',
+    },
+    'credito_financeiro_aba2': _OCI,
+    'credito_financeiro_aba3': _CIRURGIAS,
+    'modalidade_1_aba1': {**_PROPOSTA, 'CNPJ': 'Int64'},
+    'modalidade_1_aba2': _OCI,
+    'modalidade_1_aba3': {**_CIRURGIAS, 'Entidade': 'category'},
+}
+
+# Colunas gravadas em centavos: as das exportações e os totais da aba simplificada
+COLUNAS_CENTAVOS = {c for esquema in ESQUEMAS.values() for c, tipo in esquema.items() if tipo == 'centavos'} | {
+    'VL_TOTAL_COMP_CIRUGICO',
+    'VL_TOTAL_OCI',
+    'VALOR_TOTAL_MES_COMP+OCI',
+    'VALOR_TOTAL_ANO_COMP+OCI',
+}
+
+# Incrementar ao mudar os esquemas, para invalidar os Parquet já gravados
+VERSAO_ESQUEMAS = 3
+
+
+def _para_inteiro(serie, tipo):
+    # Texto ('0123 ', '') passa pelo parser de strings, que é exato até 20 dígitos
+    if not pd.api.types.is_numeric_dtype(serie):
+        serie = pd.to_numeric(serie.astype('string').str.strip(), errors='coerce')
+    return serie.astype(tipo)
+
+
+def aplicar_esquema(df, nome):
+    """Converte as colunas de `df` para os tipos declarados da exportação `nome`.
+
+    Os valores que não puderam ser lidos nas colunas 'centavos' e
+    'quantidade' ficam em df.attrs['valores_coagidos'] ({coluna: quantidade}),
+    que o Parquet preserva.
+    """
+    coagidos = {}
+    for coluna, tipo in ESQUEMAS.get(nome, {}).items():
+        if coluna not in df.columns:
+            print(f"⚠️ {nome}: coluna '{coluna}' do esquema não encontrada.")
+            continue
+        if tipo in ('centavos', 'quantidade'):
+            df[coluna], coagidos[coluna] = converter_valores(df[coluna], CENTAVOS if tipo == 'centavos' else 1)
+        elif tipo != 'category':
+            df[coluna] = _para_inteiro(df[coluna], tipo)
+        elif coluna == 'Status da Proposta':
+            # Deixa os status manuais disponíveis para as correções do notebook
+            serie = df[coluna].astype('category')
+            novos = [s for s in STATUS_MANUAIS if s not in serie.cat.categories]
+            df[coluna] = serie.cat.add_categories(novos)
+        else:
+            df[coluna] = df[coluna].astype('category')
+    df.attrs['valores_coagidos'] = {c: n for c, n in coagidos.items() if n}
+    return df
+
+
+def preparar_para_arrow(df):
+    """Resolve as colunas com números e textos misturados (o Parquet não as grava e o SQLite as guardaria como texto).
+
+    Se todos os valores são números ou textos numéricos ('R$ 1.234,56'), a
+    coluna vira Float64; só as que têm texto de verdade viram texto.
+    """
+    for coluna in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[coluna], skipna=True) not in ('mixed', 'mixed-integer'):
+            continue
+        numeros, coagidos = ler_numeros(df[coluna])
+        if coagidos:
+            df[coluna] = df[coluna].map(lambda v: v if pd.isna(v) else str(v))
+        else:
+            df[coluna] = numeros
+    return df
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def para_planilha(df):
+    """Cópia de `df` pronta para o openpyxl.
+
+    A proposta volta a ser texto (o Excel perde precisão acima de 15 dígitos),
+    os centavos voltam a reais e os inteiros anuláveis viram objetos com None
+    no lugar de <NA>.
+    """
+    df = df.copy()
+    for coluna in df.columns:
+        if coluna in COLUNAS_CENTAVOS and pd.api.types.is_integer_dtype(df[coluna]):
+            df[coluna] = para_reais(df[coluna]).astype(object).where(df[coluna].notna(), None)
+        elif coluna == CHAVE_PROPOSTA:
+            df[coluna] = df[coluna].astype('string').astype(object).where(df[coluna].notna(), None)
+        elif isinstance(df[coluna].dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(df[coluna]):
+            df[coluna] = df[coluna].astype(object).where(df[coluna].notna(), None)
+    return df
@@ -0,0 +1,325 @@
+"""Cache das etapas do pipeline, com retomada depois de uma falha.
+
+Cada etapa (download, ingestão, correções, tratamento, saída, métricas,
+entregas) tem uma chave: o hash do nome, da versão do código da etapa e das
+entradas, que incluem a chave da etapa anterior. A saída de cada etapa
+concluída fica em `downloads/cache/etapas/<etapa>/<chave>/` e o estado da
+execução em `registro.json`. Numa nova execução, a etapa cuja chave não
+mudou é reaproveitada do cache sem rodar (nem carregar as anteriores); a
+execução recomeça na primeira etapa que falhou ou cujas entradas mudaram.
+
+O download é a exceção: as exportações do painel mudam sem que nada no
+código mude, então o download só é reaproveitado ao retomar uma execução
+que não terminou. Só se retoma uma execução iniciada no mesmo dia: a de um
+dia anterior daria um relatório com a data de hoje e os dados do painel
+daquele dia.
+
+Uma etapa que termina com `SemResposta` (ex.: um e-mail que estourou o
+prazo) pode ter tido efeito mesmo assim: ela fica com o status
+'sem_resposta' e não roda de novo com a mesma chave até o operador conferir
+e confirmar (ver `confirmar`):
+
+    python -m monitoramento.etapas --reexecutar entrega_email_outlook
+    python -m monitoramento.etapas --dar-como-concluida entrega_email_outlook
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+from monitoramento.cache_downloads import CACHE_DIR
+from monitoramento.medicoes import medir
+
+ETAPAS_DIR = os.path.join(CACHE_DIR, 'etapas')
+REGISTRO_NOME = 'registro.json'
+SAIDA_NOME = 'saida.json'
+
+
+class SemResposta(Exception):
+    """A etapa não terminou no prazo e pode ter tido efeito (ex.: um e-mail enviado)."""
+
+
+class AguardandoConfirmacao(SemResposta):
+    """A etapa ficou sem resposta numa execução anterior e espera a confirmação do operador."""
+
+
+def hash_de(*partes):
+    """sha256 da representação JSON de `partes`."""
+    texto = json.dumps(partes, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def versao_do_codigo(*objetos):
+    """Hash do código-fonte dos módulos e funções de uma etapa."""
+    fontes = []
+    for objeto in objetos:
+        try:
+            fontes.append(inspect.getsource(objeto))
+        except (OSError, TypeError):
+            fontes.append(repr(objeto))
+    return hash_de(*fontes)
+
+
+# ======================================================
+# SAÍDAS DAS ETAPAS
+# ======================================================
+# 'tabelas': dicionários (aninhados) de DataFrames, um Parquet por DataFrame
+# 'json': valores simples, num único arquivo
+# None: a etapa não tem saída para guardar (ex.: envio de e-mail)
+def _gravar_tabelas(valor, pasta, caminho=''):
+    if isinstance(valor, pd.DataFrame):
+        arquivo = f'{caminho}.parquet'
+        valor.to_parquet(os.path.join(pasta, arquivo))
+        return arquivo
+    os.makedirs(os.path.join(pasta, caminho), exist_ok=True)
+    return {nome: _gravar_tabelas(item, pasta, os.path.join(caminho, str(nome))) for nome, item in valor.items()}
+
+
+def _ler_tabelas(estrutura, pasta):
+    if isinstance(estrutura, str):
+        # O Arrow entrega os códigos das categorias somente leitura
+        return pd.read_parquet(os.path.join(pasta, estrutura)).copy()
+    return {nome: _ler_tabelas(item, pasta) for nome, item in estrutura.items()}
+
+
+def _gravar_saida(valor, pasta, formato):
+    if formato == 'tabelas':
+        conteudo = _gravar_tabelas(valor, pasta)
+    elif formato == 'json':
+        conteudo = valor
+    else:
+        conteudo = None
+    with open(os.path.join(pasta, SAIDA_NOME), 'w', encoding='utf-8') as f:
+        json.dump({'formato': formato, 'conteudo': conteudo}, f, ensure_ascii=False, indent=4)
+
+
+def _ler_saida(pasta):
+    with open(os.path.join(pasta, SAIDA_NOME), encoding='utf-8') as f:
+        saida = json.load(f)
+    if saida['formato'] == 'tabelas':
+        return _ler_tabelas(saida['conteudo'], pasta)
+    return saida['conteudo']
+
+
+def _tamanho_da_pasta(pasta):
+    return sum(os.path.getsize(os.path.join(raiz, nome)) for raiz, _, nomes in os.walk(pasta) for nome in nomes)
+
+
+# ======================================================
+# ETAPAS
+# ======================================================
+class Etapa:
+    """Uma etapa com chave já calculada; `obter()` reaproveita do cache ou executa."""
+
+    def __init__(self, etapas, nome, chave, funcao, formato, validar, so_ao_retomar):
+        self.etapas = etapas
+        self.nome = nome
+        self.chave = chave
+        self.funcao = funcao
+        self.formato = formato
+        self.validar = validar
+        self.so_ao_retomar = so_ao_retomar
+        self._resultado = None
+        self._obtido = False
+
+    def obter(self):
+        if not self._obtido:
+            self._resultado = self._do_cache() if self.etapas.reaproveitavel(self) else None
+            if not self._obtido:
+                self._resultado = self.etapas.rodar(self)
+            self._obtido = True
+        return self._resultado
+
+    def _do_cache(self):
+        try:
+            with medir(f'etapa.{self.nome}', item='cache') as medida:
+                resultado = _ler_saida(self.etapas.pasta_da_etapa(self))
+                medida['bytes_entrada'] = _tamanho_da_pasta(self.etapas.pasta_da_etapa(self))
+            if self.validar is not None and not self.validar(resultado):
+                return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Etapa '{self.nome}': cache ilegível ({e}), executando de novo.")
+            return None
+        print(f"♻️ Etapa '{self.nome}' reaproveitada do cache ({self.chave[:12]}).")
+        self._obtido = True
+        return resultado
+
+
+class Etapas:
+    """Registro das etapas de uma execução do pipeline.
+
+    Com `retomar` False todas as etapas rodam de novo (o cache é regravado).
+    Com um `perfil` (`monitoramento.perfil.Perfil`), as etapas que rodam são
+    perfiladas; as reaproveitadas do cache, não.
+    """
+
+    def __init__(self, pasta=ETAPAS_DIR, retomar=True, perfil=None):
+        self.pasta = pasta
+        self.retomar = retomar
+        self.perfil = perfil
+        # As entregas rodam em paralelo e atualizam o mesmo registro
+        self._trava = threading.RLock()
+        os.makedirs(pasta, exist_ok=True)
+        self.registro = self._carregar_registro()
+
+        execucao = self.registro.get('execucao')
+        pendente = bool(retomar and execucao and execucao['status'] != 'concluida')
+        self.retomando = pendente and execucao['inicio'][:10] == datetime.now().date().isoformat()
+        if pendente and not self.retomando:
+            print(f"⚠️ A execução iniciada em {execucao['inicio']} não terminou, mas é de outro dia: começando uma nova.")
+        if self.retomando:
+            print(f"🔁 Retomando a execução iniciada em {execucao['inicio']}.")
+        else:
+            self.registro['execucao'] = {'status': 'em_andamento', 'inicio': datetime.now().isoformat(timespec='seconds')}
+            self._salvar_registro()
+
+    def _carregar_registro(self):
+        caminho = os.path.join(self.pasta, REGISTRO_NOME)
+        if not os.path.exists(caminho):
+            return {'etapas': {}}
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _salvar_registro(self, nome=None, **campos):
+        """Atualiza os `campos` do registro da etapa `nome` (se houver) e grava o registro."""
+        caminho = os.path.join(self.pasta, REGISTRO_NOME)
+        temporario = f'{caminho}.tmp'
+        with self._trava:
+            if nome is not None:
+                self.registro['etapas'].setdefault(nome, {}).update(campos)
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(self.registro, f, ensure_ascii=False, indent=4)
+            os.replace(temporario, caminho)
+
+    def pasta_da_etapa(self, etapa):
+        return os.path.join(self.pasta, etapa.nome, etapa.chave)
+
+    def etapa(self, nome, entradas, funcao, formato=None, codigo=(), validar=None, so_ao_retomar=False):
+        """Declara a etapa `nome`; nada roda até `obter()`.
+
+        `entradas` são os valores que definem o resultado (inclusive as chaves
+        das etapas anteriores), `codigo` os módulos e funções cujo código
+        entra na versão, e `validar(resultado)` confere se o que está no
+        cache ainda vale (ex.: o arquivo gerado continua no disco).
+        """
+        chave = hash_de(nome, versao_do_codigo(*codigo), entradas)
+        return Etapa(self, nome, chave, funcao, formato, validar, so_ao_retomar)
+
+    def reaproveitavel(self, etapa):
+        registro = self.registro['etapas'].get(etapa.nome)
+        if not self.retomar or registro is None:
+            return False
+        if registro['chave'] != etapa.chave or registro['status'] != 'concluida' or not registro.get('em_cache'):
+            return False
+        return self.retomando or not etapa.so_ao_retomar
+
+    def rodar(self, etapa):
+        # Vale mesmo com `retomar` False: refazer o cache não confirma um envio
+        anterior = self.registro['etapas'].get(etapa.nome) or {}
+        if anterior.get('status') == 'sem_resposta' and anterior.get('chave') == etapa.chave:
+            raise AguardandoConfirmacao(
+                f"ficou sem resposta na execução de {anterior.get('inicio')} e pode ter sido feita; confira e confirme com "
+                f"'python -m monitoramento.etapas --reexecutar {etapa.nome}' ou '--dar-como-concluida {etapa.nome}'"
+            )
+        with self._trava:
+            self.registro['etapas'][etapa.nome] = {}
+        self._salvar_registro(etapa.nome, chave=etapa.chave, status='em_andamento', inicio=datetime.now().isoformat(timespec='seconds'))
+
+        t0 = time.perf_counter()
+        try:
+            perfilando = self.perfil.etapa(etapa.nome) if self.perfil is not None else nullcontext()
+            with medir(f'etapa.{etapa.nome}'), perfilando:
+                resultado = etapa.funcao()
+        except SemResposta as e:
+            self._salvar_registro(etapa.nome, status='sem_resposta', erro=str(e), segundos=round(time.perf_counter() - t0, 3))
+            print(f"⏱️ Etapa '{etapa.nome}' sem resposta: {e}")
+            raise
+        except Exception as e:
+            self._salvar_registro(etapa.nome, status='falhou', erro=f'{type(e).__name__}: {e}', segundos=round(time.perf_counter() - t0, 3))
+            print(f"❌ Etapa '{etapa.nome}' falhou: {e}")
+            raise
+        segundos = round(time.perf_counter() - t0, 3)
+        self._salvar_registro(etapa.nome, status='concluida', segundos=segundos, em_cache=self._guardar(etapa, resultado))
+        return resultado
+
+    def _guardar(self, etapa, resultado):
+        """Grava a saída da etapa, mantendo só a versão mais recente no disco."""
+        pasta_etapa = os.path.join(self.pasta, etapa.nome)
+        destino = self.pasta_da_etapa(etapa)
+        temporario = f'{destino}.tmp'
+        shutil.rmtree(temporario, ignore_errors=True)
+        os.makedirs(temporario)
+        try:
+            _gravar_saida(resultado, temporario, etapa.formato)
+        except Exception as e:
+            shutil.rmtree(temporario, ignore_errors=True)
+            print(f"⚠️ Etapa '{etapa.nome}': saída não guardada no cache ({e}).")
+            return False
+        for antiga in os.listdir(pasta_etapa):
+            if antiga != os.path.basename(temporario):
+                shutil.rmtree(os.path.join(pasta_etapa, antiga), ignore_errors=True)
+        os.replace(temporario, destino)
+        return True
+
+    def concluir(self):
+        """Marca a execução como concluída: a próxima começa do download."""
+        self.registro['execucao'].update(status='concluida', fim=datetime.now().isoformat(timespec='seconds'))
+        self._salvar_registro()
+
+
+# ======================================================
+# CONFIRMAÇÃO DAS ETAPAS SEM RESPOSTA
+# ======================================================
+def confirmar(nome, concluida, pasta=ETAPAS_DIR):
+    """Libera a etapa `nome` que ficou sem resposta.
+
+    Com `concluida`, a etapa passa a contar como feita (é reaproveitada na
+    próxima execução); sem, ela roda de novo na próxima execução.
+    """
+    caminho = os.path.join(pasta, REGISTRO_NOME)
+    registro = {'etapas': {}}
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            registro = json.load(f)
+    etapa = registro['etapas'].get(nome)
+    if etapa is None or etapa.get('status') != 'sem_resposta':
+        raise ValueError(f"etapa '{nome}' não está sem resposta no registro de {pasta}")
+
+    if concluida:
+        destino = os.path.join(pasta, nome, etapa['chave'])
+        shutil.rmtree(destino, ignore_errors=True)
+        os.makedirs(destino)
+        _gravar_saida(None, destino, None)
+        etapa.update(status='concluida', em_cache=True, confirmada=datetime.now().isoformat(timespec='seconds'))
+    else:
+        etapa.update(status='falhou', erro=f"{etapa.get('erro')} (reexecução confirmada)")
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(registro, f, ensure_ascii=False, indent=4)
+    os.replace(temporario, caminho)
+    if concluida:
+        print(f"☑️ Etapa '{nome}' dada como concluída.")
+    else:
+        print(f"🔁 Etapa '{nome}' liberada para rodar de novo na próxima execução.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Confirma o que fazer com uma etapa que ficou sem resposta.')
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument('--reexecutar', metavar='ETAPA', help='a etapa não foi feita: roda de novo na próxima execução')
+    grupo.add_argument('--dar-como-concluida', metavar='ETAPA', help='a etapa foi feita: não roda de novo')
+    parser.add_argument('--pasta', default=ETAPAS_DIR)
+    args = parser.parse_args()
+    confirmar(args.dar_como_concluida or args.reexecutar, concluida=bool(args.dar_como_concluida), pasta=args.pasta)
+
+
+if __name__ == '__main__':
+    main()
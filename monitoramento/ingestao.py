@@ -0,0 +1,109 @@
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from monitoramento.cache_downloads import CACHE_DIR, hash_do_conteudo, id_exportacao
+from monitoramento.esquemas import VERSAO_ESQUEMAS, aplicar_esquema, memoria_mb, preparar_para_arrow
+from monitoramento.medicoes import registrar
+from monitoramento.painel import EXPORTACOES
+
+# python-calamine (Rust) lê .xlsx muito mais rápido que o openpyxl
+try:
+    import python_calamine  # noqa: F401
+
+    MOTOR_EXCEL = 'calamine'
+except ImportError:
+    MOTOR_EXCEL = 'openpyxl'
+
+# Cópia colunar mais recente de cada exportação, para análises avulsas
+PARQUET_DIR = os.path.join(os.getcwd(), 'downloads', 'parquet')
+
+
+def _ingerir(caminho, cache_dir, parquet_dir):
+    """Garante a cópia Parquet tipada da exportação.
+
+    Retorna (caminho, segundos, MB antes do esquema); os MB são None quando o
+    Parquet já existia.
+    """
+    t0 = time.perf_counter()
+    nome = id_exportacao(caminho)
+    pasta = os.path.join(cache_dir, nome)
+    caminho_parquet = os.path.join(pasta, f'{hash_do_conteudo(caminho)}.v{VERSAO_ESQUEMAS}.parquet')
+
+    memoria_original = None
+    if not os.path.exists(caminho_parquet):
+        df = pd.read_excel(caminho, engine=MOTOR_EXCEL)
+        memoria_original = memoria_mb(df)
+        # O esquema vem antes: os valores com números e textos misturados são
+        # lidos pelo parser monetário, não como texto
+        df = preparar_para_arrow(aplicar_esquema(df, nome))
+        os.makedirs(pasta, exist_ok=True)
+        temporario = f'{caminho_parquet}.tmp'
+        df.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho_parquet)
+
+    os.makedirs(parquet_dir, exist_ok=True)
+    shutil.copyfile(caminho_parquet, os.path.join(parquet_dir, f'{nome}.parquet'))
+    return caminho_parquet, time.perf_counter() - t0, memoria_original
+
+
+def _ler_parquet(caminho_parquet):
+    # O Arrow entrega os códigos das categorias somente leitura; a cópia permite
+    # as correções de status feitas no notebook
+    return pd.read_parquet(caminho_parquet).copy()
+
+
+def ler_exportacao(caminho, cache_dir=CACHE_DIR, parquet_dir=PARQUET_DIR):
+    """Lê uma exportação pela cópia Parquet tipada, convertendo o .xlsx só se o hash mudou."""
+    caminho_parquet, _, _ = _ingerir(caminho, cache_dir, parquet_dir)
+    return _ler_parquet(caminho_parquet)
+
+
+def ler_exportacoes(download_dir, exportacoes=EXPORTACOES, max_workers=None, cache_dir=CACHE_DIR, parquet_dir=PARQUET_DIR):
+    """Lê as exportações em paralelo (um processo por arquivo) via staging Parquet.
+
+    Cada .xlsx é convertido uma única vez por conteúdo, já com o esquema de
+    `monitoramento.esquemas`, para
+    `cache_dir/<exportação>/<sha256>.v<versão>.parquet`; execuções seguintes e análises
+    avulsas (`downloads/parquet/<exportação>.parquet`) leem a cópia colunar.
+    Retorna um dicionário {exportação: DataFrame}.
+    """
+    caminhos = [os.path.join(download_dir, e['arquivo']) for e in exportacoes]
+    max_workers = max_workers or min(len(caminhos), os.cpu_count() or 1)
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        resultados = list(
+            executor.map(
+                _ingerir,
+                caminhos,
+                [cache_dir] * len(caminhos),
+                [parquet_dir] * len(caminhos),
+            )
+        )
+
+    dfs = {}
+    for caminho, (caminho_parquet, segundos, memoria_original) in zip(caminhos, resultados):
+        nome = id_exportacao(caminho)
+        dfs[nome] = _ler_parquet(caminho_parquet)
+        origem = 'parquet em cache' if memoria_original is None else f'xlsx via {MOTOR_EXCEL}'
+        memoria = f'{memoria_mb(dfs[nome]):.2f} MB'
+        if memoria_original is not None:
+            memoria += f' (sem esquema: {memoria_original:.2f} MB)'
+        print(f'📄 {nome}: {len(dfs[nome])} linhas, {memoria} ({origem}, {segundos:.2f}s)')
+        registrar(
+            'ingestao.ler_excel' if memoria_original is not None else 'ingestao.ler_parquet',
+            segundos,
+            linhas=len(dfs[nome]),
+            bytes_entrada=os.path.getsize(caminho),
+            bytes_saida=os.path.getsize(caminho_parquet),
+            item=nome,
+        )
+        for coluna, quantidade in dfs[nome].attrs.get('valores_coagidos', {}).items():
+            print(f"   ⚠️ {coluna}: {quantidade} valor(es) ilegível(is) ficaram nulos")
+    total = sum(memoria_mb(df) for df in dfs.values())
+    print(f'✅ Exportações carregadas em {time.perf_counter() - t0:.2f}s, {total:.1f} MB em memória.')
+    return dfs
@@ -0,0 +1,199 @@
+"""Medições de tempo e volume de cada etapa do pipeline (spans).
+
+Cada trecho medido com `medir()` vira uma linha em
+`saida/medicoes/execucoes.jsonl` com a duração, as linhas processadas e os
+bytes lidos e gravados. O arquivo acumula todas as execuções, para
+acompanhar regressões e tendências ao longo dos dias. No fim da execução
+os totais por span vão para `monitoramento.prom`, no formato texto do
+Prometheus (coletor textfile do node_exporter; pasta em
+PROMETHEUS_TEXTFILE_DIR).
+
+Fora de uma execução (`iniciar_execucao`), `medir()` não grava nada.
+Trechos que rodam em outro processo devolvem os segundos ao processo
+principal, que os registra com `registrar()`.
+"""
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+MEDICOES_DIR = os.path.join(os.getcwd(), 'saida', 'medicoes')
+LOG_NOME = 'execucoes.jsonl'
+PROMETHEUS_NOME = 'monitoramento.prom'
+PROMETHEUS_DIR = os.getenv('PROMETHEUS_TEXTFILE_DIR', '')
+
+_execucao = None
+_trava = threading.Lock()
+_ids = itertools.count(1)
+_span_atual = ContextVar('span_atual', default=None)
+
+
+# ======================================================
+# EXECUÇÃO
+# ======================================================
+def iniciar_execucao(pasta=MEDICOES_DIR, prometheus_dir=PROMETHEUS_DIR):
+    """Passa a gravar os spans; retorna o id da execução."""
+    global _execucao
+    os.makedirs(pasta, exist_ok=True)
+    _execucao = {
+        'id': uuid.uuid4().hex[:12],
+        'log': os.path.join(pasta, LOG_NOME),
+        'prometheus': os.path.join(prometheus_dir or pasta, PROMETHEUS_NOME),
+        'inicio': time.time(),
+        'spans': [],
+    }
+    return _execucao['id']
+
+
+def finalizar_execucao(sucesso=True):
+    """Grava o arquivo do Prometheus com os totais da execução e para de registrar."""
+    global _execucao
+    if _execucao is None:
+        return None
+    execucao, _execucao = _execucao, None
+    caminho = execucao['prometheus']
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(texto_prometheus(execucao, sucesso))
+    os.replace(temporario, caminho)
+    print(f"📈 {len(execucao['spans'])} medições gravadas em {execucao['log']} e {caminho}")
+    return caminho
+
+
+@contextmanager
+def execucao(pasta=MEDICOES_DIR, prometheus_dir=PROMETHEUS_DIR):
+    """`iniciar_execucao` e `finalizar_execucao` em volta do bloco."""
+    iniciar_execucao(pasta, prometheus_dir)
+    sucesso = False
+    try:
+        yield
+        sucesso = True
+    finally:
+        finalizar_execucao(sucesso)
+
+
+# ======================================================
+# SPANS
+# ======================================================
+def registrar(nome, segundos, linhas=None, bytes_entrada=None, bytes_saida=None, status='ok', **atributos):
+    """Registra um span já medido (ex.: num processo separado)."""
+    return _registrar(nome, segundos, next(_ids), _span_atual.get(), linhas, bytes_entrada, bytes_saida, status, atributos)
+
+
+def _registrar(nome, segundos, span_id, pai, linhas, bytes_entrada, bytes_saida, status, atributos):
+    if _execucao is None:
+        return None
+    span = {
+        'execucao': _execucao['id'],
+        'id': span_id,
+        'pai': pai,
+        'span': nome,
+        'inicio': datetime.fromtimestamp(time.time() - segundos).isoformat(timespec='milliseconds'),
+        'segundos': round(segundos, 4),
+        'linhas': linhas,
+        'bytes_entrada': bytes_entrada,
+        'bytes_saida': bytes_saida,
+        'status': status,
+        **atributos,
+    }
+    linha = json.dumps(span, ensure_ascii=False, default=str)
+    with _trava:
+        _execucao['spans'].append(span)
+        with open(_execucao['log'], 'a', encoding='utf-8') as f:
+            f.write(linha + '\n')
+    return span
+
+
+def bytes_em_memoria(df):
+    """Bytes de `df` em memória, sem percorrer os objetos (barato o bastante para cada span)."""
+    return int(df.memory_usage(deep=False).sum())
+
+
+@contextmanager
+def medir(nome, **atributos):
+    """Mede o bloco como um span; o bloco preenche 'linhas', 'bytes_entrada' e 'bytes_saida'.
+
+        with medir('saida.aba', item=aba_nome) as medida:
+            ...
+            medida['linhas'] = len(df)
+    """
+    medida = {'linhas': None, 'bytes_entrada': None, 'bytes_saida': None}
+    span_id = next(_ids)
+    pai = _span_atual.get()
+    token = _span_atual.set(span_id)
+    status = 'ok'
+    t0 = time.perf_counter()
+    try:
+        yield medida
+    except BaseException:
+        status = 'erro'
+        raise
+    finally:
+        _span_atual.reset(token)
+        if _execucao is not None:
+            _registrar(
+                nome, time.perf_counter() - t0, span_id, pai,
+                medida.pop('linhas'), medida.pop('bytes_entrada'), medida.pop('bytes_saida'),
+                status, {**atributos, **medida},
+            )
+
+
+# ======================================================
+# PROMETHEUS
+# ======================================================
+_METRICAS = [
+    ('segundos', 'Tempo total do span na última execução, em segundos.'),
+    ('linhas', 'Linhas processadas pelo span na última execução.'),
+    ('bytes_entrada', 'Bytes lidos pelo span na última execução.'),
+    ('bytes_saida', 'Bytes gravados pelo span na última execução.'),
+    ('chamadas', 'Quantidade de vezes que o span rodou na última execução.'),
+    ('erros', 'Quantidade de vezes que o span terminou em erro na última execução.'),
+]
+
+
+def _numero(valor):
+    """Valor da amostra sem perder dígitos: inteiros como inteiros, o resto com repr()."""
+    if isinstance(valor, float) and not valor.is_integer():
+        return repr(valor)
+    return str(int(valor))
+
+
+def _rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def texto_prometheus(execucao, sucesso=True):
+    """Totais por (span, item) no formato texto de exposição do Prometheus."""
+    totais = {}
+    for span in execucao['spans']:
+        chave = (span['span'], span.get('item') or '')
+        total = totais.setdefault(chave, dict.fromkeys(('segundos', 'linhas', 'bytes_entrada', 'bytes_saida', 'chamadas', 'erros'), 0))
+        total['segundos'] += span['segundos']
+        for campo in ('linhas', 'bytes_entrada', 'bytes_saida'):
+            total[campo] += span[campo] or 0
+        total['chamadas'] += 1
+        total['erros'] += span['status'] == 'erro'
+
+    linhas = []
+    for metrica, ajuda in _METRICAS:
+        linhas += [f'# HELP monitoramento_span_{metrica} {ajuda}', f'# TYPE monitoramento_span_{metrica} gauge']
+        for (nome, item), total in sorted(totais.items()):
+            linhas.append(f'monitoramento_span_{metrica}{{span="{_rotulo(nome)}",item="{_rotulo(item)}"}} {_numero(total[metrica])}')
+    linhas += [
+        '# HELP monitoramento_execucao_segundos Duração da última execução, em segundos.',
+        '# TYPE monitoramento_execucao_segundos gauge',
+        f"monitoramento_execucao_segundos {time.time() - execucao['inicio']:.3f}",
+        '# HELP monitoramento_execucao_sucesso 1 se a última execução terminou sem erro.',
+        '# TYPE monitoramento_execucao_sucesso gauge',
+        f'monitoramento_execucao_sucesso {int(sucesso)}',
+        '# HELP monitoramento_execucao_fim_timestamp_seconds Fim da última execução (epoch).',
+        '# TYPE monitoramento_execucao_fim_timestamp_seconds gauge',
+        f'monitoramento_execucao_fim_timestamp_seconds {time.time():.0f}',
+    ]
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,60 @@
+import os
+
+# ======================================================
+# CONFIGURAÇÕES DO PAINEL INVESTSUS
+# ======================================================
+URL_BASE = 'https://investsuspaineis.saude.gov.br'
+CAMINHO_MASHUP = '/extensions/CGIN_PMAE/CGIN_PMAE.html'
+URL_PAINEL = f'{URL_BASE}{CAMINHO_MASHUP}#'
+
+# Id do app do Qlik Sense usado pelo mashup (motor de download HTTP)
+QLIK_APP_ID = os.getenv('QLIK_APP_ID', '')
+
+ABA_CREDITO = '//*[@id="menu_abas"]/a[3]'
+ABA_MODALIDADE_1 = '//*[@id="menu_abas"]/a[4]'
+
+NOMES_ABAS = {
+    ABA_CREDITO: 'Crédito Financeiro',
+    ABA_MODALIDADE_1: 'Modalidade 1',
+}
+
+# Botões de exportação (objetos QV), id do objeto no app do Qlik e nome
+# final de cada arquivo. O id do objeto é o sufixo do id do botão QVn-0N.
+EXPORTACOES = [
+    {
+        'aba': ABA_CREDITO,
+        'xpath': '//*[@id="QV3-02574e8688-0e17-49d8-8ca9-c037abb4a5f7"]',
+        'arquivo': 'credito_financeiro_aba1.xlsx',
+        'objeto': '574e8688-0e17-49d8-8ca9-c037abb4a5f7',
+    },
+    {
+        'aba': ABA_CREDITO,
+        'xpath': '//*[@id="QV3-03a27c0e0b-cac7-45c5-92c1-ec1cb34f3828"]',
+        'arquivo': 'credito_financeiro_aba2.xlsx',
+        'objeto': 'a27c0e0b-cac7-45c5-92c1-ec1cb34f3828',
+    },
+    {
+        'aba': ABA_CREDITO,
+        'xpath': '//*[@id="QV3-04541ab7f8-9dda-4cbd-82cf-72840cb4ac2d"]',
+        'arquivo': 'credito_financeiro_aba3.xlsx',
+        'objeto': '541ab7f8-9dda-4cbd-82cf-72840cb4ac2d',
+    },
+    {
+        'aba': ABA_MODALIDADE_1,
+        'xpath': '//*[@id="QV4-02yfhvCp"]',
+        'arquivo': 'modalidade_1_aba1.xlsx',
+        'objeto': 'yfhvCp',
+    },
+    {
+        'aba': ABA_MODALIDADE_1,
+        'xpath': '//*[@id="QV4-03JQRjW"]',
+        'arquivo': 'modalidade_1_aba2.xlsx',
+        'objeto': 'JQRjW',
+    },
+    {
+        'aba': ABA_MODALIDADE_1,
+        'xpath': '//*[@id="QV4-04gvqxmPC"]',
+        'arquivo': 'modalidade_1_aba3.xlsx',
+        'objeto': 'gvqxmPC',
+    },
+]
@@ -0,0 +1,182 @@
+"""Modo de perfil do pipeline (`--profile`): CPU e memória de cada etapa.
+
+Com o modo ligado, cada etapa que roda (download, ingestão, correções,
+tratamento, saída, métricas, entregas) é amostrada por uma thread que
+guarda, a cada poucos milissegundos, a pilha de todas as outras threads, e
+acompanhada pelo `tracemalloc`. Em `saida/perfil/<data_hora>/` ficam:
+
+* `<etapa>.folded`: pilhas no formato "collapsed" (`a;b;c contagem`), que
+  o flamegraph.pl, o speedscope e o inferno desenham como flamegraph;
+* `<etapa>.memoria.txt`: pico de memória da etapa e as linhas que mais
+  alocaram;
+* `resumo.json`: segundos, amostras, pico e memória retida de cada etapa,
+  com as funções que mais apareceram nas amostras.
+
+A amostragem é de tempo de relógio: esperas do Selenium e de rede aparecem
+como tempo parado na função que espera. O que roda nos processos de
+trabalho (leitura dos .xlsx, geração das abas) aparece como espera pelo
+executor. O `tracemalloc` deixa a execução bem mais lenta; com o modo
+desligado nada disso roda.
+"""
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PERFIL_NOME = 'perfil'
+# Intervalo entre amostras, em segundos
+INTERVALO = 0.005
+# Quadros guardados por alocação no tracemalloc: o relatório é por linha, e
+# cada quadro a mais deixa as alocações bem mais lentas
+QUADROS_TRACEMALLOC = 1
+TOP_ALOCACOES = 25
+TOP_FUNCOES = 15
+
+
+# ======================================================
+# CPU: AMOSTRAGEM DAS PILHAS
+# ======================================================
+def _pilha(frame, thread):
+    quadros = []
+    while frame is not None:
+        codigo = frame.f_code
+        quadros.append(f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join([thread, *reversed(quadros)])
+
+
+class Amostrador(threading.Thread):
+    """Conta as pilhas das threads (menos as dos amostradores) a cada `intervalo` segundos."""
+
+    NOME = 'amostrador_perfil'
+
+    def __init__(self, intervalo=INTERVALO):
+        super().__init__(name=self.NOME, daemon=True)
+        self.intervalo = intervalo
+        self.pilhas = collections.Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            nomes = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                nome = nomes.get(ident, str(ident))
+                if nome != self.NOME:
+                    self.pilhas[_pilha(frame, nome)] += 1
+            self.amostras += 1
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+
+def _funcoes_mais_amostradas(pilhas, quantidade=TOP_FUNCOES):
+    """Funções no topo das pilhas (tempo próprio), em amostras."""
+    proprias = collections.Counter()
+    for pilha, contagem in pilhas.items():
+        proprias[pilha.rsplit(';', 1)[-1]] += contagem
+    return proprias.most_common(quantidade)
+
+
+# ======================================================
+# PERFIL DAS ETAPAS
+# ======================================================
+class Perfil:
+    """Perfil de CPU e memória das etapas de uma execução, gravado em `pasta`.
+
+    As etapas podem ser aninhadas (uma etapa obtém a anterior dentro dela):
+    a de fora inclui o tempo e o pico de memória das de dentro.
+    """
+
+    def __init__(self, pasta, intervalo=INTERVALO):
+        self.pasta = pasta
+        self.intervalo = intervalo
+        self.resumo = {}
+        # Pico de memória de cada etapa em andamento, da mais externa à mais interna
+        self._picos = []
+        os.makedirs(pasta, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(QUADROS_TRACEMALLOC)
+
+    @contextmanager
+    def etapa(self, nome):
+        """Amostra a CPU e a memória do bloco; grava os relatórios da etapa `nome`."""
+        antes = tracemalloc.take_snapshot()
+        self._acumular_pico()
+        self._picos.append(0)
+        amostrador = Amostrador(self.intervalo)
+        amostrador.start()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - t0
+            amostrador.parar()
+            self._acumular_pico()
+            pico = self._picos.pop()
+            retido = tracemalloc.get_traced_memory()[0]
+            depois = tracemalloc.take_snapshot()
+            self._gravar(nome, segundos, amostrador, antes, depois, retido, pico)
+
+    def _acumular_pico(self):
+        """Passa o pico desde a última leitura às etapas em andamento e zera o do tracemalloc."""
+        pico = tracemalloc.get_traced_memory()[1]
+        self._picos = [max(anterior, pico) for anterior in self._picos]
+        tracemalloc.reset_peak()
+
+    def _gravar(self, nome, segundos, amostrador, antes, depois, retido, pico):
+        with open(os.path.join(self.pasta, f'{nome}.folded'), 'w', encoding='utf-8') as f:
+            for pilha, contagem in sorted(amostrador.pilhas.items()):
+                f.write(f'{pilha} {contagem}\n')
+
+        # As alocações do próprio perfil (snapshots, pilhas amostradas) ficam de fora
+        alocacoes = [
+            estatistica
+            for estatistica in depois.compare_to(antes, 'lineno')
+            if estatistica.traceback[0].filename not in (tracemalloc.__file__, __file__)
+        ][:TOP_ALOCACOES]
+        with open(os.path.join(self.pasta, f'{nome}.memoria.txt'), 'w', encoding='utf-8') as f:
+            f.write(f'Etapa: {nome}\n')
+            f.write(f'Duração: {segundos:.2f}s\n')
+            f.write(f'Pico de memória (Python): {pico / 1024 ** 2:.1f} MB\n')
+            f.write(f'Memória retida no fim: {retido / 1024 ** 2:.1f} MB\n\n')
+            f.write(f'{TOP_ALOCACOES} linhas com maior variação de memória na etapa:\n')
+            for estatistica in alocacoes:
+                f.write(f'{estatistica}\n')
+
+        funcoes = _funcoes_mais_amostradas(amostrador.pilhas)
+        self.resumo[nome] = {
+            'segundos': round(segundos, 3),
+            'amostras': amostrador.amostras,
+            'pico_mb': round(pico / 1024 ** 2, 1),
+            'retido_mb': round(retido / 1024 ** 2, 1),
+            'funcoes_mais_amostradas': [{'funcao': f, 'amostras': n} for f, n in funcoes],
+        }
+        topo = f' Topo: {funcoes[0][0]}.' if funcoes else ''
+        print(f"🔬 Perfil da etapa '{nome}': {segundos:.2f}s, pico de {pico / 1024 ** 2:.1f} MB.{topo}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.encerrar()
+
+    def encerrar(self):
+        """Grava o resumo.json e desliga o tracemalloc."""
+        tracemalloc.stop()
+        caminho = os.path.join(self.pasta, 'resumo.json')
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.resumo, f, ensure_ascii=False, indent=4)
+        print(f'🔬 Perfil das etapas gravado em: {self.pasta}')
+        return caminho
+
+
+def novo_perfil(saida_dir):
+    """Perfil gravado em `saida_dir/perfil/<data_hora>/`."""
+    return Perfil(os.path.join(saida_dir, PERFIL_NOME, datetime.now().strftime('%Y%m%d_%H%M%S')))
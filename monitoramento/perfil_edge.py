@@ -0,0 +1,75 @@
+import os
+
+# ======================================================
+# PERFIL ENXUTO DO EDGE PARA O SCRAPING
+# ======================================================
+# Cache em disco por sessão, mantido entre execuções (web/cache_edge/sessao_N)
+CACHE_EDGE_DIR = os.path.join(os.getcwd(), 'web', 'cache_edge')
+
+ARGUMENTOS_BASE = [
+    '--headless',               # Executa sem abrir a janela
+    '--disable-gpu',            # Evita problemas gráficos
+    '--window-size=1920,1080',  # Define tamanho da janela virtual
+]
+
+ARGUMENTOS_ENXUTOS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--no-first-run',
+    '--blink-settings=imagesEnabled=false',
+]
+
+# Recursos que o mashup carrega e que não são usados pelo bot
+URLS_BLOQUEADAS = [
+    # Fontes e imagens
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico',
+    # Analytics
+    '*google-analytics.com*', '*googletagmanager.com*', '*hotjar.com*', '*clarity.ms*',
+    # Blocos de mapa
+    '*maps.qlikcloud.com*', '*tile.openstreetmap.org*', '*basemaps.cartocdn.com*', '*arcgisonline.com*',
+]
+
+PREFERENCIAS_ENXUTAS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.notifications': 2,
+}
+
+
+def argumentos_edge(enxuto=True, cache_dir=None):
+    argumentos = list(ARGUMENTOS_BASE)
+    if enxuto:
+        argumentos += ARGUMENTOS_ENXUTOS
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            argumentos.append(f'--disk-cache-dir={cache_dir}')
+    return argumentos
+
+
+def bloquear_recursos(driver, padroes=URLS_BLOQUEADAS):
+    """Bloqueia, via CDP, as requisições que casam com `padroes`."""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': padroes})
+
+
+def medir_carregamento(driver):
+    """Tempo de carregamento da página e bytes transferidos (Navigation/Resource Timing)."""
+    medidas = driver.execute_script(
+        """
+        const nav = performance.getEntriesByType('navigation')[0] || {};
+        const recursos = performance.getEntriesByType('resource');
+        return {
+            segundos: ((nav.loadEventEnd || performance.now()) - (nav.startTime || 0)) / 1000,
+            bytes: (nav.transferSize || 0) + recursos.reduce((t, r) => t + (r.transferSize || 0), 0),
+            recursos: recursos.length,
+        };
+        """
+    )
+    print(
+        f"⏱️ Carregamento do painel: {medidas['segundos']:.1f}s, "
+        f"{medidas['bytes'] / 1024:.0f} KB em {medidas['recursos']} recursos"
+    )
+    return medidas
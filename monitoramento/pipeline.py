@@ -0,0 +1,460 @@
+"""As partes do credito_modalidade.ipynb como funções importáveis.
+
+`executar()` roda downloads, tratamento, saída e métricas e devolve os
+DataFrames e as métricas em memória. Os scripts de envio chamam essa função
+direto, sem subir um kernel do Jupyter nem reescrever o notebook (papermill).
+O notebook usa as mesmas funções, uma parte por célula.
+
+Linha de comando: python -m monitoramento.pipeline [--motor-download http] [--sem-download] [--profile]
+"""
+import argparse
+import json
+import os
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+import openpyxl
+
+from monitoramento import correcoes as correcoes_mod
+from monitoramento import dimensao as dimensao_mod
+from monitoramento import entregas as entregas_mod
+from monitoramento import esquemas as esquemas_mod
+from monitoramento import ingestao as ingestao_mod
+from monitoramento import medicoes as medicoes_mod
+from monitoramento import planilha as planilha_mod
+from monitoramento import planilha_zip as planilha_zip_mod
+from monitoramento import saida_colunar as saida_colunar_mod
+from monitoramento import sigtap as sigtap_mod
+from monitoramento import transformacao as transformacao_mod
+from monitoramento import valores as valores_mod
+from monitoramento import visao_geral as visao_geral_mod
+from monitoramento.cache_downloads import calcular_hash, cache_recente, hash_do_conteudo, registrar_exportacoes, restaurar_do_cache
+from monitoramento.correcoes import CORRECOES_PATH, aplicar_correcoes
+from monitoramento.etapas import ETAPAS_DIR, Etapas
+from monitoramento.ingestao import ler_exportacoes
+from monitoramento.medicoes import medir
+from monitoramento.painel import EXPORTACOES
+from monitoramento.perfil import novo_perfil
+from monitoramento.planilha import MAPPING, MODELO_FILENAME, MODELO_PATH, sobrescrever_aba
+from monitoramento.planilha_zip import gerar_saida_zip
+from monitoramento.saida_colunar import gravar_saidas_colunares
+from monitoramento.sigtap import SGRUPO_PATH
+from monitoramento.transformacao import transformar_modalidades
+from monitoramento.visao_geral import calcular_em_cache, carregar_hospitais
+
+DOWNLOAD_DIR = os.path.join(os.getcwd(), 'downloads')
+SAIDA_DIR = 'saida'
+METRICAS_NOME = 'whatsapp_metrics.json'
+# Log JSON-lines dos spans e arquivo do Prometheus (monitoramento.medicoes)
+MEDICOES_NOME = 'medicoes'
+
+# Nome do DataFrame no notebook (chave do MAPPING) -> (modalidade, tabela do tratamento)
+DATAFRAMES = {
+    'df_cf_aba1': ('credito_financeiro', 'aba1'),
+    'df_cf_aba2': ('credito_financeiro', 'aba2'),
+    'df_cf_aba3': ('credito_financeiro', 'aba3'),
+    'df_simp_cc': ('credito_financeiro', 'simp'),
+    'df_proposta_cancelada': ('credito_financeiro', 'canceladas'),
+    'df_m1_aba1': ('modalidade_1', 'aba1'),
+    'df_m1_aba2': ('modalidade_1', 'aba2'),
+    'df_m1_aba3': ('modalidade_1', 'aba3'),
+    'df_simp_m1': ('modalidade_1', 'simp'),
+}
+
+# Modalidade -> nome exibido nas métricas do WhatsApp e do e-mail
+NOMES_METRICAS = {'credito_financeiro': 'CRÉDITO FINANCEIRO', 'modalidade_1': 'MODALIDADE 1'}
+
+
+# ======================================================
+# PRIMEIRA PARTE: DOWNLOADS
+# ======================================================
+def baixar(download_dir=DOWNLOAD_DIR, motor='selenium', max_workers=3, cache_validade_min=0, usar_pool=None):
+    """Baixa as 6 exportações (ou restaura do cache recente) e registra no cache.
+
+    `motor` é 'selenium' (Edge) ou 'http' (Engine API do Qlik); `usar_pool`
+    None usa o pool de navegadores se o serviço estiver rodando. Retorna os
+    tempos de download.
+    """
+    # Importações aqui: o Selenium só é necessário quando há download
+    from monitoramento.downloads import baixar_exportacoes
+    from monitoramento.pool_navegadores import pool_disponivel
+    from monitoramento.qlik_http import baixar_exportacoes_http
+
+    os.makedirs(download_dir, exist_ok=True)
+    print(f'📁 Diretório de downloads configurado: {download_dir}')
+    if usar_pool is None:
+        usar_pool = pool_disponivel()
+
+    if cache_recente(cache_validade_min):
+        restaurar_do_cache(download_dir)
+        tempos_download = []
+    elif motor == 'http':
+        tempos_download = baixar_exportacoes_http(download_dir, max_workers=max_workers)
+    else:
+        tempos_download = baixar_exportacoes(download_dir, max_workers=max_workers, usar_pool=usar_pool)
+
+    # Guarda cada exportação no cache pelo hash do conteúdo (histórico em downloads/cache)
+    registrar_exportacoes(download_dir)
+    return tempos_download
+
+
+# ======================================================
+# SEGUNDA PARTE: TRATAMENTO
+# ======================================================
+def tratar(download_dir=DOWNLOAD_DIR):
+    """Lê as exportações, aplica as correções manuais e trata as modalidades.
+
+    Retorna (modalidades, relatório das correções); `modalidades` é o
+    resultado de `transformar_modalidades`.
+    """
+    exportacoes = ler_exportacoes(download_dir)
+    relatorio_correcoes = aplicar_correcoes(exportacoes)
+    return transformar_modalidades(exportacoes), relatorio_correcoes
+
+
+def dataframes(modalidades):
+    """{nome do DataFrame no notebook: DataFrame} (ex.: 'df_simp_cc')."""
+    return {
+        nome: modalidades[modalidade][tabela]
+        for nome, (modalidade, tabela) in DATAFRAMES.items()
+        if tabela in modalidades.get(modalidade, {})
+    }
+
+
+def abas_da_saida(dfs):
+    """{aba do modelo: DataFrame} a partir de {nome do DataFrame: DataFrame}, pelo MAPPING."""
+    abas = {}
+    for df_nome, aba_nome in MAPPING.items():
+        if df_nome in dfs:
+            abas[aba_nome] = dfs[df_nome]
+        else:
+            print(f"⚠️ DataFrame '{df_nome}' não está definido.")
+    return abas
+
+
+# ======================================================
+# TERCEIRA PARTE: SAÍDA
+# ======================================================
+def gerar_saida(abas, saida_dir=SAIDA_DIR, motor='zip', colunares=True, sigla_uf='BR', modelo_path=MODELO_PATH):
+    """Gera o .xlsx datado a partir do modelo e, se `colunares`, as cópias Parquet e SQLite.
+
+    `motor` 'zip' gera só as abas de dados dentro do pacote do modelo, com
+    as visões gerais já calculadas; 'openpyxl' carrega e salva o workbook
+    inteiro. Retorna o caminho do arquivo gerado.
+    """
+    if not os.path.exists(modelo_path):
+        raise FileNotFoundError(
+            f"O arquivo modelo esperado '{os.path.basename(modelo_path)}' não foi encontrado em "
+            f"'{os.path.dirname(modelo_path)}'."
+        )
+
+    textos_info = {'H2': datetime.now().strftime('%d/%m/%Y %H:%M'), 'G1': sigla_uf}
+    os.makedirs(saida_dir, exist_ok=True)
+    novo_nome = os.path.join(saida_dir, f"{datetime.today().strftime('%Y%m%d')}_{MODELO_FILENAME}")
+
+    if motor == 'zip':
+        # VISÃO_GERAL, VISÃO_GERAL_M1, CANCELAR e totais calculados aqui: as fórmulas
+        # ficam na planilha, já com o valor, e o Excel não precisa recalcular ao abrir
+        em_cache, celulas_em_cache = calcular_em_cache(abas, carregar_hospitais(modelo_path))
+        segundos = gerar_saida_zip(
+            modelo_path, novo_nome, abas, textos_info, em_cache=em_cache, celulas_em_cache=celulas_em_cache
+        )
+        print(f"   -> Aba 'INFO' atualizada (H2: Data/Hora, G1: {sigla_uf}).")
+        print(f'📦 Arquivo gerado direto do pacote do modelo em {segundos:.2f}s.')
+    else:
+        with medir('saida.carregar_workbook', item=os.path.basename(modelo_path)) as medida:
+            modelo_wb = openpyxl.load_workbook(modelo_path)
+            medida['bytes_entrada'] = os.path.getsize(modelo_path)
+        print('📂 Arquivo modelo carregado.')
+        for aba_nome, df in abas.items():
+            sobrescrever_aba(modelo_wb, aba_nome, df)
+
+        print("\n🛠 Atualizando aba 'INFO'...")
+        if 'INFO' in modelo_wb.sheetnames:
+            aba_info = modelo_wb['INFO']
+            for celula, valor in textos_info.items():
+                aba_info[celula] = valor
+            print(f"   -> Aba 'INFO' atualizada (H2: Data/Hora, G1: {sigla_uf}).")
+        else:
+            print("   ⚠️ Aba 'INFO' não encontrada no arquivo modelo.")
+        with medir('saida.salvar_workbook', item=os.path.basename(novo_nome)) as medida:
+            modelo_wb.save(novo_nome)
+            medida['bytes_saida'] = os.path.getsize(novo_nome)
+        print("   As abas 'VISÃO_GERAL' e 'VISÃO_GERAL_M1' devem ter sido recalculadas pelo Excel.")
+
+    # 🗄️ Cópias colunares para as análises, sem reabrir o Excel
+    if colunares:
+        gravar_saidas_colunares(abas, novo_nome)
+
+    print('\n-----------------------------------------------------------------')
+    print(f"🎉 Sucesso! O novo arquivo '{novo_nome}' foi criado.")
+    print('-----------------------------------------------------------------')
+    return novo_nome
+
+
+# ======================================================
+# QUARTA PARTE: MÉTRICAS PARA O WHATSAPP E O E-MAIL
+# ======================================================
+def calcular_metricas_df(df, nome_modalidade):
+    """Calcula estatísticas de status, UF e Municípios Aprovados para um DataFrame, ordenando os status."""
+    if df.empty:
+        return {
+            'status_propostas': {},
+            'ufs_aprovadas_count': 0,
+            'municipios_aprovados_count': 0,
+            'entidade_aprovadas': 0,
+            'nome': nome_modalidade,
+        }
+
+    # Status ordenados pelo nome (o status é categórico: descarta as categorias sem nenhuma proposta)
+    if 'Status da Proposta' in df.columns:
+        status_counts = df['Status da Proposta'].value_counts()
+        status_counts = dict(sorted(status_counts[status_counts > 0].to_dict().items()))
+    else:
+        status_counts = {'N/A': df.shape[0]}
+
+    # UFs, Municípios e Entidades únicos entre as propostas aprovadas
+    df_aprovadas = df[df['Status da Proposta'].isin(['Aprovado', 'PRE-Aprovado'])]
+    ufs_aprovadas = df_aprovadas['UF'].nunique() if 'UF' in df_aprovadas.columns else 0
+    municipios_aprovados = df_aprovadas['Município'].nunique() if 'Município' in df_aprovadas.columns else 0
+    entidade = df_aprovadas['Entidade'].nunique() if 'Entidade' in df_aprovadas.columns else 0
+
+    return {
+        'status_propostas': status_counts,
+        'ufs_aprovadas_count': int(ufs_aprovadas),
+        'municipios_aprovados_count': int(municipios_aprovados),
+        'entidade_aprovadas': int(entidade),
+        'nome': nome_modalidade,
+    }
+
+
+def calcular_metricas(modalidades):
+    """Métricas de cada modalidade, a partir da aba simplificada."""
+    metricas = {'data': datetime.today().strftime('%d/%m/%Y')}
+    for modalidade, nome in NOMES_METRICAS.items():
+        metricas[modalidade] = calcular_metricas_df(modalidades[modalidade]['simp'], nome)
+    return metricas
+
+
+def salvar_metricas(metricas, saida_dir=SAIDA_DIR):
+    """Grava as métricas em saida/whatsapp_metrics.json e retorna o caminho."""
+    os.makedirs(saida_dir, exist_ok=True)
+    metrics_path = os.path.join(saida_dir, METRICAS_NOME)
+    with open(metrics_path, 'w', encoding='utf-8') as f:
+        json.dump(metricas, f, ensure_ascii=False, indent=4)
+    print(f'📊 Métricas salvas para o WhatsApp em: {metrics_path}')
+    return metrics_path
+
+
+# ======================================================
+# EXECUÇÃO COMPLETA
+# ======================================================
+def _arquivos_conferem(hashes, pasta, funcao_hash=calcular_hash):
+    """Os arquivos de `pasta` ainda têm os hashes registrados ({arquivo: sha256})."""
+    return all(
+        os.path.exists(os.path.join(pasta, arquivo)) and funcao_hash(os.path.join(pasta, arquivo)) == sha
+        for arquivo, sha in hashes.items()
+    )
+
+
+def _hashes_das_exportacoes(download_dir):
+    """Hash dos dados de cada exportação: exportações iguais em dias diferentes reaproveitam as etapas seguintes."""
+    return {e['arquivo']: hash_do_conteudo(os.path.join(download_dir, e['arquivo'])) for e in EXPORTACOES}
+
+
+def _baixar(download_dir, motor, max_workers, cache_validade_min):
+    baixar(download_dir, motor, max_workers, cache_validade_min)
+    return _hashes_das_exportacoes(download_dir)
+
+
+def _corrigir(exportacoes):
+    exportacoes = dict(exportacoes)
+    return {'exportacoes': exportacoes, 'relatorio': aplicar_correcoes(exportacoes)}
+
+
+def _gerar_relatorio(modalidades, saida_dir, motor, colunares):
+    relatorio = gerar_saida(abas_da_saida(dataframes(modalidades)), saida_dir, motor, colunares)
+    return {'relatorio': relatorio, 'sha256': calcular_hash(relatorio)}
+
+
+def executar(
+    download_dir=DOWNLOAD_DIR,
+    saida_dir=SAIDA_DIR,
+    com_download=True,
+    motor_download='selenium',
+    max_workers_download=3,
+    cache_validade_min=0,
+    motor_saida='zip',
+    colunares=True,
+    entregas=None,
+    retomar=True,
+    etapas_dir=ETAPAS_DIR,
+    perfil=False,
+):
+    """Roda as partes do notebook em sequência, no mesmo processo.
+
+    Cada etapa passa pelo cache de `monitoramento.etapas`: com `retomar`, as
+    etapas cujas entradas e código não mudaram desde a última execução são
+    reaproveitadas, e uma execução que falhou recomeça na etapa que falhou.
+    Com `com_download` False, usa os arquivos já presentes em `download_dir`.
+
+    `entregas` é {nome: funcao(resultado)} com as entregas do relatório
+    (cópia para a pasta pública, e-mail, WhatsApp), ou {nome: canal(...)}
+    com prazo e retentativas próprios (ver `monitoramento.entregas`). As
+    entregas rodam ao mesmo tempo; cada uma é uma etapa e as que já foram
+    feitas para o mesmo relatório não são repetidas. Se alguma falhar, as
+    demais rodam e um RuntimeError é levantado no fim. Uma entrega que
+    estoura o prazo fica sem resposta e só roda de novo depois da
+    confirmação do operador (ver `monitoramento.etapas.confirmar`).
+
+    O tempo, as linhas e os bytes de cada etapa e sub-etapa vão para
+    `saida_dir/medicoes/` (ver `monitoramento.medicoes`). Com `perfil`, cada
+    etapa que roda é perfilada (CPU e memória) em `saida_dir/perfil/` (ver
+    `monitoramento.perfil`).
+
+    Retorna um dicionário com 'dataframes' ({nome: DataFrame}),
+    'modalidades', 'relatorio_correcoes', 'relatorio' (caminho do .xlsx),
+    'metricas', 'entregas' ({nome: relato}, ver `monitoramento.entregas.entregar`)
+    e 'segundos'.
+    """
+    inicio = time.perf_counter()
+    print(f"🔵 Início da execução: {datetime.now().strftime('%H:%M:%S')}")
+    perfilando = novo_perfil(saida_dir) if perfil else nullcontext()
+    with medicoes_mod.execucao(os.path.join(saida_dir, MEDICOES_NOME)), perfilando as perfil:
+        etapas = Etapas(etapas_dir, retomar=retomar, perfil=perfil)
+        dia = datetime.today().strftime('%Y%m%d')
+
+        if com_download:
+            download = etapas.etapa(
+                'download',
+                {'download_dir': download_dir, 'motor': motor_download},
+                lambda: _baixar(download_dir, motor_download, max_workers_download, cache_validade_min),
+                formato='json',
+                codigo=[baixar, _baixar],
+                validar=lambda hashes: _arquivos_conferem(hashes, download_dir, hash_do_conteudo),
+                so_ao_retomar=True,
+            )
+            arquivos = download.obter()
+        else:
+            arquivos = _hashes_das_exportacoes(download_dir)
+
+        ingestao = etapas.etapa(
+            'ingestao', {'arquivos': arquivos}, lambda: ler_exportacoes(download_dir), 'tabelas',
+            codigo=[ingestao_mod, esquemas_mod, valores_mod],
+        )
+        correcoes = etapas.etapa(
+            'correcoes',
+            {'ingestao': ingestao.chave, 'regras': calcular_hash(CORRECOES_PATH)},
+            lambda: _corrigir(ingestao.obter()),
+            'tabelas',
+            codigo=[correcoes_mod, _corrigir],
+        )
+        tratamento = etapas.etapa(
+            'tratamento',
+            {'correcoes': correcoes.chave, 'sigtap': calcular_hash(SGRUPO_PATH)},
+            lambda: transformar_modalidades(correcoes.obter()['exportacoes']),
+            'tabelas',
+            codigo=[transformacao_mod, dimensao_mod, sigtap_mod],
+        )
+        saida = etapas.etapa(
+            'saida',
+            {
+                'tratamento': tratamento.chave,
+                'modelo': calcular_hash(MODELO_PATH),
+                'saida_dir': saida_dir,
+                'motor': motor_saida,
+                'colunares': colunares,
+                'dia': dia,
+            },
+            lambda: _gerar_relatorio(tratamento.obter(), saida_dir, motor_saida, colunares),
+            'json',
+            codigo=[planilha_mod, planilha_zip_mod, visao_geral_mod, saida_colunar_mod, gerar_saida, abas_da_saida],
+            validar=lambda r: _arquivos_conferem({os.path.basename(r['relatorio']): r['sha256']}, os.path.dirname(r['relatorio'])),
+        )
+        metricas = etapas.etapa(
+            'metricas',
+            {'tratamento': tratamento.chave, 'dia': dia},
+            lambda: calcular_metricas(tratamento.obter()),
+            'json',
+            codigo=[calcular_metricas, calcular_metricas_df],
+        )
+
+        relatorio = saida.obter()['relatorio']
+        salvar_metricas(metricas.obter(), saida_dir)
+        modalidades = tratamento.obter()
+        resultado = {
+            'dataframes': dataframes(modalidades),
+            'modalidades': modalidades,
+            'relatorio_correcoes': correcoes.obter()['relatorio'],
+            'relatorio': relatorio,
+            'metricas': metricas.obter(),
+        }
+
+        canais = {nome: entregas_mod.como_canal(entrega) for nome, entrega in (entregas or {}).items()}
+
+        def entrega_como_etapa(nome, tentar):
+            return etapas.etapa(
+                f'entrega_{nome}',
+                {'saida': saida.chave, 'metricas': metricas.chave},
+                tentar,
+                codigo=[canais[nome]['funcao']],
+            ).obter()
+
+        resultado['entregas'] = entregas_mod.entregar(canais, resultado, entrega_como_etapa)
+        falhas = [nome for nome, relato in resultado['entregas'].items() if relato['status'] == 'erro']
+        sem_resposta = [nome for nome, relato in resultado['entregas'].items() if relato['status'] == 'sem_resposta']
+        if falhas or sem_resposta:
+            mensagens = []
+            if falhas:
+                mensagens.append(f"entrega(s) com falha: {', '.join(falhas)}; a próxima execução retoma a partir delas")
+            if sem_resposta:
+                mensagens.append(
+                    f"entrega(s) sem resposta: {', '.join(sem_resposta)}; só rodam de novo depois da confirmação "
+                    "(python -m monitoramento.etapas --reexecutar/--dar-como-concluida entrega_<nome>)"
+                )
+            raise RuntimeError('; '.join(mensagens))
+        etapas.concluir()
+
+    resultado['segundos'] = segundos = time.perf_counter() - inicio
+    horas, resto = divmod(segundos, 3600)
+    minutos, resto = divmod(resto, 60)
+    print(f'✅ Tempo total de execução: {int(horas)}h {int(minutos)}min {int(resto)}s')
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Executa o monitoramento do INVESTSUS sem o notebook.')
+    parser.add_argument('--download-dir', default=DOWNLOAD_DIR)
+    parser.add_argument('--saida-dir', default=SAIDA_DIR)
+    parser.add_argument('--sem-download', action='store_true', help='usa as exportações já presentes em --download-dir')
+    parser.add_argument('--motor-download', choices=['selenium', 'http'], default='selenium')
+    parser.add_argument('--workers-download', type=int, default=3, help='sessões baixando em paralelo')
+    parser.add_argument('--cache-validade-min', type=int, default=0, help='reaproveita downloads com menos de N minutos')
+    parser.add_argument('--motor-saida', choices=['zip', 'openpyxl'], default='zip')
+    parser.add_argument('--sem-colunares', action='store_true', help='não grava as cópias Parquet e SQLite')
+    parser.add_argument('--refazer', action='store_true', help='ignora o cache das etapas e roda tudo de novo')
+    parser.add_argument(
+        '--profile',
+        dest='perfil',
+        action='store_true',
+        help='perfila CPU e memória de cada etapa que roda, em <saida-dir>/perfil (mais lento)',
+    )
+    args = parser.parse_args()
+
+    executar(
+        download_dir=args.download_dir,
+        saida_dir=args.saida_dir,
+        com_download=not args.sem_download,
+        motor_download=args.motor_download,
+        max_workers_download=args.workers_download,
+        cache_validade_min=args.cache_validade_min,
+        motor_saida=args.motor_saida,
+        colunares=not args.sem_colunares,
+        retomar=not args.refazer,
+        perfil=args.perfil,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+import gc
+import os
+import time
+from copy import copy
+
+import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE, Cell
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.utils import get_column_letter, range_boundaries
+
+from monitoramento.esquemas import para_planilha
+from monitoramento.medicoes import bytes_em_memoria, registrar
+
+# ======================================================
+# MODELO DE SAÍDA
+# ======================================================
+MODELO_FILENAME = 'MONITORAMENTO DE COMPONENTE.xlsx'
+MODELO_DIR = os.path.join(os.getcwd(), 'model')
+MODELO_PATH = os.path.join(MODELO_DIR, MODELO_FILENAME)
+
+# DataFrame do notebook -> aba do modelo
+MAPPING = {
+    'df_cf_aba1': 'CREDITO_FINANCEIRO',
+    'df_cf_aba2': 'M_OFERTA_CF_OCI',
+    'df_cf_aba3': 'M_OFERTA_CF_CC',
+    'df_simp_cc': 'SIMP_CF',
+    'df_m1_aba1': 'MODALIDADE_1',
+    'df_m1_aba2': 'M_OFERTA_M1_OCI',
+    'df_m1_aba3': 'M_OFERTA_M1_CC',
+    'df_simp_m1': 'SIMP_M1',
+    'df_proposta_cancelada': 'CCPP-CANCELAR',
+}
+
+# Os dados entram a partir da linha 3; as linhas 1 e 2 são título e cabeçalho
+LINHA_INICIAL = 3
+
+
+# ======================================================
+# ESCRITA DAS ABAS
+# ======================================================
+def _estilos_da_linha(ws, linha, colunas):
+    """Estilo de cada coluna na primeira linha de dados do modelo (ou o da definição da coluna)."""
+    estilos_das_colunas = {}
+    for dimensao in ws.column_dimensions.values():
+        if dimensao.has_style and dimensao.min:
+            for coluna in range(dimensao.min, dimensao.max + 1):
+                estilos_das_colunas[coluna] = dimensao._style
+    estilos = []
+    for coluna in range(1, colunas + 1):
+        celula = ws._cells.get((linha, coluna))
+        estilo = celula._style if celula is not None and celula.has_style else estilos_das_colunas.get(coluna)
+        estilos.append(copy(estilo) if estilo is not None else None)
+    return estilos
+
+
+def _formulas_da_linha(ws, linha, depois_da_coluna):
+    """Colunas calculadas do modelo à direita dos dados: {coluna: célula}.
+
+    Ex.: a coluna CANCELAR da Tabela1 (CREDITO_FINANCEIRO), uma fórmula por
+    linha que precisa acompanhar a quantidade de linhas dos dados.
+    """
+    return {
+        coluna: celula
+        for (lin, coluna), celula in ws._cells.items()
+        if lin == linha and coluna > depois_da_coluna and celula.data_type == 'f'
+    }
+
+
+def _replicar_formulas(ws, formulas, linhas):
+    """Copia cada fórmula da linha modelo para `linhas`, ajustando as referências."""
+    for coluna, modelo in formulas.items():
+        tradutor = Translator(modelo.value, origin=modelo.coordinate)
+        letra = get_column_letter(coluna)
+        for i in linhas:
+            ws._cells[(i, coluna)] = Cell(
+                ws, row=i, column=coluna, value=tradutor.translate_formula(f'{letra}{i}'), style_array=modelo._style
+            )
+
+
+def limpar_linhas(ws, linha_inicial=LINHA_INICIAL):
+    """Remove as células de `linha_inicial` em diante (dados antigos do modelo)."""
+    antigas = [chave for chave in ws._cells if chave[0] >= linha_inicial]
+    for chave in antigas:
+        del ws._cells[chave]
+    return len(antigas)
+
+
+def _ajustar_tabelas(ws, ultima_linha):
+    """Faz as tabelas do Excel da aba terminarem na última linha de dados."""
+    for tabela in ws.tables.values():
+        col_min, lin_min, col_max, _ = range_boundaries(tabela.ref)
+        tabela.ref = f'{get_column_letter(col_min)}{lin_min}:{get_column_letter(col_max)}{max(ultima_linha, lin_min + 1)}'
+        if tabela.autoFilter is not None:
+            tabela.autoFilter.ref = tabela.ref
+
+
+def _tipo_da_coluna(serie):
+    """Tipo de célula do openpyxl ('n' ou 's') válido para a coluna inteira.
+
+    None quando a coluna precisa da conversão valor a valor do openpyxl
+    (datas, tipos misturados, textos que viram fórmula ou erro).
+    """
+    preenchidos = serie.dropna()
+    tipo = pd.api.types.infer_dtype(preenchidos, skipna=True)
+    if tipo in ('integer', 'floating', 'mixed-integer-float', 'decimal') and not pd.api.types.is_bool_dtype(serie):
+        return 'n'
+    if tipo == 'string' or (tipo == 'empty' and len(preenchidos) == 0):
+        textos = preenchidos.astype(str)
+        if (
+            textos.str.contains(ILLEGAL_CHARACTERS_RE.pattern, regex=True).any()
+            or ((textos.str.len() > 1) & textos.str.startswith('=')).any()
+            or textos.isin(list(ERROR_CODES)).any()
+        ):
+            return None
+        return 's'
+    return None
+
+
+def _valores_da_coluna(serie, tipo):
+    """Valores Python da coluna, com None no lugar dos nulos."""
+    if tipo == 's':
+        serie = serie.astype(object).where(serie.isna(), serie.astype(str).str[:32767])
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def sobrescrever_aba(workbook, aba_nome, df, linha_inicial=LINHA_INICIAL):
+    """Grava `df` na aba a partir de `linha_inicial`, uma coluna por vez.
+
+    Substitui o laço ws.cell() por valor: as linhas antigas são removidas
+    de uma vez e o tipo de cada coluna é decidido uma única vez (em vez de
+    o openpyxl inspecionar valor a valor), com as células criadas direto no
+    dicionário da aba com o estilo da coluna no modelo (formato de número,
+    bordas). O título, o cabeçalho e a formatação das linhas acima ficam
+    intactos, as colunas calculadas do modelo à direita dos dados são
+    estendidas a todas as linhas e as tabelas do Excel passam a cobrir
+    exatamente os dados.
+    Retorna os segundos gastos.
+    """
+    if aba_nome not in workbook.sheetnames:
+        print(f"⚠️ Aba '{aba_nome}' não encontrada no modelo.")
+        return None
+
+    t0 = time.perf_counter()
+    ws = workbook[aba_nome]
+    dados = para_planilha(df)
+    estilos = _estilos_da_linha(ws, linha_inicial, len(dados.columns))
+    formulas = _formulas_da_linha(ws, linha_inicial, len(dados.columns))
+    limpar_linhas(ws, linha_inicial)
+
+    linhas = range(linha_inicial, linha_inicial + len(dados))
+    celulas = ws._cells
+    nova = Cell.__new__
+    # Centenas de milhares de células novas disparariam o coletor de lixo
+    # várias vezes sem nada para coletar
+    gc.disable()
+    try:
+        for j, (coluna, estilo) in enumerate(zip(dados.columns, estilos), start=1):
+            tipo = _tipo_da_coluna(dados[coluna])
+            valores = _valores_da_coluna(dados[coluna], tipo)
+            if tipo is None:
+                celulas.update(
+                    ((i, j), Cell(ws, row=i, column=j, value=valor, style_array=estilo))
+                    for i, valor in zip(linhas, valores)
+                )
+                continue
+            estilo = estilo if estilo is not None else StyleArray()
+            for i, valor in zip(linhas, valores):
+                # Mesmo estado que o Cell() deixaria, sem a checagem por valor
+                celula = nova(Cell)
+                celula.parent = ws
+                celula.row = i
+                celula.column = j
+                celula._value = valor
+                celula.data_type = tipo if valor is not None else 'n'
+                celula._style = copy(estilo)
+                celula._hyperlink = None
+                celula._comment = None
+                celulas[(i, j)] = celula
+        _replicar_formulas(ws, formulas, linhas)
+    finally:
+        gc.enable()
+    _ajustar_tabelas(ws, linha_inicial + len(dados) - 1)
+
+    segundos = time.perf_counter() - t0
+    print(f"✅ Aba '{aba_nome}' atualizada com {len(df)} linhas ({segundos:.2f}s).")
+    registrar('saida.sobrescrever_aba', segundos, linhas=len(df), bytes_entrada=bytes_em_memoria(df), item=aba_nome)
+    return segundos
@@ -0,0 +1,781 @@
+"""Saída gerada direto no pacote OOXML do modelo, sem carregar o workbook.
+
+O .xlsx é um zip de XMLs. Só os XMLs das abas de dados do `MAPPING`, as
+tabelas do Excel dessas abas, a aba INFO e o workbook.xml são reescritos, e
+o styles.xml ganha os estilos de data que faltarem; todas as outras partes
+(VISÃO_GERAL, textos compartilhados, imagens) são copiadas sem alteração do
+modelo para o arquivo de saída.
+Cada aba de dados é gerada e comprimida num processo separado; o zip final
+é montado de uma vez, com as abas já comprimidas copiadas byte a byte.
+"""
+import html
+import io
+import os
+import posixpath
+import re
+import shutil
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE
+from openpyxl.formula.tokenizer import Token, Tokenizer
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.numbers import BUILTIN_FORMATS, FORMAT_DATE_DATETIME, FORMAT_DATE_YYYYMMDD2, is_date_format
+from openpyxl.utils import column_index_from_string, get_column_letter, range_boundaries
+
+from monitoramento.esquemas import para_planilha
+from monitoramento.medicoes import medir, registrar
+from monitoramento.planilha import LINHA_INICIAL
+
+_RE_ATRIBUTO = re.compile(r'([\w:]+)="([^"]*)"')
+_RE_LINHA = re.compile(r'<row\b[^>]*?\br="(\d+)"[^>]*?(?:/>|>.*?</row>)', re.S)
+_RE_CELULA = re.compile(r'<c\b[^>]*?\br="([A-Z]+)(\d+)"[^>]*?(?:/>|>.*?</c>)', re.S)
+_RE_COLUNA = re.compile(r'<col\b[^>]*/>')
+# <f ...>texto</f> ou <f .../> (filha de uma fórmula compartilhada: o texto fica na célula mestre)
+_RE_FORMULA = re.compile(r'<f\b([^>]*?)(?:/>|>(.*?)</f>)', re.S)
+# Referência de célula dentro de um operando (a parte depois do '!')
+_RE_REFERENCIA = re.compile(r'(\$?[A-Z]{1,3})(\$?)(\d+)')
+
+CALC_CHAIN = 'xl/calcChain.xml'
+ESTILOS = 'xl/styles.xml'
+
+# Linhas geradas por vez; limita a memória usada por aba
+BLOCO_LINHAS = 5000
+
+# As abas geradas são as partes grandes: compressão baixa, o ganho de
+# tamanho não compensa o tempo
+NIVEL_COMPRESSAO = 1
+
+# Data base do Excel (sistema 1900) para gravar datas como número de série
+_EPOCA_EXCEL = pd.Timestamp('1899-12-30')
+
+
+def _atributos(tag):
+    return {nome: html.unescape(valor) for nome, valor in _RE_ATRIBUTO.findall(tag)}
+
+
+def _resolver(base, alvo):
+    """Caminho de uma relação dentro do zip ('xl/workbook.xml' + 'worksheets/sheet1.xml')."""
+    if alvo.startswith('/'):
+        return alvo.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(base), alvo))
+
+
+def _relacoes(arquivos, parte):
+    """{Id: (Type, caminho)} do .rels de `parte`."""
+    pasta, nome = posixpath.split(parte)
+    rels = posixpath.join(pasta, '_rels', f'{nome}.rels')
+    if rels not in arquivos:
+        return {}
+    relacoes = {}
+    for tag in re.findall(r'<Relationship\b[^>]*/>', arquivos[rels].decode('utf-8')):
+        atributos = _atributos(tag)
+        relacoes[atributos['Id']] = (atributos['Type'], _resolver(parte, atributos['Target']))
+    return relacoes
+
+
+def mapa_abas(arquivos):
+    """{nome da aba: caminho do XML da aba} a partir do workbook.xml."""
+    relacoes = _relacoes(arquivos, 'xl/workbook.xml')
+    abas = {}
+    for tag in re.findall(r'<sheet\b[^>]*/>', arquivos['xl/workbook.xml'].decode('utf-8')):
+        atributos = _atributos(tag)
+        abas[atributos['name']] = relacoes[atributos['r:id']][1]
+    return abas
+
+
+# ======================================================
+# FORMATOS DE DATA
+# ======================================================
+def formato_de_data(serie):
+    """Formato que o openpyxl daria às datas da coluna, ou None se a coluna não é de datas."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return formato_de_data(serie.cat.categories.to_series())
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return FORMAT_DATE_DATETIME
+    if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+        tipo = pd.api.types.infer_dtype(serie, skipna=True)
+        if tipo in ('datetime', 'datetime64'):
+            return FORMAT_DATE_DATETIME
+        if tipo == 'date':
+            return FORMAT_DATE_YYYYMMDD2
+    return None
+
+
+class EstilosDeData:
+    """Estilos do styles.xml com formato de data, criados só quando uma coluna de datas precisa.
+
+    Uma data é gravada como número de série: sem formato de data no estilo,
+    o Excel mostra o número. Como o openpyxl, mantém o estilo da coluna se
+    ele já formata datas e, se não, usa uma cópia dele com o formato de data.
+    """
+
+    def __init__(self, xml):
+        self.xml = xml
+        self._criados = {}
+        xfs = re.search(r'<cellXfs\b[^>]*>(.*?)</cellXfs>', xml, re.S)
+        self._xfs = re.findall(r'<xf\b[^>]*?(?:/>|>.*?</xf>)', xfs.group(1), re.S)
+        self._formatos = {
+            int(a['numFmtId']): a['formatCode']
+            for a in map(_atributos, re.findall(r'<numFmt\b[^>]*/>', xml))
+        }
+
+    def _formato(self, xf):
+        id_formato = int(_atributos(xf[: xf.index('>')]).get('numFmtId', 0))
+        return self._formatos.get(id_formato, BUILTIN_FORMATS.get(id_formato, 'General'))
+
+    def _id_do_formato(self, formato):
+        for id_formato, codigo in self._formatos.items():
+            if codigo == formato:
+                return id_formato
+        id_formato = max([163, *self._formatos]) + 1
+        self._formatos[id_formato] = formato
+        tag = f'<numFmt numFmtId="{id_formato}" formatCode="{html.escape(formato)}"/>'
+        if '<numFmts' in self.xml:
+            self.xml = re.sub(r'<numFmts\b[^>]*>', lambda m: f'<numFmts count="{len(self._formatos)}">', self.xml, count=1)
+            self.xml = self.xml.replace('</numFmts>', tag + '</numFmts>', 1)
+        else:
+            self.xml = re.sub(r'(<styleSheet\b[^>]*>)', lambda m: f'{m.group(1)}<numFmts count="1">{tag}</numFmts>', self.xml, count=1)
+        return id_formato
+
+    def estilo(self, s, formato):
+        """Índice do estilo para datas em `formato` numa célula de estilo `s` (None: estilo 0)."""
+        s = int(s or 0)
+        if is_date_format(self._formato(self._xfs[s])):
+            return str(s)
+        if (s, formato) not in self._criados:
+            xf = self._xfs[s]
+            fim = xf.index('>')
+            fechamento = '/>' if xf[fim - 1] == '/' else xf[fim:]
+            abertura = re.sub(r'\s(?:numFmtId|applyNumberFormat)="[^"]*"', '', xf[:fim].rstrip('/').rstrip())
+            novo = f'{abertura} numFmtId="{self._id_do_formato(formato)}" applyNumberFormat="1"{fechamento}'
+            self._xfs.append(novo)
+            self._criados[(s, formato)] = str(len(self._xfs) - 1)
+            self.xml = re.sub(r'<cellXfs\b[^>]*>', f'<cellXfs count="{len(self._xfs)}">', self.xml, count=1)
+            self.xml = self.xml.replace('</cellXfs>', novo + '</cellXfs>', 1)
+        return self._criados[(s, formato)]
+
+
+# ======================================================
+# CÉLULAS EM XML, UMA COLUNA POR VEZ
+# ======================================================
+def _escapar(textos):
+    """Escapa uma série de textos (object) para XML, sem os caracteres proibidos."""
+    return (
+        textos.str.replace(ILLEGAL_CHARACTERS_RE, '', regex=True)
+        .str.slice(0, 32767)
+        .str.replace('&', '&amp;', regex=False)
+        .str.replace('<', '&lt;', regex=False)
+        .str.replace('>', '&gt;', regex=False)
+    )
+
+
+def _texto_inline(textos):
+    """Conteúdo <is> de textos inline, preservando espaços nas pontas."""
+    escapados = _escapar(textos).to_numpy(dtype=object)
+    espacos = textos.str.match(r'^\s|.*\s$').to_numpy(dtype=bool)
+    return np.where(espacos, '<is><t xml:space="preserve">' + escapados, '<is><t>' + escapados) + '</t></is>'
+
+
+def _valores(serie):
+    """Conteúdo <v> de cada valor, pelo texto do próprio valor."""
+    textos = serie.to_numpy(dtype=object, na_value=0).astype(str).astype(object)
+    return '<v>' + textos + '</v>'
+
+
+def _conteudo_da_coluna(serie):
+    """(tipo OOXML, conteúdo XML de cada valor) de uma coluna já em `para_planilha`.
+
+    O conteúdo é um array de objetos (str), com None nos nulos. Os textos
+    ficam como object do começo ao fim: concatenar milhares de strings em
+    séries de texto do pandas custa uma conversão para Arrow a cada passo.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return _conteudo_da_coluna(serie.astype(serie.cat.categories.dtype))
+    vazios = serie.isna().to_numpy(dtype=bool)
+    if pd.api.types.is_bool_dtype(serie):
+        tipo, conteudo = 'b', _valores(serie.fillna(False).astype(int))
+    elif pd.api.types.is_datetime64_any_dtype(serie):
+        tipo, conteudo = 'n', _valores((serie - _EPOCA_EXCEL) / pd.Timedelta(days=1))
+    elif pd.api.types.is_numeric_dtype(serie):
+        tipo, conteudo = 'n', _valores(serie)
+    else:
+        tipo = pd.api.types.infer_dtype(serie, skipna=True)
+        if tipo in ('datetime', 'datetime64', 'date'):
+            return _conteudo_da_coluna(pd.to_datetime(serie))
+        if tipo in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+            tipo, conteudo = 'n', _valores(serie)
+        elif tipo in ('mixed', 'mixed-integer'):
+            # Números e textos na mesma coluna: cada valor no seu tipo, como no openpyxl
+            tipo, conteudo = None, np.array([_conteudo_do_valor(v) for v in serie], dtype=object)
+        else:
+            textos = serie.to_numpy(dtype=object, na_value='').astype(str).astype(object)
+            tipo, conteudo = 'inlineStr', _texto_inline(pd.Series(textos, dtype=object))
+    conteudo[vazios] = None
+    return tipo, conteudo
+
+
+def _conteudo_do_valor(valor):
+    """Atributo t e conteúdo de um valor avulso (colunas de tipos misturados)."""
+    if pd.isna(valor):
+        return None
+    if isinstance(valor, (bool, np.bool_)):
+        return f' t="b"><v>{int(valor)}</v>'
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        return f' t="n"><v>{valor}</v>'
+    return ' t="inlineStr">' + _texto_inline(pd.Series([str(valor)], dtype=object))[0]
+
+
+def _molde_da_formula(formula, linha_modelo):
+    """Pedaços da fórmula entre as referências relativas à `linha_modelo`.
+
+    `str(i).join(pedacos)` dá a fórmula da linha i, sem passar pelo
+    Translator a cada linha. None quando alguma referência relativa aponta
+    para outra linha (aí cada linha é traduzida pelo Translator).
+    """
+    pedacos, atual = [], ''
+    for token in Tokenizer(formula).items:
+        if token.type != Token.OPERAND or token.subtype != Token.RANGE or '[' in token.value:
+            atual += token.value
+            continue
+        folha, _, referencia = token.value.rpartition('!')
+        atual += folha + ('!' if folha else '')
+        posicao = 0
+        for ref in _RE_REFERENCIA.finditer(referencia):
+            if ref.group(2):
+                continue
+            if int(ref.group(3)) != linha_modelo:
+                return None
+            atual += referencia[posicao : ref.start(3)]
+            pedacos.append(atual)
+            atual, posicao = '', ref.end(3)
+        atual += referencia[posicao:]
+    return [*pedacos, atual]
+
+
+def _formulas_traduzidas(formula, coluna, linha_modelo, numeros):
+    """Texto XML da fórmula (sem o '=') em cada uma das linhas `numeros`."""
+    molde = _molde_da_formula(formula, linha_modelo)
+    if molde is not None and len(molde) == 1:
+        # Sem referências relativas (ex.: [#This Row]): a mesma fórmula em todas as linhas
+        return np.full(len(numeros), html.escape(formula[1:], quote=False), dtype=object)
+    if molde is not None:
+        # O Tokenizer já tira o '=' do começo
+        molde = [html.escape(pedaco, quote=False) for pedaco in molde]
+        return np.array([i.join(molde) for i in numeros], dtype=object)
+    letra = get_column_letter(coluna)
+    tradutor = Translator(formula, origin=f'{letra}{linha_modelo}')
+    return np.array([html.escape(tradutor.translate_formula(f'{letra}{i}')[1:], quote=False) for i in numeros], dtype=object)
+
+
+def _cache_da_coluna(valores):
+    """(atributo t, <v>) do valor calculado de cada célula de fórmula de `valores`.
+
+    Nulo vira #N/A e textos de erro ('#VALUE!') viram células de erro, como no openpyxl.
+    """
+    valores = pd.Series(valores, dtype=object).to_numpy()
+    textos = np.frompyfunc(lambda v: isinstance(v, str), 1, 1)(valores).astype(bool)
+    erros = textos & pd.Series(valores).isin(list(ERROR_CODES)).to_numpy()
+    vazios = pd.isna(valores)
+    textos &= ~erros
+    numeros = ~(textos | erros | vazios)
+
+    tipos = np.full(len(valores), ' t="e"', dtype=object)
+    conteudo = np.full(len(valores), '<v>#N/A</v>', dtype=object)
+    tipos[numeros], tipos[textos] = '', ' t="str"'
+    if numeros.any():
+        booleanos = np.frompyfunc(lambda v: isinstance(v, (bool, np.bool_)), 1, 1)(valores).astype(bool) & numeros
+        tipos[booleanos] = ' t="b"'
+        conteudo[numeros] = '<v>' + np.where(booleanos, valores.astype(bool).astype(int), valores)[numeros].astype(str) + '</v>'
+    if textos.any():
+        conteudo[textos] = '<v>' + _escapar(pd.Series(valores[textos], dtype=object)).to_numpy(dtype=object) + '</v>'
+    conteudo[erros] = '<v>' + valores[erros] + '</v>'
+    return tipos, conteudo
+
+
+def _linhas_xml(dados, primeira_linha, estilos, formulas, linha_modelo, em_cache=None):
+    """Uma string <row> por linha de `dados`, montadas coluna a coluna.
+
+    `formulas` vêm da `linha_modelo` e são traduzidas para cada linha; as
+    colunas de `em_cache` (letra -> valores, alinhados a `dados`) gravam o
+    valor já calculado junto da fórmula.
+    """
+    numeros = np.arange(primeira_linha, primeira_linha + len(dados)).astype(str).astype(object)
+    partes = []
+    for j, coluna in enumerate(dados.columns, start=1):
+        tipo, conteudo = _conteudo_da_coluna(dados[coluna])
+        estilo = f' s="{estilos[j]}"' if estilos.get(j) else ''
+        # Tipo None: o conteúdo de cada valor já traz o próprio atributo t
+        inicio = f'<c r="{get_column_letter(j)}' + numeros + (f'"{estilo} t="{tipo}">' if tipo else f'"{estilo}')
+        vazias = pd.isna(conteudo)
+        celulas = inicio + np.where(vazias, '', conteudo) + '</c>'
+        if vazias.any():
+            # Célula vazia só é gravada se tiver estilo, como faz o openpyxl
+            celulas[vazias] = (f'<c r="{get_column_letter(j)}' + numeros[vazias] + f'"{estilo}/>') if estilo else ''
+        partes.append(celulas)
+
+    em_cache = em_cache if em_cache is not None else {}
+    for coluna, (formula, estilo) in formulas.items():
+        letra = get_column_letter(coluna)
+        traduzidas = _formulas_traduzidas(formula, coluna, linha_modelo, numeros)
+        estilo = f' s="{estilo}"' if estilo else ''
+        if letra in em_cache:
+            tipos, valores = _cache_da_coluna(em_cache[letra])
+            partes.append(f'<c r="{letra}' + numeros + f'"{estilo}' + tipos + '><f>' + traduzidas + '</f>' + valores + '</c>')
+        else:
+            partes.append(f'<c r="{letra}' + numeros + f'"{estilo} t="str"><f>' + traduzidas + '</f></c>')
+
+    aberturas = '<row r="' + numeros + '">'
+    return [''.join(linha) + '</row>' for linha in zip(aberturas, *partes)]
+
+
+# ======================================================
+# REESCRITA DAS PARTES
+# ======================================================
+def _compartilhadas(xml):
+    """{si: (fórmula, célula mestre)} das fórmulas compartilhadas da aba."""
+    if 't="shared"' not in xml:
+        return {}
+    mestres = {}
+    for celula in _RE_CELULA.finditer(xml):
+        formula = _RE_FORMULA.search(celula.group(0))
+        if formula and formula.group(2) is not None:
+            atributos = _atributos(formula.group(1))
+            if atributos.get('t') == 'shared':
+                mestres[atributos['si']] = ('=' + html.unescape(formula.group(2)), celula.group(1) + celula.group(2))
+    return mestres
+
+
+def _texto_da_formula(formula, ref, compartilhadas):
+    """Fórmula ('=...') da célula `ref`; as filhas de fórmulas compartilhadas são traduzidas da mestre."""
+    if formula.group(2) is not None:
+        return '=' + html.unescape(formula.group(2))
+    atributos = _atributos(formula.group(1))
+    if atributos.get('t') != 'shared' or atributos.get('si') not in compartilhadas:
+        raise ValueError(f'Célula {ref}: fórmula sem texto e sem célula mestre ({formula.group(0)}).')
+    texto, mestre = compartilhadas[atributos['si']]
+    return Translator(texto, origin=mestre).translate_formula(ref)
+
+
+def _modelo_da_linha(xml_linha, colunas_xml, compartilhadas=None):
+    """Estilos {coluna: s} e fórmulas {coluna: (fórmula, s)} da linha modelo.
+
+    `compartilhadas` (ver `_compartilhadas`) resolve as células filhas de
+    fórmulas compartilhadas (<f t="shared" si="0"/>).
+    """
+    estilos = {}
+    for tag in _RE_COLUNA.findall(colunas_xml):
+        atributos = _atributos(tag)
+        if atributos.get('style'):
+            for coluna in range(int(atributos['min']), int(atributos['max']) + 1):
+                estilos[coluna] = atributos['style']
+
+    formulas = {}
+    for celula in _RE_CELULA.finditer(xml_linha or ''):
+        coluna = column_index_from_string(celula.group(1))
+        atributos = _atributos(celula.group(0)[: celula.group(0).index('>')])
+        if atributos.get('s'):
+            estilos[coluna] = atributos['s']
+        formula = _RE_FORMULA.search(celula.group(0))
+        if formula:
+            ref = celula.group(1) + celula.group(2)
+            formulas[coluna] = (_texto_da_formula(formula, ref, compartilhadas or {}), atributos.get('s'))
+    return estilos, formulas
+
+
+def _com_valores_em_cache(xml_linha, valores):
+    """Troca o valor calculado das células de fórmula de `valores` ({'B1': 10}) na linha."""
+
+    def trocar(celula):
+        ref = celula.group(1) + celula.group(2)
+        formula = _RE_FORMULA.search(celula.group(0))
+        if ref not in valores or formula is None:
+            return celula.group(0)
+        abertura = celula.group(0)[: celula.group(0).index('>')]
+        abertura = re.sub(r'\st="[^"]*"', '', abertura.rstrip('/'))
+        tipos, conteudo = _cache_da_coluna([valores[ref]])
+        return f'{abertura}{tipos[0]}>{formula.group(0)}{conteudo[0]}</c>'
+
+    return _RE_CELULA.sub(trocar, xml_linha)
+
+
+def _corpo(xml):
+    """(início da tag <sheetData, fim do </sheetData>, conteúdo entre as tags)."""
+    inicio = xml.index('<sheetData')
+    fim_tag = xml.index('>', inicio)
+    if xml[fim_tag - 1] == '/':
+        return inicio, fim_tag + 1, ''
+    fim = xml.index('</sheetData>', fim_tag) + len('</sheetData>')
+    return inicio, fim, xml[fim_tag + 1 : fim - len('</sheetData>')]
+
+
+def modelo_da_aba(xml, linha_inicial=LINHA_INICIAL):
+    """Estilos {coluna: s} e fórmulas {coluna: (fórmula, s)} da linha `linha_inicial` da aba."""
+    corpo = _corpo(xml)[2]
+    modelo = next((linha.group(0) for linha in _RE_LINHA.finditer(corpo) if int(linha.group(1)) == linha_inicial), None)
+    cols = re.search(r'<cols>.*?</cols>', xml, re.S)
+    return _modelo_da_linha(modelo, cols.group(0) if cols else '', _compartilhadas(xml))
+
+
+def reescrever_aba(xml, df, linha_inicial=LINHA_INICIAL, em_cache=None, celulas_em_cache=None, estilos_de_data=None):
+    """Gera, em pedaços de texto, o XML da aba com `df` a partir de `linha_inicial`.
+
+    As linhas acima ficam como estão no modelo; as linhas antigas a partir
+    de `linha_inicial` são descartadas. Cada coluna recebe o estilo da linha
+    modelo (ou da definição <col>), e as colunas calculadas à direita dos
+    dados são estendidas a todas as linhas. As linhas saem em blocos de
+    `BLOCO_LINHAS`, para que a aba inteira nunca fique em memória.
+
+    `em_cache` (DataFrame com uma coluna por letra, alinhado a `df`) traz os
+    valores já calculados das colunas de fórmula; `celulas_em_cache`
+    ({'B1': valor}), os das fórmulas nas linhas mantidas. `estilos_de_data`
+    ({coluna: s}) troca o estilo das colunas de datas (ver `EstilosDeData`).
+    """
+    dados = para_planilha(df)
+    inicio, fim, corpo = _corpo(xml)
+    mantidas = [
+        _com_valores_em_cache(linha.group(0), celulas_em_cache) if celulas_em_cache else linha.group(0)
+        for linha in _RE_LINHA.finditer(corpo)
+        if int(linha.group(1)) < linha_inicial
+    ]
+    estilos, formulas = modelo_da_aba(xml, linha_inicial)
+    estilos.update(estilos_de_data or {})
+    formulas = {c: f for c, f in formulas.items() if c > len(dados.columns)}
+
+    cabecalho = xml[:inicio]
+    dimensao = re.search(r'<dimension ref="([^"]+)"/>', cabecalho)
+    if dimensao:
+        col_min, lin_min, col_max, _ = range_boundaries(dimensao.group(1))
+        col_max = max([col_max, len(dados.columns), *formulas])
+        lin_max = linha_inicial + len(dados) - 1
+        nova = f'{get_column_letter(col_min)}{lin_min}:{get_column_letter(col_max)}{lin_max}'
+        cabecalho = cabecalho[: dimensao.start(1)] + nova + cabecalho[dimensao.end(1) :]
+
+    yield cabecalho + '<sheetData>' + ''.join(mantidas)
+    for bloco in range(0, len(dados), BLOCO_LINHAS):
+        parte = dados.iloc[bloco : bloco + BLOCO_LINHAS]
+        cache = em_cache.iloc[bloco : bloco + BLOCO_LINHAS] if em_cache is not None else None
+        yield ''.join(_linhas_xml(parte, linha_inicial + bloco, estilos, formulas, linha_inicial, cache))
+    yield '</sheetData>' + xml[fim:]
+
+
+def ajustar_tabela(xml, ultima_linha):
+    """Faz a tabela do Excel terminar em `ultima_linha` (mínimo: cabeçalho + 1)."""
+    ref = re.search(r'<table\b[^>]*?\bref="([^"]+)"', xml)
+    col_min, lin_min, col_max, _ = range_boundaries(ref.group(1))
+    nova = f'{get_column_letter(col_min)}{lin_min}:{get_column_letter(col_max)}{max(ultima_linha, lin_min + 1)}'
+    xml = xml[: ref.start(1)] + nova + xml[ref.end(1) :]
+    xml = re.sub(r'(<autoFilter\b[^>]*?\bref=")[^"]+"', lambda m: f'{m.group(1)}{nova}"', xml, count=1)
+    # A ordenação salva referencia as linhas antigas
+    return re.sub(r'<sortState\b[^>]*?(?:/>|>.*?</sortState>)', '', xml, count=1, flags=re.S)
+
+
+def definir_textos(xml, textos):
+    """Grava textos inline em células da aba ({'H2': 'texto'}), mantendo o estilo.
+
+    Fórmulas que só apontam para uma dessas células (ex.: =$H$2) recebem o
+    texto como valor calculado.
+    """
+    for ref, texto in textos.items():
+        letra, numero = re.fullmatch(r'([A-Z]+)(\d+)', ref).groups()
+        conteudo = _texto_inline(pd.Series([str(texto)], dtype=object))[0]
+        xml = xml.replace('<sheetData/>', '<sheetData></sheetData>')
+        linha = next((m for m in _RE_LINHA.finditer(xml) if m.group(1) == numero), None)
+        if linha is None:
+            posterior = next((m for m in _RE_LINHA.finditer(xml) if int(m.group(1)) > int(numero)), None)
+            posicao = posterior.start() if posterior else xml.index('</sheetData>')
+            xml = xml[:posicao] + f'<row r="{numero}"></row>' + xml[posicao:]
+            linha = next(m for m in _RE_LINHA.finditer(xml) if m.group(1) == numero)
+
+        conteudo_linha = linha.group(0)
+        celula = next((m for m in _RE_CELULA.finditer(conteudo_linha) if m.group(1) == letra), None)
+        estilo = ''
+        if celula is not None:
+            s = _atributos(celula.group(0)[: celula.group(0).index('>')]).get('s')
+            estilo = f' s="{s}"' if s else ''
+        nova = f'<c r="{ref}"{estilo} t="inlineStr">{conteudo}</c>'
+        if celula is not None:
+            conteudo_linha = conteudo_linha[: celula.start()] + nova + conteudo_linha[celula.end() :]
+        else:
+            coluna = column_index_from_string(letra)
+            posterior = next(
+                (m for m in _RE_CELULA.finditer(conteudo_linha) if column_index_from_string(m.group(1)) > coluna), None
+            )
+            if conteudo_linha.endswith('/>') and '</row>' not in conteudo_linha:
+                conteudo_linha = conteudo_linha[:-2] + '></row>'
+            posicao = posterior.start() if posterior else conteudo_linha.rindex('</row>')
+            conteudo_linha = conteudo_linha[:posicao] + nova + conteudo_linha[posicao:]
+        xml = xml[: linha.start()] + conteudo_linha + xml[linha.end() :]
+
+    referencias = {}
+    compartilhadas = _compartilhadas(xml)
+    for celula in _RE_CELULA.finditer(xml):
+        formula = _RE_FORMULA.search(celula.group(0))
+        texto = formula and _texto_da_formula(formula, celula.group(1) + celula.group(2), compartilhadas)
+        alvo = texto and re.fullmatch(r'=\$?([A-Z]+)\$?(\d+)', texto.strip())
+        if alvo and alvo.group(1) + alvo.group(2) in textos:
+            referencias[celula.group(1) + celula.group(2)] = str(textos[alvo.group(1) + alvo.group(2)])
+    return _com_valores_em_cache(xml, referencias) if referencias else xml
+
+
+def _sem_calc_chain(arquivos, recalcular=True):
+    """Remove a cadeia de cálculo (o Excel refaz ao abrir) e, com `recalcular`, pede recálculo completo.
+
+    A cadeia do modelo aponta para células de fórmulas das linhas antigas;
+    mantê-la faria o Excel pedir reparo do arquivo.
+    """
+    arquivos.pop(CALC_CHAIN, None)
+    rels = arquivos['xl/_rels/workbook.xml.rels'].decode('utf-8')
+    arquivos['xl/_rels/workbook.xml.rels'] = re.sub(r'<Relationship\b[^>]*Target="[^"]*calcChain\.xml"[^>]*/>', '', rels).encode('utf-8')
+    tipos = arquivos['[Content_Types].xml'].decode('utf-8')
+    arquivos['[Content_Types].xml'] = re.sub(r'<Override\b[^>]*PartName="/xl/calcChain\.xml"[^>]*/>', '', tipos).encode('utf-8')
+
+    if not recalcular:
+        return
+    workbook = arquivos['xl/workbook.xml'].decode('utf-8')
+    calc = re.search(r'<calcPr\b[^>]*?/>', workbook)
+    if calc is None:
+        workbook = workbook.replace('</workbook>', '<calcPr fullCalcOnLoad="1"/></workbook>')
+    elif 'fullCalcOnLoad=' not in calc.group(0):
+        workbook = workbook[: calc.end() - 2] + ' fullCalcOnLoad="1"/>' + workbook[calc.end() :]
+    arquivos['xl/workbook.xml'] = workbook.encode('utf-8')
+
+
+# ======================================================
+# GERAÇÃO DO ARQUIVO
+# ======================================================
+def _gerar_aba(xml, df, caminho_bruto, linha_inicial=LINHA_INICIAL, em_cache=None, celulas_em_cache=None, estilos_de_data=None):
+    """Grava em `caminho_bruto` o XML da aba já comprimido (deflate puro, como no zip).
+
+    Roda nos processos de trabalho. Retorna (crc32, bytes comprimidos,
+    bytes do XML, segundos).
+    """
+    t0 = time.perf_counter()
+    compressor = zlib.compressobj(NIVEL_COMPRESSAO, zlib.DEFLATED, -zlib.MAX_WBITS)
+    crc = tamanho = 0
+    with open(caminho_bruto, 'wb') as arquivo:
+        for pedaco in reescrever_aba(xml, df, linha_inicial, em_cache, celulas_em_cache, estilos_de_data):
+            dados = pedaco.encode('utf-8')
+            crc = zlib.crc32(dados, crc)
+            tamanho += len(dados)
+            arquivo.write(compressor.compress(dados))
+        arquivo.write(compressor.flush())
+        comprimido = arquivo.tell()
+    return crc, comprimido, tamanho, time.perf_counter() - t0
+
+
+# Tamanhos e posições a partir dos quais o zip precisa das extensões zip64;
+# nos campos comuns fica a marca e o valor vai no campo extra zip64
+LIMITE_ZIP64 = 0xFFFFFFFF
+LIMITE_ENTRADAS_ZIP64 = 0xFFFF
+_MARCA_ZIP64 = 0xFFFFFFFF
+_MARCA_ENTRADAS_ZIP64 = 0xFFFF
+
+
+def _data_dos(date_time):
+    ano, mes, dia, hora, minuto, segundo = date_time
+    return (hora << 11) | (minuto << 5) | (segundo // 2), ((ano - 1980) << 9) | (mes << 5) | dia
+
+
+class EscritorZip:
+    """Escreve um zip cujas partes já vêm comprimidas em deflate puro.
+
+    As abas são comprimidas nos processos de trabalho; aqui só se gravam os
+    cabeçalhos locais, o conteúdo copiado byte a byte e o diretório central,
+    com as extensões zip64 quando um tamanho, uma posição ou a quantidade de
+    partes passa do limite do zip comum.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self._entradas = []
+
+    def adicionar(self, info_modelo, dados, nivel=NIVEL_COMPRESSAO):
+        """Comprime `dados` (bytes) e grava a parte com o nome e a data de `info_modelo`."""
+        compressor = zlib.compressobj(nivel, zlib.DEFLATED, -zlib.MAX_WBITS)
+        comprimido = compressor.compress(dados) + compressor.flush()
+        self.adicionar_comprimida(info_modelo, io.BytesIO(comprimido), zlib.crc32(dados), len(comprimido), len(dados))
+
+    def adicionar_comprimida(self, info_modelo, origem, crc, comprimido, tamanho):
+        """Grava uma parte já comprimida, lida de `origem` (arquivo aberto em modo binário)."""
+        nome = info_modelo.filename.encode('utf-8')
+        # Nome fora do ASCII: bit 11 (nome em UTF-8)
+        flags = 0x800 if not info_modelo.filename.isascii() else 0
+        zip64 = comprimido >= LIMITE_ZIP64 or tamanho >= LIMITE_ZIP64
+        extra = struct.pack('<HHQQ', 0x0001, 16, tamanho, comprimido) if zip64 else b''
+        hora, data = _data_dos(info_modelo.date_time)
+        posicao = self.arquivo.tell()
+        self.arquivo.write(
+            struct.pack(
+                '<IHHHHHIIIHH',
+                0x04034B50,
+                45 if zip64 else 20,
+                flags,
+                zipfile.ZIP_DEFLATED,
+                hora,
+                data,
+                crc,
+                _MARCA_ZIP64 if zip64 else comprimido,
+                _MARCA_ZIP64 if zip64 else tamanho,
+                len(nome),
+                len(extra),
+            )
+            + nome
+            + extra
+        )
+        shutil.copyfileobj(origem, self.arquivo)
+        self._entradas.append((nome, flags, hora, data, crc, comprimido, tamanho, info_modelo.create_system, info_modelo.external_attr, posicao))
+
+    def fechar(self):
+        """Grava o diretório central e o fim do zip."""
+        inicio = self.arquivo.tell()
+        for nome, flags, hora, data, crc, comprimido, tamanho, sistema, atributos, posicao in self._entradas:
+            grandes = [v for v in (tamanho, comprimido, posicao) if v >= LIMITE_ZIP64]
+            extra = struct.pack(f'<HH{len(grandes)}Q', 0x0001, 8 * len(grandes), *grandes) if grandes else b''
+            self.arquivo.write(
+                struct.pack(
+                    '<IHHHHHHIIIHHHHHII',
+                    0x02014B50,
+                    (sistema << 8) | (45 if grandes else 20),
+                    45 if grandes else 20,
+                    flags,
+                    zipfile.ZIP_DEFLATED,
+                    hora,
+                    data,
+                    crc,
+                    _MARCA_ZIP64 if comprimido >= LIMITE_ZIP64 else comprimido,
+                    _MARCA_ZIP64 if tamanho >= LIMITE_ZIP64 else tamanho,
+                    len(nome),
+                    len(extra),
+                    0,
+                    0,
+                    0,
+                    atributos,
+                    _MARCA_ZIP64 if posicao >= LIMITE_ZIP64 else posicao,
+                )
+                + nome
+                + extra
+            )
+        fim = self.arquivo.tell()
+        entradas, tamanho = len(self._entradas), fim - inicio
+        if entradas >= LIMITE_ENTRADAS_ZIP64 or inicio >= LIMITE_ZIP64 or tamanho >= LIMITE_ZIP64:
+            self.arquivo.write(struct.pack('<IQHHIIQQQQ', 0x06064B50, 44, 45, 45, 0, 0, entradas, entradas, tamanho, inicio))
+            self.arquivo.write(struct.pack('<IIQI', 0x07064B50, 0, fim, 1))
+            entradas, tamanho, inicio = _MARCA_ENTRADAS_ZIP64, _MARCA_ZIP64, _MARCA_ZIP64
+        self.arquivo.write(struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, entradas, entradas, tamanho, inicio, 0))
+
+
+def gerar_saida_zip(
+    modelo_path,
+    destino,
+    abas,
+    textos_info=None,
+    linha_inicial=LINHA_INICIAL,
+    processos=None,
+    em_cache=None,
+    celulas_em_cache=None,
+):
+    """Grava em `destino` o modelo com os DataFrames de `abas` ({aba: df}).
+
+    `textos_info` ({'H2': ..., 'G1': ...}) vai para a aba INFO. Cada aba de
+    dados é gerada e comprimida em um de `processos` processos (padrão: um
+    por aba, até o número de núcleos; 1 gera tudo neste processo); depois o
+    zip final é montado de uma vez, com as partes que não mudam copiadas do
+    modelo. Retorna os segundos gastos.
+
+    `em_cache` ({aba: DataFrame por letra}) e `celulas_em_cache` ({aba:
+    {'B1': valor}}) trazem os valores das fórmulas já calculados (ver
+    `monitoramento.visao_geral`); uma aba só de fórmulas (ex.: VISÃO_GERAL)
+    ganha uma linha por linha do seu DataFrame de valores. Com os valores
+    em cache o Excel não é obrigado a recalcular tudo ao abrir.
+    """
+    t0 = time.perf_counter()
+    with zipfile.ZipFile(modelo_path) as modelo:
+        infos = modelo.infolist()
+        arquivos = {info.filename: modelo.read(info.filename) for info in infos}
+
+    caminhos = mapa_abas(arquivos)
+    em_cache = em_cache or {}
+    celulas_em_cache = celulas_em_cache or {}
+    # Abas só de fórmulas: nenhuma coluna de dados, uma linha por valor calculado
+    abas = {**{aba: pd.DataFrame(index=valores.index) for aba, valores in em_cache.items()}, **abas}
+    geradas = {}
+    for aba_nome, df in abas.items():
+        if aba_nome not in caminhos:
+            print(f"⚠️ Aba '{aba_nome}' não encontrada no modelo.")
+            continue
+        caminho = caminhos[aba_nome]
+        geradas[caminho] = (aba_nome, df)
+        # As tabelas só dependem da quantidade de linhas, conhecida de antemão
+        for tipo, parte in _relacoes(arquivos, caminho).values():
+            if tipo.endswith('/table'):
+                ultima_linha = linha_inicial + len(df) - 1
+                arquivos[parte] = ajustar_tabela(arquivos[parte].decode('utf-8'), ultima_linha).encode('utf-8')
+
+    if textos_info:
+        if 'INFO' in caminhos:
+            caminho = caminhos['INFO']
+            arquivos[caminho] = definir_textos(arquivos[caminho].decode('utf-8'), textos_info).encode('utf-8')
+        else:
+            print("   ⚠️ Aba 'INFO' não encontrada no arquivo modelo.")
+    _sem_calc_chain(arquivos, recalcular=not em_cache)
+
+    # Colunas de datas: estilo com formato de data, criado no styles.xml se preciso
+    estilos = EstilosDeData(arquivos[ESTILOS].decode('utf-8'))
+    estilos_de_data = {}
+    for caminho, (aba_nome, df) in geradas.items():
+        colunas = {j: formato_de_data(df[c]) for j, c in enumerate(df.columns, start=1)}
+        colunas = {j: formato for j, formato in colunas.items() if formato}
+        if colunas:
+            modelo = modelo_da_aba(arquivos[caminho].decode('utf-8'), linha_inicial)[0]
+            estilos_de_data[caminho] = {j: estilos.estilo(modelo.get(j), formato) for j, formato in colunas.items()}
+    arquivos[ESTILOS] = estilos.xml.encode('utf-8')
+
+    pasta_destino = os.path.dirname(destino) or '.'
+    os.makedirs(pasta_destino, exist_ok=True)
+    processos = processos or min(len(geradas), os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory(dir=pasta_destino) as pasta_abas:
+        tarefas = [
+            (
+                arquivos.pop(caminho).decode('utf-8'),
+                df,
+                os.path.join(pasta_abas, f'{i}.deflate'),
+                linha_inicial,
+                em_cache.get(aba_nome),
+                celulas_em_cache.get(aba_nome),
+                estilos_de_data.get(caminho),
+            )
+            for i, (caminho, (aba_nome, df)) in enumerate(geradas.items())
+        ]
+        if processos > 1:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                resultados = list(executor.map(_gerar_aba, *zip(*tarefas)))
+        else:
+            resultados = [_gerar_aba(*tarefa) for tarefa in tarefas]
+        comprimidas = {caminho: (tarefa[2], *resultado) for caminho, tarefa, resultado in zip(geradas, tarefas, resultados)}
+        for aba_nome, df in geradas.values():
+            _, _, comprimido, tamanho, segundos = comprimidas[caminhos[aba_nome]]
+            print(f"✅ Aba '{aba_nome}' atualizada com {len(df)} linhas ({segundos:.2f}s).")
+            registrar('saida.aba', segundos, linhas=len(df), bytes_entrada=tamanho, bytes_saida=comprimido, item=aba_nome)
+
+        temporario = f'{destino}.tmp'
+        with medir('saida.montar_xlsx', item=os.path.basename(destino)) as medida:
+            with open(temporario, 'wb') as arquivo:
+                saida = EscritorZip(arquivo)
+                for info in infos:
+                    if info.filename in comprimidas:
+                        caminho_bruto, crc, comprimido, tamanho, _ = comprimidas[info.filename]
+                        with open(caminho_bruto, 'rb') as bruto:
+                            saida.adicionar_comprimida(info, bruto, crc, comprimido, tamanho)
+                    elif info.filename in arquivos:
+                        saida.adicionar(info, arquivos[info.filename])
+                saida.fechar()
+            medida.update(bytes_entrada=os.path.getsize(modelo_path), bytes_saida=os.path.getsize(temporario))
+    os.replace(temporario, destino)
+    return time.perf_counter() - t0
@@ -0,0 +1,285 @@
+"""Pool de navegadores Edge mantidos abertos com o painel já carregado.
+
+O serviço sobe N instâncias do Edge com depuração remota, deixa o mashup
+do INVESTSUS carregado em cada uma e atualiza periodicamente as que estão
+livres. O notebook retira uma sessão, conecta o Selenium a ela, faz os
+downloads e a devolve, sem pagar a inicialização do navegador nem o
+carregamento do Qlik a cada execução:
+
+    python -m monitoramento.pool_navegadores --sessoes 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium import webdriver
+from selenium.webdriver.edge.options import Options
+from selenium.webdriver.edge.service import Service
+
+from monitoramento.esperas import aguardar_pagina_carregada
+from monitoramento.painel import URL_PAINEL
+from monitoramento.perfil_edge import CACHE_EDGE_DIR, argumentos_edge, bloquear_recursos
+
+# ======================================================
+# CONFIGURAÇÕES DO POOL
+# ======================================================
+EDGE_PATH = os.getenv(
+    'EDGE_PATH', r'C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe'
+)
+DRIVER_PATH = os.path.join(os.getcwd(), 'web', 'msedgedriver.exe')
+PERFIS_DIR = os.path.join(os.getcwd(), 'web', 'pool')
+# O serviço (--porta) e os clientes (notebook, pipeline) leem a mesma variável
+PORTA_POOL = int(os.getenv('PORTA_POOL_NAVEGADORES', '8766'))
+URL_POOL = f'http://127.0.0.1:{PORTA_POOL}'
+PRIMEIRA_PORTA_DEPURACAO = 9300
+
+
+# ======================================================
+# CONEXÃO DO SELENIUM A UM EDGE JÁ ABERTO
+# ======================================================
+def conectar_driver(endereco, download_dir=None, driver_path=DRIVER_PATH):
+    """Conecta o Selenium ao Edge em `endereco` (host:porta de depuração)."""
+    edge_options = Options()
+    edge_options.debugger_address = endereco
+    driver = webdriver.Edge(service=Service(executable_path=driver_path), options=edge_options)
+    bloquear_recursos(driver)
+
+    if download_dir:
+        os.makedirs(download_dir, exist_ok=True)
+        driver.execute_cdp_cmd(
+            'Page.setDownloadBehavior',
+            {'behavior': 'allow', 'downloadPath': download_dir},
+        )
+    return driver
+
+
+def desconectar_driver(driver):
+    """Encerra apenas o msedgedriver, mantendo o navegador aberto no pool."""
+    driver.service.stop()
+
+
+# ======================================================
+# SERVIÇO (DAEMON)
+# ======================================================
+class PoolNavegadores:
+    def __init__(self, quantidade, intervalo_min=10, edge_path=EDGE_PATH):
+        self.edge_path = edge_path
+        self.intervalo_min = intervalo_min
+        self.trava = threading.Lock()
+        self.sessoes = {
+            n: {
+                'porta': PRIMEIRA_PORTA_DEPURACAO + n,
+                'processo': None,
+                'em_uso': False,
+                'aquecida_em': None,
+            }
+            for n in range(1, quantidade + 1)
+        }
+
+    def _iniciar_navegador(self, n):
+        sessao = self.sessoes[n]
+        perfil = os.path.join(PERFIS_DIR, f'perfil_{n}')
+        os.makedirs(perfil, exist_ok=True)
+        sessao['processo'] = subprocess.Popen(
+            [self.edge_path]
+            + argumentos_edge(cache_dir=os.path.join(CACHE_EDGE_DIR, f'pool_{n}'))
+            + [
+                f'--remote-debugging-port={sessao["porta"]}',
+                f'--user-data-dir={perfil}',
+                'about:blank',
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _aquecer(self, n):
+        """Recarrega o painel na sessão `n` e aguarda o carregamento."""
+        sessao = self.sessoes[n]
+        if sessao['processo'] is None or sessao['processo'].poll() is not None:
+            self._iniciar_navegador(n)
+
+        # O Edge leva alguns instantes para abrir a porta de depuração
+        limite = time.monotonic() + 60
+        while True:
+            try:
+                driver = conectar_driver(f'127.0.0.1:{sessao["porta"]}')
+                break
+            except Exception:
+                if time.monotonic() > limite:
+                    raise
+                time.sleep(1)
+        try:
+            if driver.current_url.startswith(URL_PAINEL.rstrip('#')):
+                driver.refresh()
+            else:
+                driver.get(URL_PAINEL)
+            aguardar_pagina_carregada(driver, timeout=120)
+        finally:
+            desconectar_driver(driver)
+        sessao['aquecida_em'] = time.time()
+        print(f'🔥 Sessão {n} aquecida (porta {sessao["porta"]}).')
+
+    def iniciar(self):
+        for n in self.sessoes:
+            self._aquecer(n)
+        threading.Thread(target=self._manter_aquecido, daemon=True).start()
+
+    def _manter_aquecido(self):
+        while True:
+            time.sleep(60)
+            for n, sessao in self.sessoes.items():
+                with self.trava:
+                    livre = not sessao['em_uso']
+                    vencida = time.time() - (sessao['aquecida_em'] or 0) > self.intervalo_min * 60
+                    morta = sessao['processo'] is None or sessao['processo'].poll() is not None
+                    if not (livre and (vencida or morta)):
+                        continue
+                    sessao['em_uso'] = True
+                try:
+                    self._aquecer(n)
+                except Exception as e:
+                    print(f'⚠️ Falha ao aquecer a sessão {n}: {e}')
+                finally:
+                    with self.trava:
+                        sessao['em_uso'] = False
+
+    def retirar(self):
+        with self.trava:
+            for n, sessao in self.sessoes.items():
+                if not sessao['em_uso'] and sessao['processo'] and sessao['processo'].poll() is None:
+                    sessao['em_uso'] = True
+                    return {'id': n, 'endereco': f'127.0.0.1:{sessao["porta"]}'}
+        return None
+
+    def devolver(self, n):
+        with self.trava:
+            self.sessoes[n]['em_uso'] = False
+
+    def estado(self):
+        with self.trava:
+            return {
+                n: {'porta': s['porta'], 'em_uso': s['em_uso'], 'aquecida_em': s['aquecida_em']}
+                for n, s in self.sessoes.items()
+            }
+
+    def encerrar(self):
+        for sessao in self.sessoes.values():
+            if sessao['processo'] and sessao['processo'].poll() is None:
+                sessao['processo'].terminate()
+
+
+def _criar_manipulador(pool):
+    class _ManipuladorPool(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, dados):
+            corpo = json.dumps(dados).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            if self.path == '/estado':
+                return self._responder(200, pool.estado())
+            self._responder(404, {})
+
+        def do_POST(self):
+            if self.path == '/retirar':
+                sessao = pool.retirar()
+                if sessao is None:
+                    return self._responder(503, {'erro': 'nenhuma sessão livre'})
+                return self._responder(200, sessao)
+            if self.path == '/devolver':
+                tamanho = int(self.headers.get('Content-Length', 0))
+                dados = json.loads(self.rfile.read(tamanho) or b'{}')
+                pool.devolver(int(dados['id']))
+                return self._responder(200, {})
+            self._responder(404, {})
+
+    return _ManipuladorPool
+
+
+# ======================================================
+# CLIENTE
+# ======================================================
+def _post(url, dados=None, timeout=10):
+    requisicao = urllib.request.Request(
+        url,
+        data=json.dumps(dados or {}).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+        return json.loads(resposta.read())
+
+
+def pool_disponivel(url_pool=URL_POOL):
+    try:
+        with urllib.request.urlopen(f'{url_pool}/estado', timeout=2):
+            return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+@contextmanager
+def sessao_do_pool(download_dir, url_pool=URL_POOL, timeout=120):
+    """Retira uma sessão aquecida do pool e devolve ao final do bloco `with`."""
+    limite = time.monotonic() + timeout
+    while True:
+        try:
+            sessao = _post(f'{url_pool}/retirar')
+            break
+        except urllib.error.HTTPError as e:
+            if e.code != 503 or time.monotonic() > limite:
+                raise
+            time.sleep(1)
+
+    driver = None
+    try:
+        driver = conectar_driver(sessao['endereco'], download_dir)
+        yield driver
+    finally:
+        if driver is not None:
+            desconectar_driver(driver)
+        _post(f'{url_pool}/devolver', {'id': sessao['id']})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pool de navegadores Edge aquecidos para o painel INVESTSUS.')
+    parser.add_argument('--sessoes', type=int, default=3)
+    parser.add_argument(
+        '--porta',
+        type=int,
+        default=PORTA_POOL,
+        help='porta do serviço (padrão: PORTA_POOL_NAVEGADORES ou 8766); os clientes só leem PORTA_POOL_NAVEGADORES',
+    )
+    parser.add_argument('--intervalo-min', type=int, default=10, help='minutos entre recarregamentos do painel')
+    args = parser.parse_args()
+    if args.porta != PORTA_POOL:
+        print(
+            f'⚠️ --porta {args.porta} difere de PORTA_POOL_NAVEGADORES ({PORTA_POOL}): o notebook e o pipeline só '
+            f'encontram o pool com PORTA_POOL_NAVEGADORES={args.porta} no ambiente deles.'
+        )
+
+    pool = PoolNavegadores(args.sessoes, args.intervalo_min)
+    print(f'🚀 Iniciando {args.sessoes} sessão(ões) do Edge...')
+    pool.iniciar()
+    servidor = ThreadingHTTPServer(('127.0.0.1', args.porta), _criar_manipulador(pool))
+    print(f'✅ Pool de navegadores pronto em http://127.0.0.1:{args.porta}')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        pool.encerrar()
@@ -0,0 +1,182 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+import websocket
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from monitoramento.medicoes import medir
+from monitoramento.painel import CAMINHO_MASHUP, EXPORTACOES, QLIK_APP_ID, URL_BASE
+
+# ======================================================
+# SESSÃO HTTP
+# ======================================================
+def criar_sessao_http(max_conexoes=6):
+    """Sessão `requests` com pool de conexões keep-alive e retentativas."""
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=max_conexoes,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504)),
+    )
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    return sessao
+
+
+# ======================================================
+# ENGINE API DO QLIK (JSON-RPC VIA WEBSOCKET)
+# ======================================================
+class EngineQlik:
+    """Conexão com a Engine API do Qlik Sense para um único app."""
+
+    def __init__(self, base_url, app_id, cookies='', identidade=None, timeout=120):
+        url_ws = base_url.replace('https://', 'wss://').replace('http://', 'ws://')
+        url_ws = f'{url_ws}/app/{app_id}'
+        if identidade:
+            # Cada identidade abre uma sessão própria no engine
+            url_ws = f'{url_ws}/identity/{identidade}'
+        self.ws = websocket.create_connection(url_ws, cookie=cookies, timeout=timeout)
+        self.app_id = app_id
+        self._proximo_id = 0
+
+    def chamar(self, metodo, handle, params):
+        self._proximo_id += 1
+        id_chamada = self._proximo_id
+        self.ws.send(
+            json.dumps(
+                {
+                    'jsonrpc': '2.0',
+                    'id': id_chamada,
+                    'method': metodo,
+                    'handle': handle,
+                    'params': params,
+                }
+            )
+        )
+        # Ignora notificações (OnConnected, change...) até chegar a resposta
+        while True:
+            resposta = json.loads(self.ws.recv())
+            if resposta.get('id') == id_chamada:
+                break
+        if 'error' in resposta:
+            raise RuntimeError(f"Erro do Qlik em {metodo}: {resposta['error']}")
+        return resposta['result']
+
+    def abrir_app(self):
+        return self.chamar('OpenDoc', -1, [self.app_id])['qReturn']['qHandle']
+
+    def exportar_objeto(self, handle_app, objeto):
+        """Gera o .xlsx do objeto no servidor e retorna a URL temporária."""
+        handle = self.chamar('GetObject', handle_app, [objeto])['qReturn']['qHandle']
+        resultado = self.chamar(
+            'ExportData',
+            handle,
+            {'qFileType': 'OOXML', 'qPath': '/qHyperCubeDef', 'qExportState': 'A'},
+        )
+        return resultado['qUrl']
+
+    def fechar(self):
+        self.ws.close()
+
+
+# ======================================================
+# DOWNLOADS
+# ======================================================
+def _salvar_resposta(resposta, caminho):
+    temporario = f'{caminho}.part'
+    tamanho = 0
+    with open(temporario, 'wb') as f:
+        for bloco in resposta.iter_content(chunk_size=1024 * 256):
+            f.write(bloco)
+            tamanho += len(bloco)
+    os.replace(temporario, caminho)
+    return tamanho
+
+
+def _baixar_lote_http(lote, n, sessao, base_url, app_id, download_dir, cookies, gravar_em):
+    tempos = []
+    engine = EngineQlik(base_url, app_id, cookies, identidade=f'bot_monitoramento_{n}')
+    try:
+        handle_app = engine.abrir_app()
+        for exportacao in lote:
+            print(f"📥 Exportando via HTTP: {exportacao['arquivo']}")
+            t0 = time.perf_counter()
+
+            with medir('download.exportar_http', item=exportacao['arquivo']) as medida:
+                url_arquivo = urljoin(base_url + '/', engine.exportar_objeto(handle_app, exportacao['objeto']))
+                caminho = os.path.join(download_dir, exportacao['arquivo'])
+                with sessao.get(url_arquivo, stream=True, timeout=120) as resposta:
+                    resposta.raise_for_status()
+                    tamanho = _salvar_resposta(resposta, caminho)
+                medida['bytes_saida'] = tamanho
+
+            if gravar_em:
+                # Guarda a resposta para o servidor local de replay
+                with open(caminho, 'rb') as origem, open(
+                    os.path.join(gravar_em, f"{exportacao['objeto']}.xlsx"), 'wb'
+                ) as destino:
+                    destino.write(origem.read())
+
+            duracao = time.perf_counter() - t0
+            print(f"📦 {exportacao['arquivo']}: {tamanho / 1024:.0f} KB em {duracao:.1f}s")
+            tempos.append({'arquivo': exportacao['arquivo'], 'segundos': duracao})
+    finally:
+        engine.fechar()
+    return tempos
+
+
+def baixar_exportacoes_http(download_dir, max_workers=6, base_url=URL_BASE, app_id=QLIK_APP_ID, exportacoes=EXPORTACOES, gravar_em=None):
+    """Baixa as exportações direto da Engine API do Qlik, sem navegador.
+
+    Gera os mesmos arquivos do motor Selenium (`credito_financeiro_abaN.xlsx`
+    e `modalidade_1_abaN.xlsx`) em `download_dir`. Com `gravar_em`, cada
+    resposta também é salva para uso no servidor de replay
+    (`monitoramento.qlik_replay`).
+    """
+    if not app_id:
+        raise ValueError('Defina QLIK_APP_ID para usar o motor de download HTTP.')
+
+    os.makedirs(download_dir, exist_ok=True)
+    if gravar_em:
+        os.makedirs(gravar_em, exist_ok=True)
+    max_workers = max(1, min(max_workers, len(exportacoes)))
+    lotes = [exportacoes[i::max_workers] for i in range(max_workers)]
+
+    sessao = criar_sessao_http(max_conexoes=max_workers)
+    print(f'🚀 Iniciando {max_workers} conexão(ões) com o Qlik para {len(exportacoes)} downloads.')
+    t0 = time.perf_counter()
+
+    # Abre o mashup uma vez para obter os cookies da sessão anônima
+    sessao.get(base_url + CAMINHO_MASHUP, timeout=60).raise_for_status()
+    cookies = '; '.join(f'{k}={v}' for k, v in sessao.cookies.items())
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futuros = [
+                executor.submit(
+                    _baixar_lote_http,
+                    lote,
+                    n,
+                    sessao,
+                    base_url,
+                    app_id,
+                    download_dir,
+                    cookies,
+                    gravar_em,
+                )
+                for n, lote in enumerate(lotes, start=1)
+            ]
+            tempos = [t for futuro in futuros for t in futuro.result()]
+    finally:
+        sessao.close()
+
+    print('⏱️ Tempo de cada download:')
+    for t in tempos:
+        print(f"   -> {t['arquivo']}: {t['segundos']:.1f}s")
+    print(f'✅ Downloads concluídos em {time.perf_counter() - t0:.1f}s.')
+    return tempos
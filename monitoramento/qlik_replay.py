@@ -0,0 +1,205 @@
+"""Servidor local que imita o Qlik do INVESTSUS repetindo respostas gravadas.
+
+Serve o mashup, a Engine API (JSON-RPC via websocket) e os arquivos
+exportados a partir de uma pasta de gravações com um `<objeto>.xlsx` por
+objeto do Qlik (gerada com `baixar_exportacoes_http(..., gravar_em=...)`
+ou com `gravar_de_downloads`). Permite testar e medir o motor HTTP sem
+acessar o painel:
+
+    python -m monitoramento.qlik_replay downloads/gravacoes --benchmark
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from monitoramento.painel import CAMINHO_MASHUP, EXPORTACOES
+
+APP_ID_REPLAY = 'replay'
+GUID_WEBSOCKET = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+# ======================================================
+# GRAVAÇÕES
+# ======================================================
+def gravar_de_downloads(download_dir, gravacoes_dir, exportacoes=EXPORTACOES):
+    """Cria uma gravação a partir dos arquivos já baixados pelo motor Selenium."""
+    os.makedirs(gravacoes_dir, exist_ok=True)
+    for exportacao in exportacoes:
+        shutil.copyfile(
+            os.path.join(download_dir, exportacao['arquivo']),
+            os.path.join(gravacoes_dir, f"{exportacao['objeto']}.xlsx"),
+        )
+    print(f'💾 Gravação criada em: {gravacoes_dir}')
+
+
+# ======================================================
+# WEBSOCKET MÍNIMO (RFC 6455, apenas quadros de texto)
+# ======================================================
+def _ler_quadro(rfile):
+    cabecalho = rfile.read(2)
+    if len(cabecalho) < 2:
+        return 8, b''
+    opcode = cabecalho[0] & 0x0F
+    tamanho = cabecalho[1] & 0x7F
+    if tamanho == 126:
+        tamanho = struct.unpack('>H', rfile.read(2))[0]
+    elif tamanho == 127:
+        tamanho = struct.unpack('>Q', rfile.read(8))[0]
+    mascara = rfile.read(4) if cabecalho[1] & 0x80 else None
+    dados = rfile.read(tamanho)
+    if mascara:
+        dados = bytes(b ^ mascara[i % 4] for i, b in enumerate(dados))
+    return opcode, dados
+
+
+def _enviar_quadro(wfile, dados, opcode=1):
+    tamanho = len(dados)
+    if tamanho < 126:
+        cabecalho = struct.pack('>BB', 0x80 | opcode, tamanho)
+    elif tamanho < 65536:
+        cabecalho = struct.pack('>BBH', 0x80 | opcode, 126, tamanho)
+    else:
+        cabecalho = struct.pack('>BBQ', 0x80 | opcode, 127, tamanho)
+    wfile.write(cabecalho + dados)
+    wfile.flush()
+
+
+# ======================================================
+# SERVIDOR
+# ======================================================
+class _ManipuladorReplay(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.headers.get('Upgrade', '').lower() == 'websocket':
+            return self._engine()
+        if self.path.startswith(CAMINHO_MASHUP):
+            return self._responder(200, b'<html></html>', 'text/html', {'Set-Cookie': 'X-Qlik-Session=replay; Path=/'})
+        if self.path.startswith('/tempcontent/'):
+            objeto = self.path.split('/')[-1].split('?')[0]
+            caminho = os.path.join(self.server.gravacoes_dir, objeto)
+            if os.path.isfile(caminho):
+                time.sleep(self.server.atraso)
+                with open(caminho, 'rb') as f:
+                    return self._responder(
+                        200,
+                        f.read(),
+                        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                    )
+        self._responder(404, b'', 'text/plain')
+
+    def _responder(self, status, corpo, tipo, cabecalhos=None):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _engine(self):
+        chave = self.headers['Sec-WebSocket-Key'] + GUID_WEBSOCKET
+        aceite = base64.b64encode(hashlib.sha1(chave.encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', aceite)
+        self.end_headers()
+        self.close_connection = True
+
+        _enviar_quadro(self.wfile, json.dumps({'jsonrpc': '2.0', 'method': 'OnConnected', 'params': {'qSessionState': 'SESSION_CREATED'}}).encode())
+
+        objetos = {}
+        while True:
+            opcode, dados = _ler_quadro(self.rfile)
+            if opcode == 8:
+                _enviar_quadro(self.wfile, b'', opcode=8)
+                return
+            if opcode == 9:
+                _enviar_quadro(self.wfile, dados, opcode=10)
+                continue
+            if opcode != 1:
+                continue
+            chamada = json.loads(dados)
+            resposta = {'jsonrpc': '2.0', 'id': chamada['id']}
+            if chamada['method'] == 'OpenDoc':
+                resposta['result'] = {'qReturn': {'qType': 'Doc', 'qHandle': 1}}
+            elif chamada['method'] == 'GetObject':
+                handle = len(objetos) + 2
+                objetos[handle] = chamada['params'][0]
+                resposta['result'] = {'qReturn': {'qType': 'GenericObject', 'qHandle': handle}}
+            elif chamada['method'] == 'ExportData':
+                time.sleep(self.server.atraso)
+                objeto = objetos[chamada['handle']]
+                resposta['result'] = {'qUrl': f'/tempcontent/{objeto}.xlsx?serverNodeId=replay'}
+            else:
+                resposta['error'] = {'code': -32601, 'message': 'Method not found'}
+            _enviar_quadro(self.wfile, json.dumps(resposta).encode())
+
+
+def iniciar_servidor(gravacoes_dir, porta=0, atraso=0.0):
+    """Sobe o servidor de replay em segundo plano e retorna (servidor, url_base)."""
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), _ManipuladorReplay)
+    servidor.daemon_threads = True
+    servidor.gravacoes_dir = gravacoes_dir
+    servidor.atraso = atraso
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f'http://127.0.0.1:{servidor.server_address[1]}'
+
+
+def benchmark(gravacoes_dir, max_workers=6, atraso=0.0, tempos_selenium=None):
+    """Mede o motor HTTP contra o servidor de replay.
+
+    `tempos_selenium` aceita a lista retornada por `baixar_exportacoes` para
+    comparar arquivo a arquivo com o motor Selenium.
+    """
+    from monitoramento.qlik_http import baixar_exportacoes_http
+
+    servidor, url_base = iniciar_servidor(gravacoes_dir, atraso=atraso)
+    destino = tempfile.mkdtemp(prefix='replay_')
+    try:
+        t0 = time.perf_counter()
+        tempos = baixar_exportacoes_http(destino, max_workers=max_workers, base_url=url_base, app_id=APP_ID_REPLAY)
+        total = time.perf_counter() - t0
+    finally:
+        servidor.shutdown()
+        shutil.rmtree(destino, ignore_errors=True)
+
+    if tempos_selenium:
+        selenium = {t['arquivo']: t['segundos'] for t in tempos_selenium}
+        print('\n📊 HTTP x Selenium:')
+        for t in tempos:
+            print(f"   -> {t['arquivo']}: {t['segundos']:.2f}s x {selenium.get(t['arquivo'], float('nan')):.2f}s")
+        print(f"   -> TOTAL: {total:.2f}s x {sum(selenium.values()):.2f}s (soma sequencial)")
+    return {'total': total, 'tempos': tempos}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor local de replay do Qlik do INVESTSUS.')
+    parser.add_argument('gravacoes', help='pasta com um <objeto>.xlsx por objeto do Qlik')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--atraso', type=float, default=0.0, help='latência simulada por exportação (s)')
+    parser.add_argument('--benchmark', action='store_true', help='mede o motor HTTP e encerra')
+    parser.add_argument('--workers', type=int, default=6)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.gravacoes, max_workers=args.workers, atraso=args.atraso)
+    else:
+        servidor, url_base = iniciar_servidor(args.gravacoes, args.porta, args.atraso)
+        print(f'🌐 Replay do Qlik em {url_base} (app: {APP_ID_REPLAY}). Ctrl+C para encerrar.')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            servidor.shutdown()
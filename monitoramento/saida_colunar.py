@@ -0,0 +1,144 @@
+"""Cópias colunares da saída: os DataFrames da planilha em Parquet e SQLite.
+
+Ao lado de `saida/YYYYMMDD_MONITORAMENTO DE COMPONENTE.xlsx` ficam:
+
+* `..._parquet/<tabela>.parquet`, um arquivo por DataFrame, com os tipos do
+  pandas (proposta UInt64, categorias, valores em centavos);
+* `....sqlite`, um banco com uma tabela por DataFrame e índices nas colunas
+  de proposta, UF, Município e CNES;
+* `....manifesto.json`, com as linhas, colunas e hash de cada arquivo gerado.
+
+As análises consultam essas cópias em vez de reabrir o Excel.
+"""
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from monitoramento.cache_downloads import calcular_hash
+from monitoramento.esquemas import CHAVE_PROPOSTA, COLUNAS_CENTAVOS, preparar_para_arrow
+from monitoramento.medicoes import bytes_em_memoria, medir
+
+# Colunas de filtro das consultas; viram índices no SQLite quando existem na tabela
+COLUNAS_INDICE = [CHAVE_PROPOSTA, 'UF', 'Município', 'CNES']
+
+
+def nome_tabela(aba_nome):
+    """'CCPP-CANCELAR' -> 'ccpp_cancelar'"""
+    return re.sub(r'\W+', '_', aba_nome).strip('_').lower()
+
+
+def caminhos_colunares(destino_xlsx):
+    """Pasta dos Parquet, banco SQLite e manifesto de um .xlsx de saída."""
+    base = os.path.splitext(destino_xlsx)[0]
+    return {
+        'parquet': f'{base}_parquet',
+        'sqlite': f'{base}.sqlite',
+        'manifesto': f'{base}.manifesto.json',
+    }
+
+
+def _para_sqlite(df):
+    """Cópia de `df` com tipos que o SQLite guarda.
+
+    A proposta vira texto (até 19 dígitos, passa do INTEGER de 64 bits com
+    sinal), as categorias viram texto e os nulos viram NULL. Os centavos
+    continuam inteiros e as colunas com números e textos numéricos
+    misturados viram números (ver `esquemas.preparar_para_arrow`).
+    """
+    df = preparar_para_arrow(df.copy())
+    for coluna in df.columns:
+        serie = df[coluna]
+        if coluna == CHAVE_PROPOSTA:
+            df[coluna] = serie.astype('string').astype(object).where(serie.notna(), None)
+        elif isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(serie):
+            df[coluna] = serie.astype(object).where(serie.notna(), None)
+        elif isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+            df[coluna] = serie.astype(object).where(serie.notna(), None)
+    return df
+
+
+def _gravar_parquet(df, caminho):
+    temporario = f'{caminho}.tmp'
+    preparar_para_arrow(df.copy()).to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+
+
+def _gravar_sqlite(tabelas, caminho):
+    """Grava {tabela: DataFrame} num banco novo; retorna {tabela: colunas indexadas}."""
+    temporario = f'{caminho}.tmp'
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    indices = {}
+    conexao = sqlite3.connect(temporario)
+    try:
+        # Banco novo num arquivo temporário: sem diário, e só vira o definitivo completo
+        conexao.execute('PRAGMA journal_mode = OFF')
+        conexao.execute('PRAGMA synchronous = OFF')
+        for tabela, df in tabelas.items():
+            _para_sqlite(df).to_sql(tabela, conexao, index=False, chunksize=50000)
+            indices[tabela] = [c for c in COLUNAS_INDICE if c in df.columns]
+            for i, coluna in enumerate(indices[tabela]):
+                conexao.execute(f'CREATE INDEX "ix_{tabela}_{i}" ON "{tabela}" ("{coluna}")')
+        conexao.commit()
+        conexao.execute('ANALYZE')
+    finally:
+        conexao.close()
+    os.replace(temporario, caminho)
+    return indices
+
+
+def gravar_saidas_colunares(abas, destino_xlsx):
+    """Grava as cópias Parquet e SQLite de `abas` ({aba: DataFrame}) e o manifesto.
+
+    Os arquivos ficam ao lado de `destino_xlsx` (ver `caminhos_colunares`).
+    Retorna o manifesto.
+    """
+    t0 = time.perf_counter()
+    caminhos = caminhos_colunares(destino_xlsx)
+    os.makedirs(caminhos['parquet'], exist_ok=True)
+    tabelas = {nome_tabela(aba): df for aba, df in abas.items()}
+
+    manifesto_tabelas = {}
+    for (aba, df), tabela in zip(abas.items(), tabelas):
+        caminho = os.path.join(caminhos['parquet'], f'{tabela}.parquet')
+        with medir('saida.parquet', item=tabela) as medida:
+            _gravar_parquet(df, caminho)
+            medida.update(linhas=len(df), bytes_entrada=bytes_em_memoria(df), bytes_saida=os.path.getsize(caminho))
+        manifesto_tabelas[tabela] = {
+            'aba': aba,
+            'linhas': len(df),
+            'colunas': {str(c): str(t) for c, t in df.dtypes.items()},
+            'colunas_centavos': [c for c in df.columns if c in COLUNAS_CENTAVOS],
+            'parquet': os.path.relpath(caminho, os.path.dirname(caminhos['manifesto'])),
+            'parquet_sha256': calcular_hash(caminho),
+        }
+
+    with medir('saida.sqlite', item=os.path.basename(caminhos['sqlite'])) as medida:
+        indices = _gravar_sqlite(tabelas, caminhos['sqlite'])
+        medida.update(linhas=sum(len(df) for df in tabelas.values()), bytes_saida=os.path.getsize(caminhos['sqlite']))
+    for tabela, colunas in indices.items():
+        manifesto_tabelas[tabela]['indices_sqlite'] = colunas
+
+    manifesto = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'xlsx': os.path.basename(destino_xlsx),
+        'xlsx_sha256': calcular_hash(destino_xlsx) if os.path.exists(destino_xlsx) else None,
+        'sqlite': os.path.basename(caminhos['sqlite']),
+        'sqlite_sha256': calcular_hash(caminhos['sqlite']),
+        'tabelas': manifesto_tabelas,
+    }
+    temporario = f"{caminhos['manifesto']}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=4)
+    os.replace(temporario, caminhos['manifesto'])
+
+    print(
+        f'🗄️ Cópias colunares ({len(tabelas)} tabelas) em Parquet e SQLite geradas em '
+        f'{time.perf_counter() - t0:.2f}s: {caminhos["sqlite"]}'
+    )
+    return manifesto
@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from monitoramento.cache_downloads import calcular_hash
+
+# ======================================================
+# TABELA SIGTAP -> GRUPO
+# ======================================================
+# O CSV traz os códigos com zeros à esquerda ('0401020010') e as exportações
+# ora como texto, ora como número; os dois lados viram o mesmo inteiro.
+# O índice compilado fica ao lado do CSV e só é refeito quando o hash muda.
+SGRUPO_PATH = os.path.join(os.getcwd(), 'model', 'tabela_cc_sogrupo.csv')
+
+
+def caminho_compilado(caminho):
+    """'model/tabela_cc_sogrupo.csv' -> 'model/tabela_cc_sogrupo.sigtap.npz'"""
+    return f'{os.path.splitext(caminho)[0]}.sigtap.npz'
+
+
+def normalizar_codigos(serie):
+    """Códigos SIGTAP (texto com ou sem zeros, inteiro ou float) -> Int64."""
+    if not pd.api.types.is_numeric_dtype(serie):
+        serie = pd.to_numeric(serie.astype('string').str.strip(), errors='coerce')
+    if pd.api.types.is_float_dtype(serie):
+        # Códigos lidos do Excel como float (401020010.0)
+        serie = serie.round()
+    return serie.astype('Int64')
+
+
+def compilar_sigtap(caminho=SGRUPO_PATH):
+    """Lê o CSV e grava o índice compilado (códigos, grupos e hash do CSV).
+
+    Vale a primeira ocorrência de cada código, como no drop_duplicates do
+    notebook; linhas com código ilegível são descartadas com aviso.
+    """
+    tabela = pd.read_csv(caminho, sep=';', dtype=str)
+    codigos = normalizar_codigos(tabela['SIGTAP'])
+    if codigos.isna().any():
+        print(f"⚠️ {os.path.basename(caminho)}: {codigos.isna().sum()} linha(s) com código SIGTAP ilegível ignorada(s).")
+    tabela = tabela.assign(SIGTAP=codigos).dropna(subset=['SIGTAP']).drop_duplicates(subset=['SIGTAP'])
+    grupos = tabela['Grupo'].astype('category')
+
+    compilado = caminho_compilado(caminho)
+    temporario = f'{compilado}.tmp.npz'
+    np.savez(
+        temporario,
+        hash=np.array(calcular_hash(caminho)),
+        codigos=tabela['SIGTAP'].to_numpy(dtype=np.int64),
+        grupos=grupos.cat.codes.to_numpy(),
+        categorias=grupos.cat.categories.to_numpy(dtype=str),
+    )
+    os.replace(temporario, compilado)
+    print(f'🧾 Índice SIGTAP compilado: {len(tabela)} códigos, {len(grupos.cat.categories)} grupos.')
+
+
+def _hash_compilado(compilado):
+    if not os.path.exists(compilado):
+        return None
+    with np.load(compilado) as dados:
+        return str(dados['hash'])
+
+
+def carregar_sigtap(caminho=SGRUPO_PATH):
+    """Série categórica de grupos indexada pelo código SIGTAP inteiro.
+
+    Usa o índice compilado ao lado do CSV, recompilando se o CSV mudou.
+    """
+    compilado = caminho_compilado(caminho)
+    if _hash_compilado(compilado) != calcular_hash(caminho):
+        compilar_sigtap(caminho)
+    with np.load(compilado) as dados:
+        grupos = pd.Categorical.from_codes(dados['grupos'], dados['categorias'].tolist())
+        return pd.Series(grupos, index=pd.Index(dados['codigos'], name='SIGTAP'), name='Grupo')
+
+
+def buscar_grupos(codigos, sigtap):
+    """Grupo de cada código de `codigos`, por busca no índice.
+
+    Retorna (série categórica alinhada a `codigos`, série com as linhas de
+    cada código preenchido que não está na tabela).
+    """
+    normalizados = normalizar_codigos(codigos)
+    posicoes = sigtap.index.get_indexer(normalizados)
+    grupos = pd.Series(sigtap.array.take(posicoes, allow_fill=True), index=codigos.index, name=sigtap.name)
+    fora = normalizados[(posicoes < 0) & normalizados.notna().to_numpy()]
+    return grupos, fora.value_counts()
@@ -0,0 +1,280 @@
+"""Versões sintéticas das seis exportações do INVESTSUS, para medir o pipeline sem o painel.
+
+As colunas de cada exportação são as do painel (ver `LAYOUTS`). As
+propostas seguem o formato das reais (raiz do CNPJ + filial + ano +
+sequência), os códigos SIGTAP e grupos vêm de `model/tabela_cc_sogrupo.csv`,
+e as propostas e CNPJs de `model/correcoes_manuais.json` entram nas
+exportações para que as correções tenham o que corrigir. Parte dos
+valores vem como texto no formato brasileiro ('R$ 1.234,56'), como o
+painel às vezes entrega.
+
+`escala` multiplica a quantidade de propostas (1, 10, 100...); as matrizes
+crescem junto. Os arquivos ficam em
+`downloads/sinteticos/x<escala>_s<semente>_v<versão>/` e só são gerados uma vez:
+
+    python -m monitoramento.sinteticos --escala 10
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from monitoramento.correcoes import carregar_correcoes
+from monitoramento.painel import EXPORTACOES
+from monitoramento.sigtap import SGRUPO_PATH
+
+SINTETICOS_DIR = os.path.join(os.getcwd(), 'downloads', 'sinteticos')
+# Incrementar ao mudar o gerador, para não reaproveitar arquivos antigos
+VERSAO_SINTETICOS = 2
+
+# Propostas de cada modalidade na escala 1 e linhas por proposta nas matrizes
+PROPOSTAS_POR_ESCALA = {'credito_financeiro': 500, 'modalidade_1': 250}
+LINHAS_POR_PROPOSTA = {'aba2': 4, 'aba3': 6}
+# Fração dos valores exportados como texto ('R$ 1.234,56')
+FRACAO_TEXTO = 0.02
+
+# ======================================================
+# COLUNAS DAS EXPORTAÇÕES
+# ======================================================
+_PROPOSTAS = ['Proposta de Referência', 'Status da Proposta', 'CNES', 'Entidade', 'CNPJ', 'UF', 'Município', 'Dt. Cadastro', 'Dt. Atualização']
+_OCI = [
+    'Proposta de Referência', 'Status da Proposta', 'UF', 'Município', 'CNES', 'NU_PROCEDIMENTO', 'NO_GRUPO',
+    'NO_PROCEIDMENTO', 'DS_PROCEDIMENTO', 'TP_SEXO', 'NU_IDADE_MINIMA', 'NU_IDADE_MAXIMA',
+]
+_OCI_VALORES = ['QT_ATENDIMENTO_MES', 'VL_CALCULADO', 'VL_PROCEDIMENTO', 'VL_TOTAL']
+_CIRURGIAS = [
+    'Proposta de Referência', 'Status da Proposta', 'UF', 'Município', 'CNES', 'TP_COMPLEXIDADE',
+    'CO_PROCEDIMENTO_SIGTAP', 'NO_GRUPO', 'NO_PROCEDIMENTO', 'TX_COMPLEMENTACAO_MAXIMA', 'VL_TABELA_SUS',
+    'VL_TOTAL_COMPLEMENTACAO_MAXIMA', 'VL_MEDIA_BRASIL_CALCULADO', 'QT_ATENDIMENTO_MES', 'VL_TOTAL',
+]
+
+LAYOUTS = {
+    'credito_financeiro_aba1': _PROPOSTAS + ['Dívida Aprox.', 'VL_SALDO_DEVEDOR', 'VL_TRIBUTO_FEDERAL_ESTIMADO'],
+    'credito_financeiro_aba2': _OCI + ['VL_MEDIA_BRASIL_CALCULADO'] + _OCI_VALORES,
+    'credito_financeiro_aba3': _CIRURGIAS,
+    'modalidade_1_aba1': _PROPOSTAS,
+    'modalidade_1_aba2': _OCI + _OCI_VALORES,
+    'modalidade_1_aba3': _CIRURGIAS[:5] + ['Entidade'] + _CIRURGIAS[5:],
+}
+
+# Os status como o painel escreve (são os que os e-mails e as métricas contam);
+# o PRE-Aprovado vem só das correções manuais
+STATUS = {
+    'Aprovado': 0.4,
+    'Em Análise': 0.2,
+    'Em Diligência': 0.1,
+    'Enviado para Análise': 0.1,
+    'Em Preenchimento': 0.08,
+    'Aguardando Validação do Gestor': 0.07,
+    'Cancelado': 0.05,
+}
+
+# Capitais e alguns municípios do interior por UF
+MUNICIPIOS = {
+    'AC': ['RIO BRANCO'], 'AL': ['MACEIO', 'ARAPIRACA'], 'AM': ['MANAUS'], 'AP': ['MACAPA'],
+    'BA': ['SALVADOR', 'FEIRA DE SANTANA', 'IRECE', 'VITORIA DA CONQUISTA'], 'CE': ['FORTALEZA', 'BARBALHA', 'SOBRAL'],
+    'DF': ['BRASILIA'], 'ES': ['VITORIA', 'CACHOEIRO DE ITAPEMIRIM'], 'GO': ['GOIANIA', 'ANAPOLIS'],
+    'MA': ['SAO LUIS', 'IMPERATRIZ'], 'MG': ['BELO HORIZONTE', 'UBERLANDIA', 'JUIZ DE FORA', 'MONTES CLAROS'],
+    'MS': ['CAMPO GRANDE', 'TRES LAGOAS', 'DOURADOS'], 'MT': ['CUIABA', 'RONDONOPOLIS'], 'PA': ['BELEM', 'SANTAREM'],
+    'PB': ['JOAO PESSOA', 'CAMPINA GRANDE'], 'PE': ['RECIFE', 'BEZERROS', 'CARUARU'], 'PI': ['TERESINA'],
+    'PR': ['CURITIBA', 'MARINGA', 'UMUARAMA', 'LONDRINA'], 'RJ': ['RIO DE JANEIRO', 'NITEROI', 'CAMPOS DOS GOYTACAZES'],
+    'RN': ['NATAL', 'MOSSORO'], 'RO': ['PORTO VELHO', 'JI-PARANA'], 'RR': ['BOA VISTA'],
+    'RS': ['PORTO ALEGRE', 'CAXIAS DO SUL', 'PELOTAS'], 'SC': ['FLORIANOPOLIS', 'SOMBRIO', 'TIMBE DO SUL', 'JOINVILLE'],
+    'SE': ['ARACAJU'], 'SP': ['SAO PAULO', 'GUARULHOS', 'CAMPINAS', 'VALINHOS', 'SAO JOSE DOS CAMPOS', 'RIBEIRAO PRETO'],
+    'TO': ['PALMAS'],
+}
+
+GRUPOS_OCI = ['OCI ONCOLOGIA', 'OCI CARDIOLOGIA', 'OCI OFTALMOLOGIA', 'OCI ORTOPEDIA', 'OCI OTORRINOLARINGOLOGIA', 'OCI GINECOLOGIA']
+
+
+# ======================================================
+# GERAÇÃO
+# ======================================================
+def _valores_monetarios(rng, tamanho, minimo, maximo):
+    return np.round(rng.uniform(minimo, maximo, tamanho), 2)
+
+
+def _como_texto_br(valores, rng, fracao=FRACAO_TEXTO):
+    """Parte dos valores como texto no formato do painel ('R$ 1.234,56'); os demais como número."""
+    saida = pd.Series(valores, dtype=object)
+    textos = rng.random(len(saida)) < fracao
+    saida[textos] = [
+        'R$ ' + f'{v:,.2f}'.replace(',', '_').replace('.', ',').replace('_', '.') for v in saida[textos]
+    ]
+    return saida
+
+
+def _propostas(modalidade, quantidade, correcoes, rng):
+    """aba1: uma linha por proposta, com as propostas e CNPJs das correções manuais incluídos."""
+    fixas = [
+        entrada['proposta']
+        for regra in correcoes.get('status', [])
+        if modalidade in regra['modalidades']
+        for entrada in regra['propostas']
+    ]
+    fixas = list(dict.fromkeys(fixas))[:quantidade]
+    raizes = rng.integers(10**5, 10**8, quantidade * 2)
+    filiais = rng.integers(1, 4, quantidade * 2)
+    sequencias = rng.integers(501, 510, quantidade * 2)
+    # Raiz do CNPJ + filial + ano + sequência, como 781831300012025501
+    geradas = raizes.astype(np.uint64) * np.uint64(10**11) + (filiais * 10**7 + 2025 * 10**3 + sequencias).astype(np.uint64)
+    geradas = pd.unique(np.concatenate([np.array(fixas, dtype=np.uint64), geradas]))[:quantidade]
+
+    cnpjs = (geradas // np.uint64(10**11)).astype(np.int64) * 10**6 + rng.integers(1, 4, quantidade) * 100 + rng.integers(10, 100, quantidade)
+    fixos = [item['cnpj'] for item in correcoes.get('cnes_por_cnpj', [])][:quantidade]
+    cnpjs[: len(fixos)] = fixos
+
+    ufs = rng.choice(list(MUNICIPIOS), quantidade)
+    cadastro = pd.Timestamp('2025-03-01') + pd.to_timedelta(rng.integers(0, 180, quantidade), unit='D')
+    df = pd.DataFrame(
+        {
+            'Proposta de Referência': geradas,
+            'Status da Proposta': rng.choice(list(STATUS), quantidade, p=list(STATUS.values())),
+            # Parte dos hospitais sem CNES no painel (as correções preenchem pelo CNPJ)
+            'CNES': pd.array(np.where(rng.random(quantidade) < 0.05, -1, rng.integers(2 * 10**6, 10**7, quantidade)), dtype='Int64'),
+            'Entidade': [f'HOSPITAL {i:05d}' for i in rng.integers(0, max(quantidade // 2, 1), quantidade)],
+            'CNPJ': cnpjs,
+            'UF': ufs,
+            'Município': [rng.choice(MUNICIPIOS[uf]) for uf in ufs],
+            'Dt. Cadastro': cadastro,
+            'Dt. Atualização': cadastro + pd.to_timedelta(rng.integers(0, 60, quantidade), unit='D'),
+        }
+    )
+    df['CNES'] = df['CNES'].mask(df['CNES'] < 0)
+    return df
+
+
+def _linhas_das_matrizes(propostas, por_proposta, rng):
+    """Proposta de cada linha de uma matriz (quantidade de linhas por proposta variável)."""
+    linhas = rng.poisson(por_proposta, len(propostas)).clip(1)
+    return propostas.iloc[np.repeat(np.arange(len(propostas)), linhas)].reset_index(drop=True)
+
+
+def _oci(propostas, com_media_brasil, rng):
+    base = _linhas_das_matrizes(propostas, LINHAS_POR_PROPOSTA['aba2'], rng)
+    n = len(base)
+    codigos = rng.integers(1, 300, n)
+    quantidade = rng.integers(1, 120, n)
+    valor = _valores_monetarios(rng, n, 50, 2500)
+    df = base[['Proposta de Referência', 'Status da Proposta', 'UF', 'Município', 'CNES']].copy()
+    df['NU_PROCEDIMENTO'] = [f'09{c:08d}' for c in codigos]
+    df['NO_GRUPO'] = rng.choice(GRUPOS_OCI, n)
+    df['NO_PROCEIDMENTO'] = [f'OCI {c:04d}' for c in codigos]
+    df['DS_PROCEDIMENTO'] = [f'OFERTA DE CUIDADO INTEGRADO {c:04d}' for c in codigos]
+    df['TP_SEXO'] = rng.choice(['A', 'M', 'F'], n, p=[0.8, 0.1, 0.1])
+    df['NU_IDADE_MINIMA'] = rng.choice([0, 18, 40], n)
+    df['NU_IDADE_MAXIMA'] = rng.choice([99, 130], n)
+    if com_media_brasil:
+        df['VL_MEDIA_BRASIL_CALCULADO'] = _valores_monetarios(rng, n, 50, 2500)
+    df['QT_ATENDIMENTO_MES'] = quantidade
+    df['VL_CALCULADO'] = _como_texto_br(valor, rng)
+    df['VL_PROCEDIMENTO'] = valor
+    df['VL_TOTAL'] = _como_texto_br(np.round(valor * quantidade, 2), rng)
+    return df
+
+
+def _cirurgias(propostas, com_entidade, sigtap, rng):
+    base = _linhas_das_matrizes(propostas, LINHAS_POR_PROPOSTA['aba3'], rng)
+    n = len(base)
+    escolhidas = sigtap.iloc[rng.integers(0, len(sigtap), n)]
+    quantidade = rng.integers(1, 60, n)
+    tabela_sus = _valores_monetarios(rng, n, 100, 15000)
+    complementacao = np.round(rng.choice([0.5, 1.0, 1.5, 2.0], n), 2)
+    df = base[['Proposta de Referência', 'Status da Proposta', 'UF', 'Município', 'CNES']].copy()
+    if com_entidade:
+        df['Entidade'] = base['Entidade']
+    df['TP_COMPLEXIDADE'] = rng.choice(['MÉDIA', 'ALTA'], n, p=[0.7, 0.3])
+    # O painel exporta o código sem os zeros à esquerda, como número
+    df['CO_PROCEDIMENTO_SIGTAP'] = escolhidas['SIGTAP'].astype(np.int64).to_numpy()
+    df['NO_GRUPO'] = escolhidas['Grupo'].to_numpy()
+    df['NO_PROCEDIMENTO'] = [f'PROCEDIMENTO {c}' for c in escolhidas['SIGTAP']]
+    df['TX_COMPLEMENTACAO_MAXIMA'] = complementacao
+    df['VL_TABELA_SUS'] = tabela_sus
+    df['VL_TOTAL_COMPLEMENTACAO_MAXIMA'] = np.round(tabela_sus * complementacao, 2)
+    df['VL_MEDIA_BRASIL_CALCULADO'] = _valores_monetarios(rng, n, 100, 15000)
+    df['QT_ATENDIMENTO_MES'] = quantidade
+    df['VL_TOTAL'] = _como_texto_br(np.round(tabela_sus * (1 + complementacao) * quantidade, 2), rng)
+    return df
+
+
+def gerar_exportacoes(escala=1, semente=0, sgrupo_path=SGRUPO_PATH, correcoes=None):
+    """Gera as seis exportações sintéticas em memória: {exportação: DataFrame}."""
+    rng = np.random.default_rng(semente)
+    correcoes = carregar_correcoes() if correcoes is None else correcoes
+    sigtap = pd.read_csv(sgrupo_path, sep=';', dtype=str).dropna()
+
+    exportacoes = {}
+    for modalidade, por_escala in PROPOSTAS_POR_ESCALA.items():
+        propostas = _propostas(modalidade, int(por_escala * escala), correcoes, rng)
+        aba1 = propostas.copy()
+        if modalidade == 'credito_financeiro':
+            aba1['Dívida Aprox.'] = _valores_monetarios(rng, len(aba1), 0, 5 * 10**6)
+            aba1['VL_SALDO_DEVEDOR'] = _como_texto_br(_valores_monetarios(rng, len(aba1), 0, 5 * 10**6), rng)
+            aba1['VL_TRIBUTO_FEDERAL_ESTIMADO'] = _valores_monetarios(rng, len(aba1), 0, 10**6)
+        exportacoes[f'{modalidade}_aba1'] = aba1
+        exportacoes[f'{modalidade}_aba2'] = _oci(propostas, modalidade == 'credito_financeiro', rng)
+        exportacoes[f'{modalidade}_aba3'] = _cirurgias(propostas, modalidade == 'modalidade_1', sigtap, rng)
+
+    return {nome: df[LAYOUTS[nome]] for nome, df in exportacoes.items()}
+
+
+# ======================================================
+# ARQUIVOS
+# ======================================================
+def _gravar_xlsx(df, caminho):
+    """Grava `df` como o .xlsx do painel (cabeçalho na linha 1), em modo de escrita contínua.
+
+    A proposta vai como texto, como no painel: com até 19 dígitos, como
+    número o Excel a arredondaria.
+    """
+    df = df.astype(object).where(df.notna(), None)
+    df['Proposta de Referência'] = df['Proposta de Referência'].map(str)
+    workbook = openpyxl.Workbook(write_only=True)
+    ws = workbook.create_sheet('Sheet1')
+    ws.append(list(df.columns))
+    for linha in df.itertuples(index=False, name=None):
+        ws.append(linha)
+    temporario = f'{caminho}.tmp'
+    workbook.save(temporario)
+    os.replace(temporario, caminho)
+
+
+def pasta_sinteticos(escala=1, semente=0, base=SINTETICOS_DIR):
+    return os.path.join(base, f'x{escala:g}_s{semente}_v{VERSAO_SINTETICOS}')
+
+
+def gravar_exportacoes(escala=1, semente=0, base=SINTETICOS_DIR):
+    """Grava as seis exportações em `pasta_sinteticos(...)`, com os nomes do painel.
+
+    Os arquivos de uma mesma escala e semente são reaproveitados. Retorna a pasta.
+    """
+    pasta = pasta_sinteticos(escala, semente, base)
+    arquivos = [os.path.join(pasta, e['arquivo']) for e in EXPORTACOES]
+    if all(os.path.exists(a) for a in arquivos):
+        return pasta
+
+    t0 = time.perf_counter()
+    os.makedirs(pasta, exist_ok=True)
+    exportacoes = gerar_exportacoes(escala, semente)
+    for exportacao, caminho in zip(EXPORTACOES, arquivos):
+        _gravar_xlsx(exportacoes[os.path.splitext(exportacao['arquivo'])[0]], caminho)
+    linhas = sum(len(df) for df in exportacoes.values())
+    print(f'🧪 Exportações sintéticas x{escala:g} ({linhas} linhas) geradas em {time.perf_counter() - t0:.1f}s: {pasta}')
+    return pasta
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera as exportações sintéticas do INVESTSUS.')
+    parser.add_argument('--escala', type=float, nargs='+', default=[1], help='multiplicador das propostas (ex.: 1 10 100)')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--pasta', default=SINTETICOS_DIR)
+    args = parser.parse_args()
+    for escala in args.escala:
+        print(gravar_exportacoes(escala, args.semente, args.pasta))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""Tratamento das exportações, o mesmo para todas as modalidades.
+
+Cada modalidade é descrita em `MODALIDADES` por uma lista de etapas para
+cada matriz de oferta, onde cada etapa é o nome de um operador de
+`OPERADORES` e seus parâmetros. Para incluir uma modalidade nova basta
+acrescentar a configuração dela; as modalidades rodam em paralelo.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from monitoramento.correcoes import modalidade_da_exportacao
+from monitoramento.dimensao import avisar, buscar, construir_dimensao, propagar_cnes
+from monitoramento.esquemas import CHAVE_PROPOSTA
+from monitoramento.medicoes import bytes_em_memoria, medir
+from monitoramento.sigtap import SGRUPO_PATH, buscar_grupos, carregar_sigtap
+
+
+# ======================================================
+# OPERADORES
+# ======================================================
+# Todos recebem (df, contexto, **parâmetros) e retornam o DataFrame tratado.
+# O contexto traz a modalidade, a dimensão de propostas e o índice SIGTAP.
+def remover_colunas(df, contexto, colunas):
+    return df.drop(columns=[c for c in colunas if c in df.columns])
+
+
+def trazer_da_dimensao(df, contexto, colunas):
+    for coluna in colunas:
+        df[coluna] = buscar(df, contexto['dimensao'], coluna)
+    return df
+
+
+def renomear(df, contexto, colunas):
+    return df.rename(columns=colunas)
+
+
+def grupo_sigtap(df, contexto, coluna='CO_PROCEDIMENTO_SIGTAP', destino='NOME DO GRUPO'):
+    """PROCV do grupo no índice SIGTAP (ver `monitoramento.sigtap`)."""
+    df[destino], fora = buscar_grupos(df[coluna], contexto['sigtap'])
+    if len(fora):
+        exemplos = ', '.join(str(c) for c in fora.index[:5])
+        avisar(
+            f"⚠️ {contexto['modalidade']}: {fora.sum()} linha(s) com {len(fora)} código(s) SIGTAP fora da tabela"
+            f" (ex.: {exemplos})",
+            contexto.get('mensagens'),
+        )
+    return df
+
+
+def ordenar_colunas(df, contexto, colunas):
+    """Mantém só `colunas`, nessa ordem (as que faltarem são ignoradas)."""
+    return df[[c for c in colunas if c in df.columns]]
+
+
+OPERADORES = {
+    'remover_colunas': remover_colunas,
+    'trazer_da_dimensao': trazer_da_dimensao,
+    'renomear': renomear,
+    'grupo_sigtap': grupo_sigtap,
+    'ordenar_colunas': ordenar_colunas,
+}
+
+
+# ======================================================
+# CONFIGURAÇÃO DAS MODALIDADES
+# ======================================================
+COLUNAS_CIRURGIAS = [
+    'Proposta de Referência',
+    'Status da Proposta',
+    'UF',
+    'Município',
+    'CNES',
+    'ENTIDADE',
+    'CO_PROCEDIMENTO_SIGTAP',
+    'NOME DO GRUPO',
+    'NO_GRUPO',
+    'NO_PROCEDIMENTO',
+    '% COMPLEMENTACAO_MAXIMA',
+    'VL_TABELA_SUS',
+    'VL_TOTAL_COMPLEMENTACAO_MAXIMA',
+    'VL_MEDIA_BRASIL_CALCULADO',
+    'QT_ATENDIMENTO_MES',
+    'VL_TOTAL',
+]
+
+COLUNAS_OCI = [
+    'Proposta de Referência',
+    'Status da Proposta',
+    'UF',
+    'Município',
+    'CNES',
+    'Entidade',
+    'NU_PROCEDIMENTO',
+    'NO_GRUPO',
+    'NO_PROCEIDMENTO',
+    'DS_PROCEDIMENTO',
+    'QT_ATENDIMENTO_MES',
+    'VL_CALCULADO',
+    'VL_TOTAL',
+]
+
+# Matriz de oferta de cirurgias (aba3)
+ETAPAS_CIRURGIAS = [
+    ('remover_colunas', {'colunas': ['TP_COMPLEXIDADE']}),
+    ('trazer_da_dimensao', {'colunas': ['Entidade']}),
+    ('renomear', {'colunas': {'Entidade': 'ENTIDADE', 'TX_COMPLEMENTACAO_MAXIMA': '% COMPLEMENTACAO_MAXIMA'}}),
+    ('grupo_sigtap', {}),
+    ('ordenar_colunas', {'colunas': COLUNAS_CIRURGIAS}),
+]
+
+
+def etapas_oci(remover):
+    """Matriz de oferta de OCI (aba2)."""
+    return [
+        ('remover_colunas', {'colunas': remover}),
+        ('trazer_da_dimensao', {'colunas': ['Entidade']}),
+        ('ordenar_colunas', {'colunas': COLUNAS_OCI}),
+    ]
+
+
+MODALIDADES = {
+    'credito_financeiro': {
+        'aba2': etapas_oci(['TP_SEXO', 'NU_IDADE_MINIMA', 'NU_IDADE_MAXIMA', 'VL_MEDIA_BRASIL_CALCULADO']),
+        'aba3': ETAPAS_CIRURGIAS,
+        'simplificada': {
+            'remover_colunas': ['Dt. Cadastro', 'Dt. Atualização', 'Dívida Aprox.', 'VL_SALDO_DEVEDOR', 'VL_TRIBUTO_FEDERAL_ESTIMADO'],
+            'canceladas': True,
+        },
+    },
+    'modalidade_1': {
+        'aba2': etapas_oci(['TP_SEXO', 'NU_IDADE_MINIMA', 'NU_IDADE_MAXIMA']),
+        'aba3': ETAPAS_CIRURGIAS,
+        'simplificada': {
+            'remover_colunas': ['Dt. Cadastro', 'Dt. Atualização'],
+            'canceladas': False,
+        },
+    },
+}
+
+
+# ======================================================
+# ABA SIMPLIFICADA
+# ======================================================
+TOTAIS_SIMPLIFICADA = {'aba3': 'VL_TOTAL_COMP_CIRUGICO', 'aba2': 'VL_TOTAL_OCI'}
+
+
+def agregar_matrizes(matrizes):
+    """Totais por proposta, matriz e NO_GRUPO em uma única passada.
+
+    `matrizes` é {coluna de total: matriz}. As linhas das matrizes são
+    empilhadas em códigos inteiros (proposta, matriz, NO_GRUPO), agrupadas
+    uma vez por hash e somadas com bincount. Retorna um DataFrame indexado
+    por (proposta, total, NO_GRUPO) com a soma de VL_TOTAL (em centavos) e a
+    quantidade de linhas; linhas sem proposta ficam de fora, como no groupby.
+    """
+    destinos = list(matrizes)
+    chaves = pd.concat([m[CHAVE_PROPOSTA] for m in matrizes.values()], ignore_index=True)
+    cod_proposta, propostas = pd.factorize(chaves)
+    grupos = union_categoricals(
+        [m['NO_GRUPO'].astype('category') for m in matrizes.values()],
+        ignore_order=True,
+    )
+    cod_grupo = grupos.codes.astype(np.int64) + 1  # 0 = NO_GRUPO vazio
+    cod_total = np.repeat(np.arange(len(destinos)), [len(m) for m in matrizes.values()])
+    valores = np.concatenate([m['VL_TOTAL'].to_numpy(dtype=float, na_value=np.nan) for m in matrizes.values()])
+
+    validas = cod_proposta >= 0
+    n_grupos = len(grupos.categories) + 1
+    chave = (cod_proposta[validas].astype(np.int64) * len(destinos) + cod_total[validas]) * n_grupos + cod_grupo[validas]
+    cod, unicas = pd.factorize(chave)
+    soma = np.bincount(cod, weights=np.nan_to_num(valores[validas]), minlength=len(unicas))
+    # Centavos somados em float64 são exatos até 2**53 (~90 trilhões de reais)
+    soma = np.rint(soma).astype(np.int64)
+    linhas = np.bincount(cod, minlength=len(unicas))
+
+    unicas = np.asarray(unicas)
+    grupo = unicas % n_grupos
+    total = (unicas // n_grupos) % len(destinos)
+    proposta = unicas // n_grupos // len(destinos)
+    indice = pd.MultiIndex.from_arrays(
+        [
+            propostas.take(proposta),
+            pd.Categorical.from_codes(total, destinos),
+            pd.Categorical.from_codes(grupo - 1, grupos.categories),
+        ],
+        names=[CHAVE_PROPOSTA, 'total', 'NO_GRUPO'],
+    )
+    return pd.DataFrame({'VL_TOTAL': soma, 'linhas': linhas}, index=indice)
+
+
+def montar_simplificada(aba1, aba2, aba3, remover_colunas):
+    """Aba1 com os totais mensais de cirurgias (aba3) e OCI (aba2) por proposta.
+
+    Os valores já chegam em centavos (Int64) pelo esquema e os totais saem
+    em centavos também. Retorna (simplificada, agregado por NO_GRUPO de
+    `agregar_matrizes`).
+    """
+    matrizes = {TOTAIS_SIMPLIFICADA[aba]: matriz for aba, matriz in (('aba3', aba3), ('aba2', aba2))}
+    with medir('tratamento.agregar_matrizes') as medida:
+        agregado = agregar_matrizes(matrizes)
+        medida.update(
+            linhas=len(aba3) + len(aba2),
+            bytes_entrada=bytes_em_memoria(aba3) + bytes_em_memoria(aba2),
+            bytes_saida=bytes_em_memoria(agregado),
+        )
+
+    # Os totais por proposta saem do agregado (pequeno) e entram na aba1 pela
+    # posição da proposta no índice; propostas sem linhas ficam com 0
+    totais = agregado['VL_TOTAL'].groupby(level=[CHAVE_PROPOSTA, 'total'], observed=True).sum().unstack('total')
+    totais = totais.reindex(columns=list(matrizes), fill_value=0).fillna(0).astype(np.int64)
+    posicoes = totais.index.get_indexer(aba1[CHAVE_PROPOSTA])
+
+    simp = aba1.drop(columns=remover_colunas)
+    for coluna in matrizes:
+        simp[coluna] = np.where(posicoes >= 0, totais[coluna].to_numpy()[posicoes], 0)
+    simp['VALOR_TOTAL_MES_COMP+OCI'] = simp['VL_TOTAL_COMP_CIRUGICO'] + simp['VL_TOTAL_OCI']
+    simp['VALOR_TOTAL_ANO_COMP+OCI'] = simp['VALOR_TOTAL_MES_COMP+OCI'] * 12
+    return simp, agregado
+
+
+# ======================================================
+# EXECUÇÃO
+# ======================================================
+def aplicar_etapas(df, etapas, contexto):
+    for operador, parametros in etapas:
+        with medir(f'tratamento.{operador}', item=contexto['modalidade']) as medida:
+            medida.update(linhas=len(df), bytes_entrada=bytes_em_memoria(df))
+            df = OPERADORES[operador](df, contexto, **parametros)
+            medida['bytes_saida'] = bytes_em_memoria(df)
+    return df
+
+
+def transformar_modalidade(modalidade, tabelas, config, sigtap=None, mensagens=None):
+    """Trata as abas de uma modalidade.
+
+    `tabelas` traz 'aba1', 'aba2' e 'aba3'; `sigtap` é o índice de
+    `carregar_sigtap` (por padrão, o de model/tabela_cc_sogrupo.csv). Com
+    uma lista `mensagens`, os avisos vão para ela em vez de serem impressos
+    (ver `dimensao.avisar`). Retorna o resultado com as
+    matrizes tratadas, a aba simplificada ('simp'), os totais e linhas por
+    proposta e NO_GRUPO ('grupos') e, se configurado, a aba de canceladas.
+    """
+    t0 = time.perf_counter()
+    abas = {f'{modalidade}_{aba}': df for aba, df in tabelas.items()}
+    with medir('tratamento.dimensao', item=modalidade) as medida:
+        dimensao = construir_dimensao(abas, mensagens)
+        propagar_cnes(abas, dimensao, mensagens)
+        medida.update(linhas=sum(len(df) for df in abas.values()), bytes_saida=bytes_em_memoria(dimensao[modalidade]))
+    if sigtap is None:
+        sigtap = carregar_sigtap()
+    contexto = {'modalidade': modalidade, 'dimensao': dimensao[modalidade], 'sigtap': sigtap, 'mensagens': mensagens}
+
+    resultado = {'aba1': tabelas['aba1']}
+    for aba in ('aba3', 'aba2'):
+        resultado[aba] = aplicar_etapas(tabelas[aba], config[aba], contexto)
+
+    simplificada = config['simplificada']
+    resultado['simp'], resultado['grupos'] = montar_simplificada(
+        resultado['aba1'], resultado['aba2'], resultado['aba3'], simplificada['remover_colunas']
+    )
+    if simplificada.get('canceladas'):
+        resultado['canceladas'] = resultado['simp'][resultado['simp']['Status da Proposta'] == 'Cancelado'].copy()
+    avisar(f'⚙️ {modalidade} tratada em {time.perf_counter() - t0:.2f}s.', mensagens)
+    return resultado
+
+
+def transformar_modalidades(exportacoes, modalidades=MODALIDADES, paralelo=True, sgrupo_path=SGRUPO_PATH):
+    """Trata todas as modalidades, cada uma em uma thread.
+
+    Threads e não processos: copiar as tabelas para outro processo custa
+    mais que o próprio tratamento. O ganho das threads sobre a execução em
+    sequência depende dos núcleos da máquina; meça com
+    `python benchmark_pipeline.py --comparar-tratamento`. Os avisos de cada
+    modalidade são impressos juntos, depois que todas terminam.
+
+    Retorna {modalidade: resultado} (ver `transformar_modalidade`).
+    """
+    tabelas = {}
+    for nome, df in exportacoes.items():
+        modalidade = modalidade_da_exportacao(nome)
+        if modalidade in modalidades:
+            tabelas.setdefault(modalidade, {})[nome.rsplit('_', 1)[1]] = df
+
+    t0 = time.perf_counter()
+    mensagens = {m: [] for m in tabelas}
+    argumentos = (
+        list(tabelas),
+        [tabelas[m] for m in tabelas],
+        [modalidades[m] for m in tabelas],
+        [carregar_sigtap(sgrupo_path)] * len(tabelas),
+        list(mensagens.values()),
+    )
+    if paralelo and len(tabelas) > 1:
+        with ThreadPoolExecutor(max_workers=len(tabelas)) as executor:
+            saidas = list(executor.map(transformar_modalidade, *argumentos))
+    else:
+        saidas = list(map(transformar_modalidade, *argumentos))
+
+    for da_modalidade in mensagens.values():
+        for texto in da_modalidade:
+            print(texto)
+    resultados = dict(zip(tabelas, saidas))
+    print(f'✅ Modalidades tratadas em {time.perf_counter() - t0:.2f}s.')
+    return resultados
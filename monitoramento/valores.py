@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+# ======================================================
+# VALORES MONETÁRIOS E QUANTIDADES
+# ======================================================
+# O portal entrega VL_* e QT_* ora como número, ora como texto no formato
+# brasileiro ('1.234,56', 'R$ 10,00'). Os valores ficam em centavos (Int64),
+# para que as somas sejam exatas; a planilha volta a receber reais.
+CENTAVOS = 100
+
+_SIMBOLOS = r'R\$|\s'
+_SO_MILHAR = r'-?\d{1,3}(?:\.\d{3})+'
+
+
+def _texto_para_numero(texto):
+    """Converte uma série de textos para Float64, aceitando o formato brasileiro.
+
+    Com vírgula, o ponto é separador de milhar e a vírgula é decimal; sem
+    vírgula, só '1.234.567' (grupos de três) é lido como milhar e '12.5'
+    continua sendo decimal, como o Excel grava.
+    """
+    texto = texto.str.replace(_SIMBOLOS, '', regex=True)
+    virgula = texto.str.contains(',', regex=False).fillna(False)
+    milhar = texto.str.fullmatch(_SO_MILHAR).fillna(False)
+    sem_milhar = texto.str.replace('.', '', regex=False)
+    texto = texto.mask(virgula, sem_milhar.str.replace(',', '.', regex=False)).mask(milhar & ~virgula, sem_milhar)
+    return pd.to_numeric(texto.replace('', pd.NA), errors='coerce').astype('Float64')
+
+
+def ler_numeros(serie):
+    """Lê `serie` como Float64, com os textos no formato brasileiro.
+
+    Aceita séries numéricas, de texto ou object com números e textos
+    misturados; os números passam direto. Retorna (números, quantidade de
+    valores preenchidos que não puderam ser lidos e viraram nulos).
+    """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = serie.astype('Float64')
+        preenchidos = serie.notna()
+    elif serie.dtype == object:
+        # Números de verdade passam direto; só os textos vão para o parser
+        textos = serie.map(lambda v: isinstance(v, str)).astype(bool)
+        numeros = pd.to_numeric(serie.where(~textos), errors='coerce').astype('Float64')
+        numeros = numeros.mask(textos, _texto_para_numero(serie.where(textos).astype('string')))
+        preenchidos = serie.notna() & ~(textos & serie.astype('string').str.strip().eq('').fillna(False))
+    else:
+        texto = serie.astype('string')
+        numeros = _texto_para_numero(texto)
+        preenchidos = texto.str.strip().ne('').fillna(False)
+    return numeros, int((preenchidos & numeros.isna()).sum())
+
+
+def converter_valores(serie, escala=CENTAVOS):
+    """Converte `serie` para Int64 na `escala` (100 = centavos, 1 = unidades).
+
+    Aceita o mesmo que `ler_numeros`. Retorna (série convertida, quantidade
+    de valores preenchidos que não puderam ser lidos e viraram nulos).
+    """
+    numeros, coagidos = ler_numeros(serie)
+    # Arredondamento comercial (metade para longe do zero), como o ROUND do
+    # Excel; o round(6) antes absorve o erro binário de 1.005 * 100
+    escalados = np.round(numeros.to_numpy(dtype=float, na_value=np.nan) * escala, 6)
+    inteiros = np.sign(escalados) * np.floor(np.abs(escalados) + 0.5)
+    convertida = pd.array(inteiros, dtype='Float64').astype('Int64')
+    return pd.Series(convertida, index=serie.index, name=serie.name), coagidos
+
+
+def para_reais(serie):
+    """Centavos (Int64) -> reais (float), com NaN nos nulos."""
+    return pd.Series(
+        serie.to_numpy(dtype=float, na_value=np.nan) / CENTAVOS,
+        index=serie.index,
+        name=serie.name,
+    )
@@ -0,0 +1,275 @@
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES
+
+from monitoramento.esquemas import para_planilha
+from monitoramento.medicoes import medir
+
+# ======================================================
+# VALORES DAS FÓRMULAS DO MODELO
+# ======================================================
+# VISÃO_GERAL, VISÃO_GERAL_M1 e a coluna CANCELAR são fórmulas (PROCV sobre
+# as abas de dados) que só o Excel calculava. Aqui o mesmo cálculo é feito no
+# pandas, uma coluna da fórmula por vez, e os valores vão em cache junto das
+# fórmulas (monitoramento.planilha_zip): o arquivo abre sem recalcular e pode
+# ser lido por quem não é o Excel. Os erros do Excel ficam como o texto do
+# erro ('#N/A', '#VALUE!'), que a escrita grava como célula de erro.
+NA = '#N/A'
+VALOR = '#VALUE!'
+
+HOSPITAIS_ABA = 'HOSPITAIS_COM_DIVIDAS'
+# Cabeçalho da aba de hospitais na linha 6; dados de A7 em diante
+HOSPITAIS_LINHA_INICIAL = 7
+
+# Linha 1 das visões: contagem de distintos (SOMARPRODUTO/CONT.SE até a linha
+# limite) e SUBTOTAL(109) das colunas de valor
+TOTAIS = {
+    'VISÃO_GERAL': {'distintos': ['B', 'G', 'H'], 'limite': 6690, 'somas': list('IJKLNOPQTUX')},
+    'VISÃO_GERAL_M1': {'distintos': ['B', 'H', 'I'], 'limite': 8106, 'somas': list('JKLMP')},
+}
+
+SIM_VALOR = 'SIM, POSSUI VALOR ACIMA DE R$100.000,00'
+NAO_VALOR = 'NÃO, POSSUI VALOR NECESSÁRIO'
+
+
+def carregar_hospitais(modelo_path):
+    """Aba HOSPITAIS_COM_DIVIDAS do modelo (colunas A:E, valores como o Excel guardou)."""
+    with medir('saida.ler_excel', item=HOSPITAIS_ABA) as medida:
+        hospitais = pd.read_excel(
+            modelo_path,
+            sheet_name=HOSPITAIS_ABA,
+            header=None,
+            skiprows=HOSPITAIS_LINHA_INICIAL - 1,
+            usecols='A:E',
+            dtype=object,
+        )
+        medida.update(linhas=len(hospitais), bytes_entrada=os.path.getsize(modelo_path))
+    return hospitais
+
+
+# ======================================================
+# FUNÇÕES DO EXCEL, UMA COLUNA POR VEZ
+# ======================================================
+def _erros(serie):
+    return serie.isin(list(ERROR_CODES))
+
+
+def _primeiro_erro(*series):
+    """Erro de cada linha vindo do primeiro operando com erro (None se não houver)."""
+    erro = pd.Series(None, index=series[0].index, dtype=object)
+    for serie in reversed(series):
+        erro = erro.mask(_erros(serie), serie)
+    return erro
+
+
+def _procv(chaves, tabela, colunas, vazio=0):
+    """PROCV(chave; tabela!A:?; coluna; FALSO) de cada chave, para cada coluna de `colunas`.
+
+    Vale a primeira ocorrência da chave na coluna A; chave não encontrada
+    dá #N/A e célula vazia encontrada vira `vazio` (0 no Excel). Retorna uma
+    série por coluna, na ordem de `colunas`.
+    """
+    primeiras = tabela[tabela.iloc[:, 0].notna()].drop_duplicates(subset=tabela.columns[0])
+    posicoes = pd.Index(primeiras.iloc[:, 0]).get_indexer(chaves.to_numpy(dtype=object))
+    posicoes = np.where(_erros(chaves).to_numpy(), -1, posicoes)
+    resultados = []
+    for coluna in colunas:
+        valores = primeiras.iloc[:, coluna - 1]
+        valores = valores.astype(object).where(valores.notna(), vazio).to_numpy(dtype=object)
+        encontrados = np.take(valores, posicoes) if len(valores) else np.full(len(posicoes), NA, dtype=object)
+        resultados.append(pd.Series(np.where(posicoes >= 0, encontrados, NA), index=chaves.index, dtype=object))
+    return resultados
+
+
+def _seerro(serie, valor=''):
+    """SEERRO(serie; valor)."""
+    return serie.mask(_erros(serie), valor)
+
+
+def _conta(funcao, *series):
+    """`funcao` sobre os números das séries, com os erros do Excel.
+
+    O erro do primeiro operando com erro passa adiante; texto que não é
+    número dá #VALUE!.
+    """
+    numeros = [pd.to_numeric(s.where(s.notna(), 0), errors='coerce').astype(float) for s in series]
+    erro = pd.Series(None, index=series[0].index, dtype=object)
+    for serie, numero in reversed(list(zip(series, numeros))):
+        erro = erro.mask(numero.isna(), VALOR).mask(_erros(serie), serie)
+    resultado = pd.Series(funcao(*numeros), index=series[0].index).astype(object)
+    return resultado.where(erro.isna(), erro)
+
+
+def _se(teste, verdadeiro, falso):
+    """SE(teste; verdadeiro; falso), com o erro do teste no lugar."""
+    resultado = pd.Series(np.where(teste.eq(True), verdadeiro, falso), index=teste.index, dtype=object)
+    return resultado.mask(_erros(teste), teste)
+
+
+def _esquerda(serie, caracteres):
+    """ESQUERDA(serie; caracteres), com os números no texto que o Excel mostra."""
+
+    def texto(valor):
+        if isinstance(valor, str) and valor in ERROR_CODES:
+            return valor
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)
+        return str(valor)[:caracteres]
+
+    return serie.map(texto).astype(object)
+
+
+def _so_numeros(serie):
+    """Só os números da série (float), como MÁXIMO e SUBTOTAL leem células: texto fica NaN."""
+    numeros = serie.map(lambda v: isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_)))
+    return pd.to_numeric(serie.where(numeros.astype(bool)), errors='coerce').astype(float)
+
+
+def _maximo(*series):
+    """MÁXIMO das células: textos são ignorados, erros passam adiante."""
+    maximo = pd.concat([_so_numeros(s) for s in series], axis=1).max(axis=1).fillna(0)
+    erro = _primeiro_erro(*series)
+    return maximo.astype(object).where(erro.isna(), erro)
+
+
+def _como_texto(serie):
+    """Texto de cada valor como o CONT.SE compara (sem diferenciar maiúsculas)."""
+    return serie.map(lambda v: str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)).str.lower()
+
+
+# ======================================================
+# ABAS CALCULADAS
+# ======================================================
+def _chaves(dados):
+    """=ABA!A3, =ABA!A4...: a coluna A da aba de dados, com 0 nas vazias."""
+    return dados.iloc[:, 0].astype(object).where(dados.iloc[:, 0].notna(), 0).reset_index(drop=True)
+
+
+def _colunas_do_procv(chaves, tabela, colunas):
+    """{letra: PROCV(chave; tabela; coluna)} para `colunas` ({letra: coluna})."""
+    return dict(zip(colunas, _procv(chaves, tabela, colunas.values())))
+
+
+def calcular_visao_geral(cf, simp, hospitais):
+    """Colunas A:X da VISÃO_GERAL para cada linha de CREDITO_FINANCEIRO."""
+    dados = para_planilha(cf)
+    b = _chaves(dados)
+    c = _colunas_do_procv(b, dados, {'C': 2, 'D': 5, 'E': 3, 'F': 4, 'G': 6, 'H': 7, 'I': 10, 'J': 11, 'K': 12})
+    for letra in 'CDEF':
+        c[letra] = _seerro(c[letra])
+
+    l = _maximo(c['I'], c['J'], c['K'])
+    n, o = _procv(b, para_planilha(simp), [9, 8])
+    p = _conta(lambda o, n: o + n, o, n)
+    t = _conta(lambda l: l * np.where(l > 10_000_000, 0.3, np.where(l >= 5_000_000, 0.4, 0.5)), l)
+    u = _conta(lambda t, p: t - p, t, p)
+    w = _esquerda(c['D'], 8)
+    faixa = _conta(lambda l: np.where(l > 10_000_000, 0, np.where(l >= 5_000_000, 1, 2)), l)
+    return pd.DataFrame(
+        {
+            'A': _seerro(c['C']),
+            'B': b,
+            **c,
+            'L': l,
+            'M': _se(_conta(lambda l: l == 0, l), 'NÃO, POSSUI VALOR', 'SIM, POSSUI VALOR'),
+            'N': n,
+            'O': o,
+            'P': p,
+            'Q': _conta(lambda p: p * 12, p),
+            'R': _se(_conta(lambda p: p >= 100_000, p), SIM_VALOR, NAO_VALOR),
+            'S': faixa.map({0: 'Faixa I - 30%', 1: 'Faixa II - 40%', 2: 'Faixa III - 50%'}).fillna(faixa),
+            'T': t,
+            'U': u,
+            'V': _se(
+                _conta(lambda u, t: (u >= t) | (u < 0) | (t == 0), u, t),
+                'NÃO, ATENDEU O CRITÉRIO',
+                'SIM, ATENDEU O CRITÉRIO',
+            ),
+            'W': w,
+            'X': _seerro(_procv(w, hospitais, [5])[0]),
+        }
+    )
+
+
+def calcular_visao_geral_m1(m1, simp, hospitais):
+    """Colunas da VISÃO_GERAL_M1 para cada linha de MODALIDADE_1 (D é preenchida à mão)."""
+    dados = para_planilha(m1)
+    b = _chaves(dados)
+    c = _colunas_do_procv(b, dados, {'C': 2, 'E': 5, 'F': 3, 'G': 4, 'H': 6, 'I': 7})
+    j, k = _procv(b, para_planilha(simp), [9, 8])
+    l = _conta(lambda k, j: k + j, k, j)
+    o = _esquerda(c['E'], 8)
+    return pd.DataFrame(
+        {
+            'A': c['C'],
+            'B': b,
+            **c,
+            'J': j,
+            'K': k,
+            'L': l,
+            'M': _conta(lambda l: l * 12, l),
+            'N': _se(_conta(lambda l: l > 100_000, l), SIM_VALOR, NAO_VALOR),
+            'O': o,
+            'P': _seerro(_procv(o, hospitais, [5])[0]),
+        }
+    )
+
+
+def calcular_cancelar(cf, ccpp):
+    """Coluna CANCELAR (M) da CREDITO_FINANCEIRO.
+
+    PROCV(proposta; 'CCPP-CANCELAR'!B:G; 2)<>"": chave na coluna B da
+    CCPP-CANCELAR, valor na C, como está na fórmula do modelo.
+    """
+    (encontrados,) = _procv(_chaves(para_planilha(cf)), para_planilha(ccpp).iloc[:, 1:], [2], vazio='')
+    preenchidos = ~_erros(encontrados) & encontrados.ne('')
+    return pd.DataFrame({'M': np.where(preenchidos, 'CANCELAR_PROPOSTA', '').astype(object)})
+
+
+def totais_da_visao(visao, distintos, limite, somas, linha_inicial=3):
+    """Valores da linha 1 da visão ({'B1': ...}).
+
+    Distintos: (SOMARPRODUTO(1/CONT.SE(B3:B<limite>; ...&"")))-1, isto é, os
+    valores distintos não vazios até a linha `limite`. Somas: SUBTOTAL(109)
+    das colunas. Um erro em qualquer linha vira o total.
+    """
+    totais = {}
+    for letra in distintos:
+        intervalo = visao[letra].iloc[: limite - linha_inicial + 1]
+        erro = _primeiro_erro(intervalo).dropna()
+        if len(erro):
+            totais[f'{letra}1'] = erro.iloc[0]
+            continue
+        textos = _como_texto(intervalo)
+        # Vazias e "" contam como um valor só, que o -1 desconta
+        vazios = (textos == '').any() or len(intervalo) < limite - linha_inicial + 1
+        totais[f'{letra}1'] = textos[textos != ''].nunique() + (1 if vazios else 0) - 1
+    for letra in somas:
+        erro = _primeiro_erro(visao[letra]).dropna()
+        totais[f'{letra}1'] = erro.iloc[0] if len(erro) else float(_so_numeros(visao[letra]).sum())
+    return totais
+
+
+def calcular_em_cache(abas, hospitais):
+    """Valores das fórmulas do modelo a partir das abas de dados ({aba: df}).
+
+    Retorna (em_cache, celulas_em_cache) no formato de `gerar_saida_zip`:
+    as colunas calculadas por aba e os valores da linha 1 das visões.
+    """
+    em_cache, celulas = {}, {}
+    calculos = [
+        ('CREDITO_FINANCEIRO', calcular_cancelar, ('CREDITO_FINANCEIRO', 'CCPP-CANCELAR'), ()),
+        ('VISÃO_GERAL', calcular_visao_geral, ('CREDITO_FINANCEIRO', 'SIMP_CF'), (hospitais,)),
+        ('VISÃO_GERAL_M1', calcular_visao_geral_m1, ('MODALIDADE_1', 'SIMP_M1'), (hospitais,)),
+    ]
+    for aba, calcular, origens, extras in calculos:
+        if all(origem in abas for origem in origens):
+            with medir('saida.calcular_formulas', item=aba) as medida:
+                em_cache[aba] = calcular(*(abas[origem] for origem in origens), *extras)
+                medida['linhas'] = len(em_cache[aba])
+    for aba, totais in TOTAIS.items():
+        if aba in em_cache:
+            celulas[aba] = totais_da_visao(em_cache[aba], **totais)
+    return em_cache, celulas
@@ -3,7 +3,6 @@ import json
 import shutil
 import smtplib
 from datetime import datetime
-import papermill as pm
 from dotenv import load_dotenv
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -16,6 +15,10 @@ from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 import webbrowser
 
+from monitoramento.entregas import canal
+from monitoramento.medicoes import medir
+from monitoramento.pipeline import executar
+
 # ======================================================
 # CARREGAR VARIÁVEIS DO .env
 # ======================================================
@@ -32,7 +35,6 @@ GOOGLE_PROJECT_ID = os.getenv("GOOGLE_PROJECT_ID")
 # ======================================================
 # CONFIGURAÇÕES GERAIS
 # ======================================================
-NOTEBOOK_PATH = 'credito_modalidade.ipynb'
 SAIDA_DIR = 'saida'
 ARQUIVO_NOME = f"{datetime.today().strftime('%Y%m%d')}_MONITORAMENTO DE COMPONENTE.xlsx"
 RELATORIO_PATH = os.path.join(SAIDA_DIR, ARQUIVO_NOME)
@@ -57,13 +59,25 @@ def gerar_arquivo_credenciais():
     with open("credentials.json", "w") as f:
         json.dump(credenciais, f)
 
-def executar_notebook():
-    print("🚀 Executando notebook...")
+def executar_monitoramento():
+    # As entregas rodam ao mesmo tempo; cada uma é uma etapa do pipeline: depois de uma falha, só ela é refeita
+    print("🚀 Executando monitoramento...")
     try:
-        pm.execute_notebook(NOTEBOOK_PATH, NOTEBOOK_PATH)
-        print("✅ Notebook executado com sucesso.")
+        executar(
+            saida_dir=SAIDA_DIR,
+            entregas={
+                # O upload espera a autorização manual do OAuth: prazo longo e sem repetir
+                "google_drive": canal(
+                    lambda resultado: upload_para_google_drive(RELATORIO_PATH, ARQUIVO_NOME, GOOGLE_DRIVE_FOLDER_ID),
+                    timeout=900,
+                    tentativas=1,
+                ),
+                "email_gmail": canal(lambda resultado: enviar_email(), timeout=180),
+            },
+        )
+        print("✅ Monitoramento executado com sucesso.")
     except Exception as e:
-        print(f"❌ Erro ao executar notebook: {e}")
+        print(f"❌ Erro ao executar monitoramento: {e}")
 
 def limpar_arquivos_em_uso(pasta):
     for arquivo in os.listdir(pasta):
@@ -99,13 +113,14 @@ def upload_para_google_drive(caminho_arquivo, nome_arquivo, pasta_id):
     service = build('drive', 'v3', credentials=creds)
     file_metadata = {'name': nome_arquivo, 'parents': [pasta_id]}
     media = MediaFileUpload(caminho_arquivo, resumable=True)
-    file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+    with medir('entrega.google_drive', item=nome_arquivo) as medida:
+        file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
+        medida['bytes_saida'] = os.path.getsize(caminho_arquivo)
     print(f"✅ Arquivo enviado para o Google Drive (ID: {file.get('id')})")
 
 def enviar_email():
     if not os.path.exists(RELATORIO_PATH):
-        print(f"❌ Arquivo para envio não encontrado: {RELATORIO_PATH}")
-        return
+        raise FileNotFoundError(f"Arquivo para envio não encontrado: {RELATORIO_PATH}")
 
     print("📧 Preparando e-mail para envio via Gmail...")
 
@@ -141,12 +156,13 @@ def enviar_email():
     msg.attach(parte)
 
     try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as servidor:
+        with medir("entrega.smtp", item="smtp.gmail.com") as medida, smtplib.SMTP_SSL("smtp.gmail.com", 465) as servidor:
             servidor.login(EMAIL_REMETENTE, SENHA_APP)
             servidor.send_message(msg)
+            medida["bytes_saida"] = len(msg.as_bytes())
         print("📤 E-mail enviado com sucesso via Gmail.")
     except Exception as e:
-        print(f"❌ Erro ao enviar e-mail: {e}")
+        raise RuntimeError(f"Erro ao enviar e-mail: {e}") from e
 
 # ======================================================
 # EXECUÇÃO PRINCIPAL
@@ -154,6 +170,4 @@ def enviar_email():
 
 if __name__ == "__main__":
     limpar_arquivos_em_uso(r"C:\Users\Datasus\Downloads")
-    executar_notebook()
-    upload_para_google_drive(RELATORIO_PATH, ARQUIVO_NOME, GOOGLE_DRIVE_FOLDER_ID)
-    enviar_email()
+    executar_monitoramento()
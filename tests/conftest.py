@@ -0,0 +1,43 @@
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from monitoramento.correcoes import aplicar_correcoes
+from monitoramento.ingestao import ler_exportacoes
+from monitoramento.pipeline import abas_da_saida, dataframes
+from monitoramento.sinteticos import gerar_exportacoes, gravar_exportacoes
+from monitoramento.transformacao import transformar_modalidades
+
+# Escala das exportações sintéticas nos testes: poucas centenas de propostas
+ESCALA = 0.2
+
+
+@pytest.fixture(scope='session')
+def pasta_sinteticos(tmp_path_factory):
+    """Pasta com as seis exportações sintéticas em .xlsx."""
+    with redirect_stdout(io.StringIO()):
+        return gravar_exportacoes(ESCALA, 0, str(tmp_path_factory.mktemp('sinteticos')))
+
+
+@pytest.fixture(scope='session')
+def geradas():
+    """As exportações sintéticas como saem do gerador, antes do .xlsx."""
+    return gerar_exportacoes(ESCALA, 0)
+
+
+@pytest.fixture
+def exportacoes(pasta_sinteticos, tmp_path):
+    """As exportações lidas pela ingestão, sem as correções (cada teste recebe as suas)."""
+    with redirect_stdout(io.StringIO()):
+        return ler_exportacoes(pasta_sinteticos, cache_dir=str(tmp_path / 'cache'), parquet_dir=str(tmp_path / 'parquet'))
+
+
+@pytest.fixture(scope='session')
+def abas(pasta_sinteticos, tmp_path_factory):
+    """{aba do modelo: DataFrame} da saída, depois de correções e tratamento."""
+    pasta = tmp_path_factory.mktemp('ingestao')
+    with redirect_stdout(io.StringIO()):
+        exportacoes = ler_exportacoes(pasta_sinteticos, cache_dir=str(pasta / 'cache'), parquet_dir=str(pasta / 'parquet'))
+        aplicar_correcoes(exportacoes)
+        return abas_da_saida(dataframes(transformar_modalidades(exportacoes)))
@@ -0,0 +1,61 @@
+import re
+import zipfile
+
+import openpyxl
+
+from monitoramento.cache_downloads import _contar_linhas, calcular_hash, hash_do_conteudo, registrar_exportacao
+
+
+def _exportacao(caminho, linhas):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['Proposta de Referência', 'Status da Proposta', 'Valor'])
+    for linha in linhas:
+        ws.append(linha)
+    wb.save(caminho)
+    return caminho
+
+
+def _reexportar(origem, destino, date_time, sem_dimensao=False):
+    """Mesmo conteúdo com outros metadados: datas das entradas do zip e docProps/core.xml."""
+    with zipfile.ZipFile(origem) as entrada, zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as saida:
+        for info in entrada.infolist():
+            dados = entrada.read(info.filename)
+            if info.filename == 'docProps/core.xml':
+                dados = re.sub(rb'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ', b'2031-01-02T03:04:05Z', dados)
+            if sem_dimensao and info.filename.startswith('xl/worksheets/'):
+                dados = re.sub(rb'<dimension [^>]*/>', b'', dados)
+            saida.writestr(zipfile.ZipInfo(info.filename, date_time=date_time), dados)
+    return destino
+
+
+LINHAS = [['1234567890123456', 'Aprovado', 10.5], ['6543210987654321', 'Cancelado', 3]]
+
+
+def test_mesmos_dados_mesmo_hash(tmp_path):
+    original = _exportacao(tmp_path / 'a.xlsx', LINHAS)
+    outra_data = _reexportar(original, tmp_path / 'b.xlsx', (2031, 1, 2, 3, 4, 6))
+    assert calcular_hash(original) != calcular_hash(outra_data)
+    assert hash_do_conteudo(original) == hash_do_conteudo(outra_data)
+
+    alterada = _exportacao(tmp_path / 'c.xlsx', [*LINHAS[:1], ['6543210987654321', 'Aprovado', 3]])
+    assert hash_do_conteudo(alterada) != hash_do_conteudo(original)
+
+
+def test_reexportacao_igual_nao_conta_como_alteracao(tmp_path):
+    cache = tmp_path / 'cache'
+    pasta_ontem, pasta_hoje = tmp_path / 'ontem', tmp_path / 'hoje'
+    pasta_ontem.mkdir()
+    pasta_hoje.mkdir()
+    ontem = _exportacao(pasta_ontem / 'credito_financeiro_aba1.xlsx', LINHAS)
+    hoje = _reexportar(ontem, pasta_hoje / 'credito_financeiro_aba1.xlsx', (2031, 1, 2, 3, 4, 6))
+
+    assert registrar_exportacao(str(ontem), str(cache))['alterado']
+    assert not registrar_exportacao(str(hoje), str(cache))['alterado']
+
+
+def test_contar_linhas_sem_dimension(tmp_path):
+    original = _exportacao(tmp_path / 'a.xlsx', LINHAS)
+    sem_dimensao = _reexportar(original, tmp_path / 'b.xlsx', (2031, 1, 2, 3, 4, 6), sem_dimensao=True)
+    assert openpyxl.load_workbook(sem_dimensao, read_only=True).worksheets[0].max_row is None
+    assert _contar_linhas(original) == _contar_linhas(sem_dimensao) == 2
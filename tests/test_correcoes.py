@@ -0,0 +1,49 @@
+from monitoramento.correcoes import aplicar_correcoes, carregar_correcoes, compilar_correcoes
+from monitoramento.esquemas import CHAVE_PROPOSTA
+
+
+def test_todas_as_regras_alteram_linhas(exportacoes):
+    relatorio = aplicar_correcoes(exportacoes)
+    por_regra = relatorio.groupby('regra')['linhas'].sum()
+    regras = [regra['regra'] for regra in carregar_correcoes()['status']] + ['cnes_por_cnpj']
+    for regra in regras:
+        assert por_regra.get(regra, 0) > 0, regra
+
+
+def test_status_das_regras_e_excecoes(exportacoes):
+    correcoes = carregar_correcoes()
+    antes = {nome: df.set_index(CHAVE_PROPOSTA)['Status da Proposta'].astype(str) for nome, df in exportacoes.items()}
+    aplicar_correcoes(exportacoes, compilar_correcoes(correcoes))
+
+    for regra in correcoes['status']:
+        for modalidade in regra['modalidades']:
+            nome = f'{modalidade}_aba1'
+            depois = exportacoes[nome].set_index(CHAVE_PROPOSTA)['Status da Proposta'].astype(str)
+            for entrada in regra['propostas']:
+                proposta = entrada['proposta']
+                if proposta not in depois.index:
+                    continue
+                if not entrada.get('ativo', True) or antes[nome][proposta] in regra.get('exceto_status', []):
+                    assert depois[proposta] == antes[nome][proposta], (regra['regra'], proposta)
+                else:
+                    assert depois[proposta] == regra['status'], (regra['regra'], proposta)
+
+
+def test_cnes_pelo_cnpj(exportacoes):
+    aplicar_correcoes(exportacoes)
+    for item in carregar_correcoes()['cnes_por_cnpj']:
+        for nome in ('credito_financeiro_aba1', 'modalidade_1_aba1'):
+            df = exportacoes[nome]
+            assert (df.loc[df['CNPJ'] == item['cnpj'], 'CNES'] == item['cnes']).all()
+
+
+def test_status_sinteticos_sao_os_do_painel(exportacoes):
+    # Os status que os e-mails e as métricas contam (enviar_relatorio.formatar_modalidade)
+    do_painel = {
+        'Aprovado', 'PRE-Aprovado', 'Em Diligência', 'Em Preenchimento', 'Aguardando Validação do Gestor',
+        'Em Análise', 'Enviado para Análise', 'Cancelado',
+    }
+    for nome in ('credito_financeiro_aba1', 'modalidade_1_aba1'):
+        status = set(exportacoes[nome]['Status da Proposta'].dropna().astype(str))
+        assert status <= do_painel, status - do_painel
+        assert {'Em Análise', 'Em Diligência', 'Enviado para Análise'} <= status
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from monitoramento.dimensao import buscar, construir_dimensao
+from monitoramento.esquemas import CHAVE_PROPOSTA
+
+
+def test_busca_igual_ao_merge_pela_proposta(exportacoes):
+    dimensao = construir_dimensao(exportacoes)
+    assert set(dimensao) == {'credito_financeiro', 'modalidade_1'}
+    for modalidade, tabela in dimensao.items():
+        assert tabela.index.is_unique
+        matriz = exportacoes[f'{modalidade}_aba3']
+        esperado = matriz[[CHAVE_PROPOSTA]].merge(
+            exportacoes[f'{modalidade}_aba1'][[CHAVE_PROPOSTA, 'UF']], on=CHAVE_PROPOSTA, how='left'
+        )['UF']
+        assert buscar(matriz, tabela, 'UF').tolist() == esperado.tolist()
+
+
+def test_proposta_ausente_fica_nula(exportacoes):
+    tabela = construir_dimensao(exportacoes)['credito_financeiro']
+    df = pd.DataFrame({CHAVE_PROPOSTA: pd.array([tabela.index[0], 1], dtype='UInt64')})
+    uf = buscar(df, tabela, 'UF')
+    assert uf.iloc[0] == tabela['UF'].iloc[0]
+    assert pd.isna(uf.iloc[1])
+
+
+def test_proposta_repetida_na_dimensao(exportacoes):
+    aba1 = exportacoes['modalidade_1_aba1']
+    exportacoes['modalidade_1_aba1'] = pd.concat([aba1, aba1.iloc[:2]], ignore_index=True)
+    with pytest.raises(ValueError, match='2 proposta'):
+        construir_dimensao(exportacoes)
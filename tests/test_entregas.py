@@ -0,0 +1,62 @@
+import threading
+
+from monitoramento.entregas import canal, entregar
+from monitoramento.etapas import Etapas, confirmar
+
+
+def _entregas_como_etapas(pasta):
+    etapas = Etapas(pasta)
+
+    def rodar(nome, tentar):
+        return etapas.etapa(f'entrega_{nome}', {'relatorio': 'r1'}, tentar).obter()
+
+    return etapas, rodar
+
+
+def test_entrega_sem_resposta_e_esperada_e_nao_roda_de_novo_sem_confirmacao(tmp_path):
+    pasta = str(tmp_path / 'etapas')
+    chamadas = []
+    liberar = threading.Event()
+
+    def email(resultado):
+        chamadas.append('email')
+        liberar.wait(5)
+
+    canais = {'email': canal(email, timeout=0.1, tentativas=2)}
+    threading.Timer(0.3, liberar.set).start()
+    etapas, rodar = _entregas_como_etapas(pasta)
+    relato = entregar(canais, {}, rodar, tolerancia=5)['email']
+    # Sem nova tentativa, e a tentativa atrasada terminou dentro da tolerância
+    assert relato['status'] == 'sem_resposta'
+    assert relato['depois_do_prazo'] == 'ok'
+    assert chamadas == ['email']
+    assert etapas.registro['etapas']['entrega_email']['status'] == 'sem_resposta'
+
+    # A próxima execução não repete o envio sozinha
+    relato = entregar(canais, {}, _entregas_como_etapas(pasta)[1])['email']
+    assert relato['status'] == 'sem_resposta'
+    assert chamadas == ['email']
+
+    confirmar('entrega_email', concluida=True, pasta=pasta)
+    relato = entregar(canais, {}, _entregas_como_etapas(pasta)[1])['email']
+    assert relato['status'] == 'cache'
+    assert chamadas == ['email']
+
+
+def test_reexecucao_confirmada_roda_a_entrega_de_novo(tmp_path):
+    pasta = str(tmp_path / 'etapas')
+    chamadas = []
+    lenta = {'v': True}
+
+    def email(resultado):
+        chamadas.append('email')
+        if lenta['v']:
+            threading.Event().wait(0.5)
+
+    canais = {'email': canal(email, timeout=0.1)}
+    assert entregar(canais, {}, _entregas_como_etapas(pasta)[1], tolerancia=2)['email']['status'] == 'sem_resposta'
+
+    lenta['v'] = False
+    confirmar('entrega_email', concluida=False, pasta=pasta)
+    assert entregar(canais, {}, _entregas_como_etapas(pasta)[1])['email']['status'] == 'ok'
+    assert chamadas == ['email', 'email']
@@ -0,0 +1,52 @@
+import io
+import zipfile
+import zlib
+
+import pytest
+
+from monitoramento import planilha_zip
+from monitoramento.planilha_zip import EscritorZip
+
+PARTES = {
+    '[Content_Types].xml': b'<Types/>',
+    'xl/worksheets/sheet1.xml': b'<worksheet>' + b'<row/>' * 5000 + b'</worksheet>',
+    'xl/média/ação.xml': 'dados com acentuação'.encode('utf-8'),
+    'vazio.xml': b'',
+}
+
+
+def _gravar(partes):
+    saida = io.BytesIO()
+    escritor = EscritorZip(saida)
+    for i, (nome, dados) in enumerate(partes.items()):
+        info = zipfile.ZipInfo(nome, date_time=(2025, 7, 1, 12, 30, 58))
+        if i % 2:
+            escritor.adicionar(info, dados)
+        else:
+            compressor = zlib.compressobj(1, zlib.DEFLATED, -zlib.MAX_WBITS)
+            comprimido = compressor.compress(dados) + compressor.flush()
+            escritor.adicionar_comprimida(info, io.BytesIO(comprimido), zlib.crc32(dados), len(comprimido), len(dados))
+    escritor.fechar()
+    saida.seek(0)
+    return saida
+
+
+def _conferir(saida, partes):
+    with zipfile.ZipFile(saida) as lido:
+        assert lido.testzip() is None
+        assert lido.namelist() == list(partes)
+        for nome, dados in partes.items():
+            assert lido.read(nome) == dados
+            assert lido.getinfo(nome).date_time == (2025, 7, 1, 12, 30, 58)
+
+
+def test_zip_legivel_pelo_zipfile():
+    _conferir(_gravar(PARTES), PARTES)
+
+
+@pytest.mark.parametrize('limite, limite_entradas', [(64, 0xFFFF), (0xFFFFFFFF, 2)])
+def test_extensoes_zip64(monkeypatch, limite, limite_entradas):
+    """Com limites baixos, tamanhos, posições e quantidade de partes vão para os campos zip64."""
+    monkeypatch.setattr(planilha_zip, 'LIMITE_ZIP64', limite)
+    monkeypatch.setattr(planilha_zip, 'LIMITE_ENTRADAS_ZIP64', limite_entradas)
+    _conferir(_gravar(PARTES), PARTES)
@@ -0,0 +1,39 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from monitoramento.etapas import REGISTRO_NOME, Etapas
+
+
+def _execucao_interrompida(pasta, inicio):
+    """Registro de uma execução que baixou as exportações e parou antes de concluir."""
+    etapas = Etapas(pasta)
+    chamadas = []
+    etapas.etapa('download', {'download_dir': 'd'}, lambda: chamadas.append('download'), so_ao_retomar=True).obter()
+    caminho = os.path.join(pasta, REGISTRO_NOME)
+    with open(caminho, encoding='utf-8') as f:
+        registro = json.load(f)
+    registro['execucao']['inicio'] = inicio.isoformat(timespec='seconds')
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(registro, f)
+    return chamadas
+
+
+def test_retoma_execucao_do_mesmo_dia(tmp_path):
+    pasta = str(tmp_path)
+    chamadas = _execucao_interrompida(pasta, datetime.now())
+    etapas = Etapas(pasta)
+    assert etapas.retomando
+    etapas.etapa('download', {'download_dir': 'd'}, lambda: chamadas.append('download'), so_ao_retomar=True).obter()
+    assert chamadas == ['download']
+
+
+def test_nao_retoma_execucao_de_outro_dia(tmp_path):
+    pasta = str(tmp_path)
+    chamadas = _execucao_interrompida(pasta, datetime.now() - timedelta(days=3))
+    etapas = Etapas(pasta)
+    assert not etapas.retomando
+    # O download de três dias atrás não é reaproveitado
+    etapas.etapa('download', {'download_dir': 'd'}, lambda: chamadas.append('download'), so_ao_retomar=True).obter()
+    assert chamadas == ['download', 'download']
+    assert etapas.registro['execucao']['inicio'][:10] == datetime.now().date().isoformat()
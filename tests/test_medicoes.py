@@ -0,0 +1,15 @@
+from monitoramento.medicoes import texto_prometheus
+
+
+def test_prometheus_sem_perder_digitos():
+    execucao = {
+        'inicio': 0,
+        'spans': [
+            {'span': 'saida.aba', 'item': 'X', 'segundos': 0.1234567891, 'linhas': 1879132,
+             'bytes_entrada': 1879132, 'bytes_saida': None, 'status': 'ok'},
+        ],
+    }
+    amostras = dict(linha.rsplit(' ', 1) for linha in texto_prometheus(execucao).splitlines() if not linha.startswith('#'))
+    assert amostras['monitoramento_span_bytes_entrada{span="saida.aba",item="X"}'] == '1879132'
+    assert amostras['monitoramento_span_linhas{span="saida.aba",item="X"}'] == '1879132'
+    assert float(amostras['monitoramento_span_segundos{span="saida.aba",item="X"}']) == 0.1234567891
@@ -0,0 +1,67 @@
+import io
+from contextlib import redirect_stdout
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from monitoramento.planilha import MODELO_PATH, sobrescrever_aba
+from monitoramento.planilha_zip import gerar_saida_zip, reescrever_aba
+
+
+def _celulas(caminho, abas):
+    workbook = openpyxl.load_workbook(caminho)
+    return {
+        (aba, celula.coordinate): (celula.value, celula.data_type, celula.number_format)
+        for aba in abas
+        for linha in workbook[aba].iter_rows()
+        for celula in linha
+    }
+
+
+def test_motores_gravam_os_mesmos_valores_e_formatos(abas, tmp_path):
+    """O motor zip e o openpyxl dão as mesmas células (valor, tipo e formato de número)."""
+    with redirect_stdout(io.StringIO()):
+        workbook = openpyxl.load_workbook(MODELO_PATH)
+        for aba, df in abas.items():
+            sobrescrever_aba(workbook, aba, df)
+        workbook.save(tmp_path / 'openpyxl.xlsx')
+        gerar_saida_zip(MODELO_PATH, str(tmp_path / 'zip.xlsx'), abas, processos=1)
+
+    pelo_openpyxl = _celulas(tmp_path / 'openpyxl.xlsx', abas)
+    pelo_zip = _celulas(tmp_path / 'zip.xlsx', abas)
+    assert pelo_zip.keys() == pelo_openpyxl.keys()
+    diferentes = {ref: (pelo_openpyxl[ref], pelo_zip[ref]) for ref in pelo_openpyxl if pelo_openpyxl[ref] != pelo_zip[ref]}
+    assert not diferentes, list(diferentes.items())[:10]
+
+
+def test_datas_com_formato_de_data(abas, tmp_path):
+    """As colunas de datas saem como datas, não como o número de série."""
+    with redirect_stdout(io.StringIO()):
+        gerar_saida_zip(MODELO_PATH, str(tmp_path / 'zip.xlsx'), abas, processos=1)
+    ws = openpyxl.load_workbook(tmp_path / 'zip.xlsx')['CREDITO_FINANCEIRO']
+    for coluna in ('H', 'I'):
+        celula = ws[f'{coluna}3']
+        assert celula.is_date, (coluna, celula.value, celula.number_format)
+
+
+def test_formula_compartilhada_na_linha_modelo():
+    """A filha de uma fórmula compartilhada (<f t="shared" si="0"/>) é estendida a partir da mestre."""
+    xml = (
+        '<worksheet><sheetData>'
+        '<row r="2"><c r="A2"><v>1</v></c><c r="C2"><f t="shared" ref="C2:C3" si="0">A2*2</f><v>2</v></c></row>'
+        '<row r="3"><c r="A3"><v>1</v></c><c r="C3" s="4"><f t="shared" si="0"/><v>2</v></c></row>'
+        '</sheetData></worksheet>'
+    )
+    df = pd.DataFrame({'a': [10, 20, 30], 'b': ['x', 'y', 'z']})
+    gerado = ''.join(reescrever_aba(xml, df, linha_inicial=3))
+    for linha in (3, 4, 5):
+        assert f'<c r="C{linha}" s="4" t="str"><f>A{linha}*2</f></c>' in gerado
+    # A linha mantida (2) continua com a mestre
+    assert '<f t="shared" ref="C2:C3" si="0">A2*2</f>' in gerado
+
+
+def test_formula_sem_texto_nem_mestre():
+    xml = '<worksheet><sheetData><row r="3"><c r="C3"><f t="shared" si="7"/></c></row></sheetData></worksheet>'
+    with pytest.raises(ValueError, match='C3'):
+        list(reescrever_aba(xml, pd.DataFrame({'a': [1]}), linha_inicial=3))
@@ -0,0 +1,26 @@
+import sqlite3
+
+import pandas as pd
+
+from monitoramento.saida_colunar import caminhos_colunares, gravar_saidas_colunares
+
+
+def test_colunas_misturadas_numericas_no_parquet_e_no_sqlite(tmp_path, abas):
+    abas = dict(abas)
+    cf = abas['CREDITO_FINANCEIRO'].copy()
+    # Uma coluna fora do esquema com números e textos monetários, como o painel às vezes entrega
+    cf['EXTRA'] = pd.Series([1.5, 'R$ 2,00'] * (len(cf) // 2) + [None] * (len(cf) % 2), index=cf.index, dtype=object)
+    abas['CREDITO_FINANCEIRO'] = cf
+    destino = str(tmp_path / 'saida.xlsx')
+    gravar_saidas_colunares(abas, destino)
+    caminhos = caminhos_colunares(destino)
+
+    parquet = pd.read_parquet(f"{caminhos['parquet']}/credito_financeiro.parquet")
+    for coluna in ('EXTRA', 'VL_SALDO_DEVEDOR'):
+        assert pd.api.types.is_numeric_dtype(parquet[coluna]), coluna
+
+    with sqlite3.connect(caminhos['sqlite']) as conexao:
+        tipos = dict(conexao.execute('SELECT "EXTRA", typeof("EXTRA") FROM credito_financeiro LIMIT 2').fetchall())
+        saldo = {t for (t,) in conexao.execute('SELECT DISTINCT typeof("VL_SALDO_DEVEDOR") FROM credito_financeiro')}
+    assert tipos == {1.5: 'real', 2.0: 'real'}
+    assert saldo <= {'integer', 'null'}
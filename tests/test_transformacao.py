@@ -0,0 +1,13 @@
+from monitoramento.correcoes import aplicar_correcoes
+from monitoramento.transformacao import transformar_modalidades
+
+
+def test_avisos_das_modalidades_em_linhas_separadas(exportacoes, capsys):
+    aplicar_correcoes(exportacoes)
+    capsys.readouterr()
+    transformar_modalidades(exportacoes, paralelo=True)
+    linhas = capsys.readouterr().out.splitlines()
+    dimensoes = [linha for linha in linhas if '🧭' in linha]
+    assert [linha.split(':')[0] for linha in dimensoes] == ['🧭 Dimensão credito_financeiro', '🧭 Dimensão modalidade_1']
+    # Cada aviso numa linha própria, sem se misturar com o da outra thread
+    assert all(sum(linha.count(icone) for icone in ('🧭', '⚙️', '✅', '⚠️')) == 1 for linha in linhas if linha.strip())
@@ -0,0 +1,68 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import pandas as pd
+
+from monitoramento.esquemas import para_planilha, preparar_para_arrow
+from monitoramento.valores import converter_valores, para_reais
+
+# Colunas monetárias da aba1 do Crédito Financeiro, que vão para a planilha
+MONETARIAS_CF = ['Dívida Aprox.', 'VL_SALDO_DEVEDOR', 'VL_TRIBUTO_FEDERAL_ESTIMADO']
+
+
+def _centavos_esperados(valor):
+    """Centavos de um valor como o painel entrega: número ou texto 'R$ 1.234,56'."""
+    if isinstance(valor, str):
+        valor = valor.replace('R$', '').strip().replace('.', '').replace(',', '.')
+    return int(Decimal(str(valor)).scaleb(2).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def test_textos_no_formato_brasileiro_e_numeros_misturados():
+    serie = pd.Series(['R$ 1.234,56', 'R$ 10,00', '1.234.567', '12.5', 1.005, 7, '', None, 'abc'], dtype=object)
+    convertida, coagidos = converter_valores(serie)
+    assert str(convertida.dtype) == 'Int64'
+    assert convertida.tolist()[:6] == [123456, 1000, 123456700, 1250, 101, 700]
+    assert convertida.iloc[6:].isna().all()
+    # Só o 'abc' estava preenchido e não pôde ser lido
+    assert coagidos == 1
+    assert para_reais(convertida).tolist()[:2] == [1234.56, 10.0]
+
+
+def test_centavos_das_exportacoes_sinteticas(geradas, exportacoes):
+    for nome in ('credito_financeiro_aba2', 'modalidade_1_aba3'):
+        gerados = geradas[nome]['VL_TOTAL']
+        # Parte dos valores veio como texto e parte como número
+        assert gerados.map(lambda v: isinstance(v, str)).any() and not gerados.map(lambda v: isinstance(v, str)).all()
+        lidos = exportacoes[nome]['VL_TOTAL']
+        assert str(lidos.dtype) == 'Int64'
+        assert lidos.tolist() == [_centavos_esperados(v) for v in gerados]
+
+
+def test_colunas_monetarias_da_aba1_numericas_na_saida(geradas, exportacoes, abas):
+    for coluna in MONETARIAS_CF:
+        lidos = exportacoes['credito_financeiro_aba1'][coluna]
+        assert str(lidos.dtype) == 'Int64', coluna
+        assert lidos.tolist() == [_centavos_esperados(v) for v in geradas['credito_financeiro_aba1'][coluna]]
+        # Na planilha, reais como número: as fórmulas da VISÃO_GERAL (MAX, SUBTOTAL) ignoram textos
+        saida = para_planilha(abas['CREDITO_FINANCEIRO'])[coluna]
+        assert saida.map(lambda v: v is None or isinstance(v, float)).all(), coluna
+
+
+def test_colunas_misturadas_fora_do_esquema():
+    df = pd.DataFrame(
+        {
+            'numerica': pd.Series([1.5, 'R$ 2,00', None, 3], dtype=object),
+            'texto': pd.Series([1, 'abc', None], dtype=object).reindex(range(4)),
+        }
+    )
+    df = preparar_para_arrow(df)
+    assert str(df['numerica'].dtype) == 'Float64'
+    assert df['numerica'].tolist()[:2] == [1.5, 2.0] and df['numerica'].tolist()[3] == 3.0
+    assert df['texto'].tolist()[:2] == ['1', 'abc']
+
+
+def test_colunas_com_textos_monetarios_numericas_depois_da_ingestao(geradas, exportacoes):
+    for nome, df in geradas.items():
+        for coluna in df.columns[df.dtypes == object]:
+            if not df[coluna].map(lambda v: isinstance(v, str) and v.startswith('R$')).any():
+                continue
+            assert pd.api.types.is_numeric_dtype(exportacoes[nome][coluna]), f'{nome}.{coluna}'